@@ -0,0 +1 @@
+"""Benchmarks for semvergit (run with ``make benchmark``)."""
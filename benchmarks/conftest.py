@@ -0,0 +1,175 @@
+"""Benchmarks configuration (options, synthetic repositories and the recorder)."""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
+
+import pytest
+from pytest import Config, Metafunc, Parser, StashKey, TempPathFactory
+
+from benchmarks.synthetic import RepoSpec, make_repo
+
+RESULTS_KEY = StashKey[Dict[str, Dict[str, Any]]]()
+
+
+def pytest_addoption(parser: Parser) -> None:
+    """Benchmark options."""
+    group = parser.getgroup("semvergit benchmarks")
+    group.addoption("--bench_tags", default="1000,10000", help="Tag counts (comma separated, e.g. 1000,10000,100000)")
+    group.addoption("--bench_prefixes", default="v", help="Tag prefixes (comma separated, e.g. v,api/v)")
+    group.addoption("--bench_prerelease_ratio", type=float, default=0.2, help="Ratio of prerelease tags")
+    group.addoption("--bench_refs", default="packed,loose", help="Tag refs storage (packed, loose or both)")
+    group.addoption("--bench_rounds", type=int, default=5, help="Timed rounds per benchmark")
+    group.addoption("--bench_json", default=None, help="Save the results to this JSON file")
+    group.addoption("--bench_baseline", default=None, help="Fail benchmarks slower than this JSON results file")
+    group.addoption("--bench_tolerance", type=float, default=1.5, help="Allowed slowdown against the baseline")
+
+
+def pytest_configure(config: Config) -> None:
+    """Collect the results on the config."""
+    config.stash[RESULTS_KEY] = {}
+
+
+def pytest_generate_tests(metafunc: Metafunc) -> None:
+    """Parametrize the benchmarks with the synthetic repository specs."""
+    if "repo_spec" not in metafunc.fixturenames:
+        return
+    option = metafunc.config.getoption
+    specs = [
+        RepoSpec(
+            tags=int(tags),
+            prefixes=tuple(option("bench_prefixes").split(",")),
+            prerelease_ratio=option("bench_prerelease_ratio"),
+            packed=refs == "packed",
+        )
+        for tags in option("bench_tags").split(",")
+        for refs in option("bench_refs").split(",")
+    ]
+    metafunc.parametrize("repo_spec", specs, ids=[spec.name for spec in specs], scope="session")
+
+
+@pytest.fixture(name="repo_factory", scope="session")
+def fixture_repo_factory(tmp_path_factory: TempPathFactory) -> Callable[[RepoSpec], Path]:
+    """Synthetic repositories (made once per spec)."""
+    repos: Dict[RepoSpec, Path] = {}
+
+    def factory(spec: RepoSpec) -> Path:
+        if spec not in repos:
+            repos[spec] = make_repo(tmp_path_factory.mktemp("bench") / spec.name, spec)
+        return repos[spec]
+
+    return factory
+
+
+@pytest.fixture()
+def synthetic_repo(repo_factory: Callable[[RepoSpec], Path], repo_spec: RepoSpec) -> Path:
+    """Synthetic repository of the spec (without a version index)."""
+    repo_dir = repo_factory(repo_spec)
+    index_path = repo_dir / ".git" / "semvergit" / "index.json"
+    if index_path.exists():
+        index_path.unlink()
+    return repo_dir
+
+
+class Recorder:
+    """Records the time (and peak memory) of a benchmark and checks it against the baseline."""
+
+    def __init__(self, config: Config, name: str) -> None:
+        """Init."""
+        self.config = config
+        self.name = name
+        self.rounds: int = config.getoption("bench_rounds")
+
+    def record(self, phase: str, timings: List[float], peak_kib: float) -> None:
+        """Record the results of a phase and compare them with the baseline."""
+        key = f"{self.name}::{phase}"
+        result = {
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "rounds": len(timings),
+            "peak_kib": peak_kib,
+        }
+        self.config.stash[RESULTS_KEY][key] = result
+        baseline_path = self.config.getoption("bench_baseline")
+        if baseline_path is None:
+            return
+        baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8")).get(key)
+        if baseline is None:
+            return
+        limit = baseline["median"] * self.config.getoption("bench_tolerance")
+        if result["median"] > limit:
+            pytest.fail(f"{key} regressed: {result['median']:.4f}s > {limit:.4f}s (baseline {baseline['median']:.4f}s)")
+
+    def __call__(self, phase: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Time func (in-process) and measure its peak Python memory in an extra traced round."""
+        timings = []
+        for _ in range(self.rounds):
+            start = time.perf_counter()
+            func(*args, **kwargs)
+            timings.append(time.perf_counter() - start)
+        tracemalloc.start()
+        try:
+            result = func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.record(phase, timings, peak / 1024)
+        return result
+
+    def cli(self, phase: str, args: List[str], cwd: Path) -> None:
+        """Time the CLI end to end (in a subprocess) and measure its peak RSS."""
+        timings = []
+        peak_kib = 0.0
+        for _ in range(self.rounds):
+            timing, max_rss = run_cli(args, cwd)
+            timings.append(timing)
+            peak_kib = max(peak_kib, max_rss)
+        self.record(phase, timings, peak_kib)
+
+
+def run_cli(args: List[str], cwd: Path) -> Tuple[float, float]:
+    """Run the CLI, returns its wall time and peak RSS (KiB)."""
+    start = time.perf_counter()
+    with subprocess.Popen(
+        [sys.executable, "-m", "semvergit", *args], cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    ) as process:
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.perf_counter() - start
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, args)
+    return elapsed, float(usage.ru_maxrss)
+
+
+@pytest.fixture()
+def bench(request: pytest.FixtureRequest) -> Recorder:
+    """Benchmark recorder of the test."""
+    return Recorder(request.config, request.node.name)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def save_results(pytestconfig: Config) -> Generator[None, None, None]:
+    """Save the results (if --bench_json is set)."""
+    yield
+    json_path: Optional[str] = pytestconfig.getoption("bench_json")
+    if json_path is not None:
+        Path(json_path).write_text(json.dumps(pytestconfig.stash[RESULTS_KEY], indent=2), encoding="utf-8")
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: Config) -> None:
+    """Print the results."""
+    results = config.stash.get(RESULTS_KEY, {})
+    if not results:
+        return
+    terminalreporter.section("semvergit benchmarks")
+    terminalreporter.write_line(f"{'benchmark':<80} {'min (ms)':>10} {'median (ms)':>12} {'peak (KiB)':>12}")
+    for key, result in results.items():
+        terminalreporter.write_line(
+            f"{key:<80} {result['min'] * 1000:>10.2f} {result['median'] * 1000:>12.2f} {result['peak_kib']:>12.0f}"
+        )
@@ -0,0 +1,81 @@
+"""Synthetic repositories (generated with git fast-import)."""
+
+import os
+import random
+import subprocess
+import time
+from pathlib import Path
+from typing import Iterator, NamedTuple, Sequence
+
+COMMITTER = "Benchmark <benchmark@example.com> 0 +0000"
+# Refs changed within the racy window of the version index aren't trusted, the repositories are made older than that
+REFS_AGE_NS = 60_000_000_000
+
+
+class RepoSpec(NamedTuple):
+    """Synthetic repository spec."""
+
+    tags: int = 1000
+    prefixes: Sequence[str] = ("v",)
+    prerelease_ratio: float = 0.2
+    packed: bool = True
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        """Short name (used for the repository directory and the results)."""
+        refs = "packed" if self.packed else "loose"
+        return f"{self.tags}-{'+'.join(self.prefixes)}-{self.prerelease_ratio}-{refs}"
+
+
+def iter_tags(spec: RepoSpec) -> Iterator[str]:
+    """Iterate unique tag names of the spec."""
+    rand = random.Random(spec.seed)
+    for number in range(spec.tags):
+        prefix = spec.prefixes[number % len(spec.prefixes)]
+        version = f"{number // 10000}.{number // 100 % 100}.{number % 100}"
+        if rand.random() < spec.prerelease_ratio:
+            version = f"{version}-dev.{rand.randint(1, 50)}"
+        yield f"{prefix}{version}"
+
+
+def fast_import_stream(spec: RepoSpec) -> bytes:
+    """fast-import stream of a single commit with all the tags pointing at it."""
+    lines = [
+        "commit refs/heads/master",
+        "mark :1",
+        f"committer {COMMITTER}",
+        "data 7",
+        "Initial",
+        "M 644 inline README.md",
+        "data 9",
+        "benchmark",
+        "",
+    ]
+    for tag in iter_tags(spec):
+        lines.extend([f"reset refs/tags/{tag}", "from :1", ""])
+    return "\n".join(lines).encode()
+
+
+def make_repo(path: Path, spec: RepoSpec) -> Path:
+    """Make a synthetic repository at path (loose or packed tag refs)."""
+    path.mkdir(parents=True)
+    git = ["git", "-C", str(path)]
+    subprocess.run([*git, "-c", "init.defaultBranch=master", "init", "-q"], check=True)
+    subprocess.run([*git, "fast-import", "--quiet"], input=fast_import_stream(spec), check=True)
+    # fast-import writes loose refs
+    if spec.packed:
+        subprocess.run([*git, "pack-refs", "--all"], check=True)
+    subprocess.run([*git, "checkout", "-q", "master"], check=True)
+    backdate_refs(path / ".git")
+    return path
+
+
+def backdate_refs(git_dir: Path) -> None:
+    """Backdate the refs storage (so the version index is trusted right away, as in a repository in use)."""
+    mtime_ns = time.time_ns() - REFS_AGE_NS
+    paths = [git_dir / "packed-refs"] if (git_dir / "packed-refs").exists() else []
+    for root, dirs, files in os.walk(git_dir / "refs"):
+        paths.extend(Path(root, name) for name in [*dirs, *files])
+    for ref_path in [git_dir / "refs", *paths]:
+        os.utime(ref_path, ns=(mtime_ns, mtime_ns))
@@ -0,0 +1,80 @@
+"""Benchmarks of the version lookup hot path (per phase and end to end)."""
+
+from pathlib import Path
+from typing import Any
+
+from git import Repo
+
+from benchmarks.conftest import Recorder
+from semvergit.app import SemverGit
+from semvergit.git_utils import ensure_commit_graph, get_reachable_tags, get_tags_with_prefix
+from semvergit.index_utils import INDEX_DIR, INDEX_FILE
+from semvergit.version_utils import latest_parts, to_version
+
+
+def drop_index(repo_dir: Path) -> None:
+    """Remove the version index (next SemverGit starts cold)."""
+    index_path = repo_dir / ".git" / INDEX_DIR / INDEX_FILE
+    if index_path.exists():
+        index_path.unlink()
+
+
+def loaded_semvergit(**kwargs: Any) -> SemverGit:
+    """SemverGit with its latest version loaded (the state is lazy)."""
+    svg = SemverGit(**kwargs)
+    assert svg.latest_version is not None
+    return svg
+
+
+def cold_semvergit(repo: Repo, repo_dir: Path) -> SemverGit:
+    """Loaded SemverGit without a version index on disk."""
+    drop_index(repo_dir)
+    return loaded_semvergit(repo=repo)
+
+
+def test_get_tags_with_prefix(bench: Recorder, synthetic_repo: Path) -> None:
+    """List the version tags (refs reader and GitPython fallback)."""
+    repo = Repo(synthetic_repo)
+    tags = bench("refs", get_tags_with_prefix, repo=repo, prefix="v")
+    assert tags
+    assert bench("gitpython", get_tags_with_prefix, repo=repo, prefix="v", use_refs=False) == tags
+
+
+def test_get_reachable_tags(bench: Recorder, synthetic_repo: Path) -> None:
+    """List the version tags reachable from HEAD (commit-graph walk)."""
+    repo = Repo(synthetic_repo)
+    ensure_commit_graph(repo)
+    assert bench("merged", get_reachable_tags, repo=repo, prefix="v")
+
+
+def test_get_versions(bench: Recorder, synthetic_repo: Path) -> None:
+    """Parse the versions and find the latest one (without the index)."""
+    svg = SemverGit(repo=Repo(synthetic_repo), use_cache=False)
+    versions = bench("parse", svg.get_versions)
+    assert bench("max", max, versions) == svg.latest_version
+    version_parts = bench("parse_parts", svg.get_version_parts)
+    assert to_version(bench("latest_parts", latest_parts, version_parts)) == svg.latest_version
+
+
+def test_semvergit_init(bench: Recorder, synthetic_repo: Path) -> None:
+    """SemverGit init and latest version (no index, cold index and warm index)."""
+    repo = Repo(synthetic_repo)
+    bench("no_cache", loaded_semvergit, repo=repo, use_cache=False)
+    bench("cold_index", cold_semvergit, repo, synthetic_repo)
+    warm = bench("warm_index", loaded_semvergit, repo=repo)
+    # The warm index is loaded as it is (no tag listed again)
+    assert warm.index is not None
+    assert "tags_scanned" not in warm.timings.counters
+
+
+def test_update(bench: Recorder, synthetic_repo: Path) -> None:
+    """Update (dry run) of a loaded SemverGit."""
+    svg = SemverGit(repo=Repo(synthetic_repo))
+    assert bench("dry_run", svg.update, bump_type="patch", dry_run=True).startswith("v")
+
+
+def test_cli(bench: Recorder, synthetic_repo: Path) -> None:
+    """CLI latency (and peak RSS) end to end."""
+    bench.cli("no_cache", ["-t", "patch", "--dry_run", "--no_cache"], cwd=synthetic_repo)
+    drop_index(synthetic_repo)
+    bench.cli("index", ["-t", "patch", "--dry_run"], cwd=synthetic_repo)
@@ -1,5 +1,8 @@
 """SemVerGit package."""
 
-from loguru import logger
+__all__ = ["__version__"]
 
-logger.remove()
+try:
+    from semvergit._version import __version__
+except ImportError:  # Source tree that was never built or installed
+    __version__ = "0.0.0"
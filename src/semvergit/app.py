@@ -1,71 +1,493 @@
 """SemverGit application module."""
 
+import asyncio
+import secrets
 import sys
-from enum import Enum
-from importlib import metadata
-from typing import List, Optional
+import time
+from functools import cached_property
+from types import TracebackType
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Type
 
-from loguru import logger
+from git import GitCommandError, Head, Repo
 from semver import VersionInfo
 
-from semvergit.file_utils import update_verion_file
+from semvergit import __version__
+from semvergit.bump_utils import BumpType
+from semvergit.commit_utils import BumpCache, classify_commits
+from semvergit.file_utils import Stamp, stamp_files, update_verion_file
 from semvergit.git_utils import (
-    add_file,
+    AsyncGit,
+    add_files,
+    async_fetch_tags,
+    async_ls_remote_tags,
+    async_pull_remote,
+    async_push_refs,
+    close_repo,
+    commit_files,
+    delete_tag,
+    ensure_commit_graph,
+    fetch_remote_tags,
     get_active_branch,
+    get_git_dir,
+    get_reachable_tags,
     get_repo,
     get_tags_with_prefix,
+    is_push_rejected,
+    ls_remote_tags,
     new_commit,
     pull_remote,
+    push_refs,
     push_remote,
+    push_remote_tag,
+    resolve_commit,
+    resolve_remote_ref,
+    retract_unpushed_tags,
     set_tag,
 )
+from semvergit.index_utils import VersionIndex
+from semvergit.log_utils import logger
+from semvergit.prefix_utils import PrefixTrie, common_prefix
+from semvergit.ref_utils import TAGS_REF
+from semvergit.timing_utils import Timings
+from semvergit.version_utils import (
+    InvalidTagError,
+    PartsLike,
+    VersionLineError,
+    VersionParts,
+    in_line,
+    invalid_summary,
+    iter_tag_parts,
+    latest_parts,
+    line_index,
+    parse_line,
+    parse_parts,
+    to_version,
+)
+
+__all__ = [
+    "BumpType",
+    "InvalidTagError",
+    "MultiSemverGit",
+    "RemoteSemverGit",
+    "SemverGit",
+    "Timings",
+    "VersionLineError",
+]
 
+# Lazily computed state forgotten by SemverGit.invalidate
+LAZY_VERSION_STATE = ("version_parts", "versions", "version_lines", "latest_version")
 
-class BumpType(str, Enum):
-    """BumpType."""
 
-    MAJOR = "major"
-    MINOR = "minor"
-    PATCH = "patch"
-    PRERELEASE = "prerelease"
+class PushAttempts:
+    """Attempts of pushing a new tag."""
+
+    def __init__(self, svg: "SemverGit", new_tag_str: str, retries: int, dry_run: bool = False) -> None:
+        """Init."""
+        self.svg = svg
+        self.new_tag_str = new_tag_str
+        self.retries = retries
+        self.dry_run = dry_run
+        self.attempt = 1
+        self.start_time = time.monotonic()
 
-    def __str__(self) -> str:
-        return self.value
+    def rejected(self, exp: GitCommandError) -> float:
+        """Delay before retrying a rejected push."""
+        # Only a tag taken by a concurrent push is worth another attempt
+        if self.attempt > self.retries or not is_push_rejected(exp):
+            raise exp
+        delay = self.svg.retry_delay(self.attempt)
+        logger.warning(
+            f"🔁 {self.new_tag_str} was rejected (attempt {self.attempt}/{self.retries + 1}), retry in {delay:.2f}s"
+        )
+        self.svg.timings.count("push_retries")
+        self.attempt += 1
+        return delay
 
-    @classmethod
-    def print_options(cls) -> str:
-        """Print options."""
-        return f"{[str(bump_type) for bump_type in list(cls)]}"
+    def pushed(self) -> str:
+        """The pushed tag."""
+        if not self.dry_run:
+            latency = time.monotonic() - self.start_time
+            logger.info(f"Pushed {self.new_tag_str} (attempts: {self.attempt}, latency: {latency:.2f}s)")
+        return self.new_tag_str
 
 
-class SemverGit:  # pylint: disable=too-few-public-methods
+class SemverGit:  # pylint: disable=too-many-instance-attributes,too-many-public-methods
     """SemverGit."""
 
     prerelease_token: str = "dev"
     version_prefix: str = "v"
+    retry_base_delay: float = 0.2
+    retry_max_delay: float = 5.0
+    # The new tag is written to stdout (batches report it in their own result lines)
+    echo_tag: bool = True
 
-    def __init__(self, pull_branch: bool = False) -> None:
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        pull_branch: bool = False,
+        use_cache: bool = True,
+        repo: Optional[Repo] = None,
+        fetch_tags: bool = False,
+        remotes: Sequence[str] = ("origin",),
+        timings: Optional[Timings] = None,
+        strict: bool = False,
+        reachable_from: Optional[str] = None,
+        version_prefix: Optional[str] = None,
+        tag_source: Optional[Callable[[str], List[str]]] = None,
+        line: Optional[str] = None,
+    ) -> None:
         """Init."""
-        logger.success(f"SemverGit: {metadata.version('semvergit')}")
-        self.current_repo = get_repo()
-        self.branch = get_active_branch(repo=self.current_repo)
-        logger.debug(f"Active branch: {self.branch.name}")
-        if pull_branch:
+        logger.success(f"SemverGit: {__version__}")
+        # Bump from the latest version of a maintenance line (MAJOR or MAJOR.MINOR) instead of the latest one
+        self.line = parse_line(line) if line is not None else None
+        if version_prefix is not None:
+            self.version_prefix = version_prefix
+        # Lists the tags of a prefix instead of the repository (e.g. a scan shared by several components)
+        self.tag_source = tag_source
+        self.timings = timings if timings is not None else Timings()
+        self.strict = strict
+        # Only the tags reachable from this ref (e.g. HEAD of a release branch) are versions
+        self.reachable_from = reachable_from
+        self.invalid_tags: List[str] = []
+        self.remotes = tuple(remotes)
+        self.use_cache = use_cache
+        # Pull and fetch once, before the versions are first read
+        self.pull_branch = pull_branch
+        self.fetch_tags = fetch_tags
+        self.index_fresh = False
+        self.owns_repo = repo is None
+        if repo is not None:
+            self.current_repo = repo
+
+    def __enter__(self) -> "SemverGit":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close repo."""
+        # An injected repo is shared with the caller, who closes it
+        if self.owns_repo and "current_repo" in self.__dict__:
+            close_repo(repo=self.current_repo)
+
+    @cached_property
+    def current_repo(self) -> Repo:
+        """Current repo."""
+        with self.timings.span("get_repo"):
+            return get_repo()
+
+    @cached_property
+    def branch(self) -> Head:
+        """Active branch."""
+        branch = get_active_branch(repo=self.current_repo)
+        logger.debug(f"Active branch: {branch.name}")
+        return branch
+
+    @cached_property
+    def index(self) -> Optional[VersionIndex]:
+        """Version index."""
+        return self.get_index() if self.use_cache else None
+
+    @cached_property
+    def version_parts(self) -> List[VersionParts]:
+        """Version parts."""
+        self.sync_remote()
+        with self.timings.span("versions"):
+            return self.get_version_parts()
+
+    @cached_property
+    def versions(self) -> List[VersionInfo]:
+        """Versions."""
+        return [to_version(parts) for parts in self.version_parts]
+
+    @cached_property
+    def version_lines(self) -> Dict[str, PartsLike]:
+        """Latest version parts per line."""
+        self.sync_remote()
+        with self.timings.span("lines"):
+            if self.index is not None and self.reachable_from is None:
+                self.refresh_index(self.index)
+                return self.index.lines(self.version_prefix)
+            return line_index(self.version_parts)
+
+    @cached_property
+    def latest_version(self) -> VersionInfo:
+        """Latest version."""
+        self.sync_remote()
+        with self.timings.span("latest"):
+            return self.get_latest_version()
+
+    def invalidate(self, *names: str) -> None:
+        """Forget lazily computed state."""
+        for name in names or LAZY_VERSION_STATE:
+            self.__dict__.pop(name, None)
+        self.index_fresh = False
+
+    def sync_remote(self) -> None:
+        """Sync remote."""
+        if self.pull_branch:
+            self.pull_branch = False
             logger.info("Pulling...")
-            pull_remote(self.current_repo)
-        self.versions = self.get_versions()
-        if self.versions:
-            self.latest_version = max(self.versions)
-        else:
-            self.latest_version = VersionInfo.parse("0.0.0")
+            with self.timings.span("pull"):
+                pull_remote(self.current_repo)
+        if self.fetch_tags:
+            self.fetch_tags = False
+            logger.info("Fetching tags...")
+            with self.timings.span("fetch_tags"):
+                new_tags = fetch_remote_tags(repo=self.current_repo, prefix=self.version_prefix, remote=self.remotes[0])
+            logger.info(f"Fetched {new_tags} new tags")
+
+    async def sync_remote_async(self, transport: AsyncGit) -> None:
+        """Sync remote on asyncio."""
+        if self.pull_branch:
+            self.pull_branch = False
+            logger.info("Pulling...")
+            with self.timings.span("pull"):
+                await async_pull_remote(transport, self.current_repo)
+        if self.fetch_tags:
+            self.fetch_tags = False
+            logger.info("Fetching tags...")
+            with self.timings.span("fetch_tags"):
+                await async_fetch_tags(transport, self.current_repo, prefix=self.version_prefix, remote=self.remotes[0])
+
+    def get_index(self) -> Optional[VersionIndex]:
+        """Get version index."""
+        git_dir = get_git_dir(repo=self.current_repo)
+        if not git_dir:
+            return None
+        return VersionIndex(git_dir)
+
+    def refresh_index(self, index: VersionIndex) -> None:
+        """Refresh index."""
+        if self.index_fresh:
+            return
+        index.refresh(prefix=self.version_prefix, list_tags=self.list_tags, parse=self.count_parse_tag)
+        self.check_invalid_tags(index.invalid(self.version_prefix))
+        self.index_fresh = True
+
+    def list_tags(self) -> List[str]:
+        """List version tags."""
+        with self.timings.span("list_tags"):
+            if self.tag_source is not None:
+                return self.tag_source(self.version_prefix)
+            tags = get_tags_with_prefix(repo=self.current_repo, prefix=self.version_prefix)
+        self.timings.count("tags_scanned", len(tags))
+        return tags
+
+    def list_reachable_tags(self) -> List[str]:
+        """List reachable version tags."""
+        with self.timings.span("reachable_tags"):
+            ensure_commit_graph(repo=self.current_repo)
+            tags = get_reachable_tags(repo=self.current_repo, prefix=self.version_prefix, ref=str(self.reachable_from))
+        self.timings.count("tags_reachable", len(tags))
+        return tags
+
+    def count_parse_tag(self, tag: str) -> VersionParts:
+        """Parse tag."""
+        self.timings.count("tags_parsed")
+        return self.parse_tag_parts(tag)
+
+    def get_version_parts(self) -> List[VersionParts]:
+        """Get version parts."""
+        if self.index is not None:
+            self.refresh_index(self.index)
+            if self.reachable_from is None:
+                return self.index.parts(self.version_prefix)
+            commit = resolve_commit(repo=self.current_repo, ref=self.reachable_from)
+            reachable = self.index.reachable(self.version_prefix, commit, self.list_reachable_tags)
+            return self.index.parts(self.version_prefix, tags=reachable)
+        tags = self.list_tags() if self.reachable_from is None else self.list_reachable_tags()
+        return self.parse_tags(tags)
+
+    def parse_tags(self, tags: List[str]) -> List[VersionParts]:
+        """Parse tags."""
+        invalid: List[str] = []
+        with self.timings.span("parse"):
+            version_parts = [parts for _, parts in iter_tag_parts(tags, self.parse_tag_parts, invalid, self.strict)]
+        self.timings.count("tags_parsed", len(tags))
+        self.check_invalid_tags(invalid)
+        return version_parts
+
+    def check_invalid_tags(self, invalid: List[str]) -> None:
+        """Check invalid tags."""
+        self.invalid_tags = invalid
+        self.timings.count("tags_invalid", len(invalid))
+        if not invalid:
+            return
+        if self.strict:
+            raise InvalidTagError(f"Found {invalid_summary(invalid)}")
+        logger.warning(f"⚠️ Skipped {invalid_summary(invalid)}")
 
     def get_versions(self) -> List[VersionInfo]:
         """Get versions."""
-        current_repo = get_repo()
-        tags = get_tags_with_prefix(repo=current_repo, prefix=self.version_prefix)
-        clean_tags = [self.remove_prefix(tag, self.version_prefix) for tag in tags]
-        versions = [VersionInfo.parse(tag) for tag in clean_tags]
-        return versions
+        return [to_version(parts) for parts in self.get_version_parts()]
+
+    def get_latest_version(self) -> VersionInfo:
+        """Get latest version."""
+        if self.line is not None:
+            line_latest = self.version_lines.get(self.line)
+            if line_latest is None:
+                raise VersionLineError(f"No versions on line {self.line}")
+            return to_version(line_latest)
+        latest_version = None
+        if self.index is not None and self.reachable_from is None:
+            self.refresh_index(self.index)
+            latest_version = self.index.latest(self.version_prefix)
+        else:
+            # Single pass over the compact parts, only the latest one becomes a VersionInfo
+            latest = latest_parts(self.version_parts)
+            latest_version = to_version(latest) if latest is not None else None
+        if latest_version is None:
+            latest_version = VersionInfo.parse("0.0.0")
+        return latest_version
+
+    def next_version(self, bump_type: str) -> VersionInfo:
+        """Next version."""
+        return self.bump_version(self.latest_version, bump_type)
+
+    def bump_version(self, version: VersionInfo, bump_type: str) -> VersionInfo:
+        """Bump version."""
+        new_version = version.next_version(part=bump_type, prerelease_token=self.prerelease_token)
+        if self.line is not None and not in_line(self.line, new_version.major, new_version.minor):
+            raise VersionLineError(f"A {bump_type} bump of {version} leaves line {self.line}")
+        return new_version
+
+    def resolve_bump_type(self, bump_type: str) -> str:
+        """Resolve bump type."""
+        if bump_type != BumpType.AUTO:
+            return bump_type
+        head = self.reachable_from or "HEAD"
+        rev_range = f"{self.version_prefix}{self.latest_version}..{head}" if self.version_parts else head
+        with self.timings.span("auto_bump"):
+            cache = BumpCache(self.index.git_dir) if self.index is not None else None
+            resolved = classify_commits(repo=self.current_repo, rev_range=rev_range, cache=cache)
+        if resolved is None:
+            logger.warning(f"⚠️ No commits in {rev_range}, using {BumpType.PATCH}")
+            resolved = BumpType.PATCH
+        logger.info(f"🔎 Auto bump type from {rev_range}: {resolved}")
+        return str(resolved)
+
+    def refresh_remote_versions(self) -> None:
+        """Refresh versions from remote."""
+        if self.reachable_from is not None:
+            # Only the remote tags reachable from the ref count, the fetch brings their commits too
+            fetch_remote_tags(repo=self.current_repo, prefix=self.version_prefix, remote=self.remotes[0])
+            self.reload_latest_version()
+            return
+        remote_tags = ls_remote_tags(remote=self.remotes[0], prefix=self.version_prefix, repo=self.current_repo)
+        self.merge_remote_tags(remote_tags)
+
+    async def refresh_remote_versions_async(self, transport: AsyncGit) -> None:
+        """Refresh versions from remote on asyncio."""
+        if self.reachable_from is not None:
+            await async_fetch_tags(transport, self.current_repo, prefix=self.version_prefix, remote=self.remotes[0])
+            await asyncio.to_thread(self.reload_latest_version)
+            return
+        cwd = str(self.current_repo.git.working_dir)
+        self.merge_remote_tags(await async_ls_remote_tags(transport, self.remotes[0], self.version_prefix, cwd=cwd))
+
+    def reload_latest_version(self) -> None:
+        """Reload latest version."""
+        latest_version = self.latest_version
+        self.invalidate()
+        self.latest_version = max(latest_version, self.latest_version)
+
+    def merge_remote_tags(self, remote_tags: List[str]) -> None:
+        """Move the latest version up to the latest remote tag."""
+        remote_parts = (parts for _, parts in iter_tag_parts(remote_tags, self.parse_tag_parts, [], self.strict))
+        if self.line is not None:
+            remote_parts = (parts for parts in remote_parts if in_line(self.line, parts[0], parts[1]))
+        remote_latest = latest_parts(remote_parts)
+        if remote_latest is not None:
+            self.latest_version = max(self.latest_version, to_version(remote_latest))
+
+    def retry_delay(self, attempt: int) -> float:
+        """Retry delay."""
+        delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempt - 1))
+        return delay * secrets.SystemRandom().uniform(0.5, 1.0)
+
+    def create_tag(self, new_tag_str: str, dry_run: bool) -> None:
+        """Create tag."""
+        set_tag(repo=self.current_repo, tag=new_tag_str, dry_run=dry_run)
+
+    def retract_tag(self, new_tag_str: str, dry_run: bool) -> None:
+        """Retract tag."""
+        delete_tag(repo=self.current_repo, tag=new_tag_str, dry_run=dry_run)
+
+    def allocate_tag(self, bump_type: str, dry_run: bool) -> str:
+        """Create the tag of the next version."""
+        new_version = self.next_version(bump_type)
+        logger.info(f"💡 Update from {self.latest_version} with {bump_type} to {new_version}")
+        new_tag_str = f"{self.version_prefix}{new_version}"
+        self.create_tag(new_tag_str, dry_run=dry_run)
+        return new_tag_str
+
+    def publish_tag(self, new_tag_str: str, dry_run: bool) -> None:
+        """Publish tag."""
+        push_remote(repo=self.current_repo, tag_str=new_tag_str, remotes=self.remotes, dry_run=dry_run)
+
+    async def publish_tag_async(self, new_tag_str: str, dry_run: bool, transport: AsyncGit) -> None:
+        """Publish tag on asyncio."""
+        if dry_run:
+            logger.debug(f"Dry run: push {new_tag_str} to {list(self.remotes)}")
+            return
+        await async_push_refs(transport, self.current_repo, [f"{TAGS_REF}{new_tag_str}"], self.remotes)
+
+    def push_tag(self, new_tag_str: str, bump_type: str, retries: int, dry_run: bool) -> str:
+        """Push tag."""
+        attempts = PushAttempts(self, new_tag_str, retries, dry_run)
+        while True:
+            try:
+                with self.timings.span("publish_tag"):
+                    self.publish_tag(attempts.new_tag_str, dry_run=dry_run)
+                return attempts.pushed()
+            except GitCommandError as exp:
+                delay = attempts.rejected(exp)
+            time.sleep(delay)
+            with self.timings.span("reallocate"):
+                self.retract_tag(attempts.new_tag_str, dry_run=dry_run)
+                self.refresh_remote_versions()
+                attempts.new_tag_str = self.allocate_tag(bump_type, dry_run)
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    async def push_tag_async(
+        self, new_tag_str: str, bump_type: str, retries: int, dry_run: bool, transport: AsyncGit
+    ) -> str:
+        """Push tag on asyncio."""
+        attempts = PushAttempts(self, new_tag_str, retries, dry_run)
+        while True:
+            try:
+                with self.timings.span("publish_tag"):
+                    await self.publish_tag_async(attempts.new_tag_str, dry_run, transport)
+                return attempts.pushed()
+            except GitCommandError as exp:
+                delay = attempts.rejected(exp)
+            await asyncio.sleep(delay)
+            with self.timings.span("reallocate"):
+                await asyncio.to_thread(self.retract_tag, attempts.new_tag_str, dry_run)
+                await self.refresh_remote_versions_async(transport)
+                attempts.new_tag_str = await asyncio.to_thread(self.allocate_tag, bump_type, dry_run)
+
+    def announce_tag(self, new_tag_str: str) -> str:
+        """Announce tag."""
+        logger.success(f"⭐ New version tag: {new_tag_str}")
+        if self.echo_tag:
+            sys.stdout.write(new_tag_str)
+        return str(new_tag_str)
+
+    def parse_tag(self, tag: str) -> VersionInfo:
+        """Parse tag into a version."""
+        return to_version(self.parse_tag_parts(tag))
+
+    def parse_tag_parts(self, tag: str) -> VersionParts:
+        """Parse tag into version parts."""
+        return parse_parts(self.remove_prefix(tag, self.version_prefix))
 
     @staticmethod
     def remove_prefix(text: str, prefix: str) -> str:
@@ -74,39 +496,338 @@ class SemverGit:  # pylint: disable=too-few-public-methods
             return text[len(prefix) :]
         return text
 
+    def write_version_files(  # pylint: disable=too-many-positional-arguments
+        self,
+        new_version: VersionInfo,
+        version_file: Optional[str],
+        stamps: Sequence[Stamp],
+        dry_run: bool,
+        stage: bool = True,
+    ) -> List[str]:
+        """Write version files."""
+        changed = []
+        if version_file:
+            logger.info(f"📝 Writing version to {version_file}...")
+            update_verion_file(version_file, new_version, dry_run)
+            changed.append(version_file)
+        if stamps:
+            logger.info(f"📝 Stamping version into {len({stamp.path for stamp in stamps})} files...")
+            changed.extend(stamp_files(stamps, new_version, dry_run))
+        if changed and stage:
+            add_files(repo=self.current_repo, file_paths=changed, dry_run=dry_run)
+        return changed
+
     # pylint: disable=too-many-arguments,too-many-positional-arguments
     def update(
-        self, bump_type: str, dry_run: bool, commit_message: Optional[str], auto_message: bool, version_file: str
+        self,
+        bump_type: str,
+        dry_run: bool,
+        commit_message: Optional[str] = None,
+        auto_message: bool = False,
+        version_file: Optional[str] = None,
+        retries: int = 0,
+        stamps: Sequence[Stamp] = (),
+        plumbing: bool = False,
     ) -> str:
         """Update."""
-        new_version = self.latest_version.next_version(part=bump_type, prerelease_token=self.prerelease_token)
-        logger.info(f"💡 Update from {self.latest_version} with {bump_type} to {new_version}")
-        new_tag_str = f"{self.version_prefix}{new_version}"
+        with self.timings.span("update"):
+            bump_type = self.resolve_bump_type(bump_type)
+            new_version = self.next_version(bump_type)
+            logger.info(f"💡 Update from {self.latest_version} with {bump_type} to {new_version}")
+            new_tag_str = f"{self.version_prefix}{new_version}"
 
-        if dry_run:
-            logger.warning("⚠️ Dry run (no tag set or pushed)")
+            if dry_run:
+                logger.warning("⚠️ Dry run (no tag set or pushed)")
 
-        if version_file:
-            logger.info(f"📝 Writing version to {version_file}...")
-            update_verion_file(version_file, new_version, dry_run)
-            add_file(repo=self.current_repo, file_path=version_file, dry_run=dry_run)
+            written: List[str] = []
+            if version_file or stamps:
+                with self.timings.span("version_file"):
+                    written = self.write_version_files(new_version, version_file, stamps, dry_run, stage=not plumbing)
 
-            if not commit_message:
-                # Upading the version file requires a commit message
-                auto_message = True
+                if written and not commit_message:
+                    # Upading the version file requires a commit message
+                    auto_message = True
 
-        if auto_message:
-            commit_message = f"New version: {str(new_version)}"
-        if auto_message or commit_message:
-            logger.info("✍️ Committing...")
-            new_commit(repo=self.current_repo, message=commit_message, dry_run=dry_run)
-        else:
-            logger.debug("No commit message")
+            if auto_message:
+                commit_message = f"New version: {str(new_version)}"
+            push_branch = None
+            if auto_message or commit_message:
+                logger.info("✍️ Committing...")
+                with self.timings.span("commit"):
+                    if plumbing:
+                        commit_files(
+                            repo=self.current_repo,
+                            file_paths=written,
+                            message=commit_message,
+                            branch=self.branch.name,
+                            dry_run=dry_run,
+                        )
+                    else:
+                        new_commit(repo=self.current_repo, message=commit_message, dry_run=dry_run)
+                # The new commit travels with the tag in the same (atomic) push
+                push_branch = self.branch.name
+            else:
+                logger.debug("No commit message")
 
-        set_tag(repo=self.current_repo, tag=new_tag_str, dry_run=dry_run)
-        logger.info("📤 Pushing...")
-        push_remote(repo=self.current_repo, tag_str=new_tag_str, dry_run=dry_run)
+            with self.timings.span("create_tag"):
+                self.create_tag(new_tag_str, dry_run=dry_run)
+            logger.info("📤 Pushing...")
+            with self.timings.span("push"):
+                if push_branch:
+                    # The commit holds the version, so a conflict can't be solved by moving the tag
+                    push_remote(
+                        repo=self.current_repo,
+                        tag_str=new_tag_str,
+                        branch=push_branch,
+                        remotes=self.remotes,
+                        dry_run=dry_run,
+                    )
+                else:
+                    new_tag_str = self.push_tag(new_tag_str, bump_type=bump_type, retries=retries, dry_run=dry_run)
 
-        logger.success(f"⭐ New version tag: {new_tag_str}")
-        sys.stdout.write(new_tag_str)
-        return str(new_tag_str)
+        return self.announce_tag(new_tag_str)
+
+    async def update_async(
+        self, bump_type: str, dry_run: bool, retries: int = 0, transport: Optional[AsyncGit] = None
+    ) -> str:
+        """Update on asyncio."""
+        transport = transport if transport is not None else AsyncGit()
+        with self.timings.span("update"):
+            await self.sync_remote_async(transport)
+            # The local work (tag scan, auto bump and tag) runs in a thread to keep the event loop free
+            bump_type = await asyncio.to_thread(self.resolve_bump_type, bump_type)
+            if dry_run:
+                logger.warning("⚠️ Dry run (no tag set or pushed)")
+            with self.timings.span("create_tag"):
+                new_tag_str = await asyncio.to_thread(self.allocate_tag, bump_type, dry_run)
+            logger.info("📤 Pushing...")
+            with self.timings.span("push"):
+                new_tag_str = await self.push_tag_async(new_tag_str, bump_type, retries, dry_run, transport)
+
+        return self.announce_tag(new_tag_str)
+
+
+class RemoteSemverGit(SemverGit):  # pylint: disable=too-many-instance-attributes
+    """SemverGit working directly on a remote."""
+
+    def __init__(
+        self,
+        remote: str = "origin",
+        commit: Optional[str] = None,
+        timings: Optional[Timings] = None,
+        strict: bool = False,
+        line: Optional[str] = None,
+    ) -> None:
+        """Init."""
+        super().__init__(use_cache=False, remotes=(remote,), timings=timings, strict=strict, line=line)
+        logger.info(f"Remote only mode on {remote}")
+        self.remote = remote
+        self.commit = commit
+
+    def get_version_parts(self) -> List[VersionParts]:
+        """Get version parts."""
+        with self.timings.span("list_tags"):
+            tags = ls_remote_tags(remote=self.remote, prefix=self.version_prefix)
+        self.timings.count("tags_scanned", len(tags))
+        return self.parse_tags(tags)
+
+    def refresh_remote_versions(self) -> None:
+        """Refresh versions from remote."""
+        self.reload_latest_version()
+
+    async def refresh_remote_versions_async(self, transport: AsyncGit) -> None:
+        """Refresh versions from remote on asyncio."""
+        self.merge_remote_tags(await async_ls_remote_tags(transport, self.remote, self.version_prefix))
+
+    def resolve_bump_type(self, bump_type: str) -> str:
+        """Resolve bump type."""
+        if bump_type == BumpType.AUTO:
+            raise ValueError("Remote only mode can't read the commits (no auto bump type)")
+        return bump_type
+
+    def create_tag(self, new_tag_str: str, dry_run: bool) -> None:
+        """Nothing to create."""
+
+    def retract_tag(self, new_tag_str: str, dry_run: bool) -> None:
+        """Nothing to retract."""
+
+    def publish_tag(self, new_tag_str: str, dry_run: bool) -> None:
+        """Publish tag."""
+        if self.commit is None:
+            self.commit = resolve_remote_ref(remote=self.remote)
+        logger.debug(f"Tagging {self.commit}")
+        push_remote_tag(remote=self.remote, tag_str=new_tag_str, commit=self.commit, dry_run=dry_run)
+
+    async def publish_tag_async(self, new_tag_str: str, dry_run: bool, transport: AsyncGit) -> None:
+        """Publish tag on asyncio."""
+        await asyncio.to_thread(self.publish_tag, new_tag_str, dry_run)
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def update(
+        self,
+        bump_type: str,
+        dry_run: bool,
+        commit_message: Optional[str] = None,
+        auto_message: bool = False,
+        version_file: Optional[str] = None,
+        retries: int = 0,
+        stamps: Sequence[Stamp] = (),
+        plumbing: bool = False,
+    ) -> str:
+        """Update."""
+        if commit_message or auto_message or version_file or stamps or plumbing:
+            raise ValueError("Remote only mode can't commit (no message, version file, stamps or plumbing commit)")
+        bump_type = self.resolve_bump_type(bump_type)
+        with self.timings.span("update"):
+            new_version = self.next_version(bump_type)
+            logger.info(f"💡 Update from {self.latest_version} with {bump_type} to {new_version}")
+            new_tag_str = f"{self.version_prefix}{new_version}"
+
+            if dry_run:
+                logger.warning("⚠️ Dry run (no tag set or pushed)")
+
+            logger.info("📤 Pushing...")
+            with self.timings.span("push"):
+                new_tag_str = self.push_tag(new_tag_str, bump_type=bump_type, retries=retries, dry_run=dry_run)
+
+        return self.announce_tag(new_tag_str)
+
+
+class MultiSemverGit:  # pylint: disable=too-many-instance-attributes
+    """SemverGit of several components (tag prefixes)."""
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        prefixes: Sequence[str],
+        use_cache: bool = True,
+        repo: Optional[Repo] = None,
+        fetch_tags: bool = False,
+        remotes: Sequence[str] = ("origin",),
+        timings: Optional[Timings] = None,
+        strict: bool = False,
+        reachable_from: Optional[str] = None,
+        line: Optional[str] = None,
+    ) -> None:
+        """Init."""
+        if not prefixes:
+            raise ValueError("No component prefixes")
+        self.trie = PrefixTrie(prefixes)
+        self.timings = timings if timings is not None else Timings()
+        self.remotes = tuple(remotes)
+        self.fetch_tags = fetch_tags
+        self.use_cache = use_cache
+        self.strict = strict
+        self.reachable_from = reachable_from
+        # Every component bumps on the same maintenance line
+        self.line = line
+        self.owns_repo = repo is None
+        if repo is not None:
+            self.current_repo = repo
+
+    def __enter__(self) -> "MultiSemverGit":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close repo."""
+        # An injected repo is shared with the caller, who closes it
+        if self.owns_repo and "current_repo" in self.__dict__:
+            close_repo(repo=self.current_repo)
+
+    @property
+    def prefixes(self) -> List[str]:
+        """Component prefixes."""
+        return self.trie.prefixes
+
+    @cached_property
+    def current_repo(self) -> Repo:
+        """Current repo."""
+        with self.timings.span("get_repo"):
+            return get_repo()
+
+    @cached_property
+    def components(self) -> Dict[str, SemverGit]:
+        """SemverGit of each component."""
+        if self.fetch_tags:
+            logger.info("Fetching tags...")
+            with self.timings.span("fetch_tags"):
+                prefix = common_prefix(self.prefixes)
+                fetch_remote_tags(repo=self.current_repo, prefix=prefix, remote=self.remotes[0])
+        return {
+            prefix: SemverGit(
+                repo=self.current_repo,
+                remotes=self.remotes,
+                timings=self.timings,
+                use_cache=self.use_cache,
+                strict=self.strict,
+                reachable_from=self.reachable_from,
+                version_prefix=prefix,
+                tag_source=self.component_tags,
+                line=self.line,
+            )
+            for prefix in self.prefixes
+        }
+
+    @cached_property
+    def tag_partition(self) -> Dict[str, List[str]]:
+        """Tags of each component."""
+        with self.timings.span("scan_tags"):
+            tags = get_tags_with_prefix(repo=self.current_repo, prefix=common_prefix(self.prefixes))
+            partition = self.trie.partition(tags)
+        self.timings.count("tags_scanned", len(tags))
+        logger.debug(f"Partitioned {len(tags)} tags into {len(partition)} components")
+        return partition
+
+    def component_tags(self, prefix: str) -> List[str]:
+        """Tags of a component."""
+        return self.tag_partition[prefix]
+
+    def component(self, prefix: str) -> SemverGit:
+        """SemverGit of a component."""
+        try:
+            return self.components[prefix]
+        except KeyError as exp:
+            raise ValueError(f"Unknown component {prefix} (components: {', '.join(self.prefixes)})") from exp
+
+    def update(self, bumps: Mapping[str, str], dry_run: bool) -> List[str]:
+        """Update."""
+        new_tags = []
+        with self.timings.span("update"):
+            for prefix, bump_type in bumps.items():
+                svg = self.component(prefix)
+                bump_type = svg.resolve_bump_type(bump_type)
+                new_version = svg.next_version(bump_type)
+                logger.info(f"💡 Update {prefix} from {svg.latest_version} with {bump_type} to {new_version}")
+                new_tags.append(f"{prefix}{new_version}")
+            if dry_run:
+                logger.warning("⚠️ Dry run (no tag set or pushed)")
+            with self.timings.span("create_tags"):
+                for new_tag_str in new_tags:
+                    set_tag(repo=self.current_repo, tag=new_tag_str, dry_run=dry_run)
+            logger.info("📤 Pushing...")
+            with self.timings.span("push"):
+                try:
+                    push_refs(
+                        repo=self.current_repo,
+                        refspecs=[f"{TAGS_REF}{new_tag_str}" for new_tag_str in new_tags],
+                        remotes=self.remotes,
+                        dry_run=dry_run,
+                    )
+                except GitCommandError as exp:
+                    retract_unpushed_tags(repo=self.current_repo, tags=new_tags, error=exp, dry_run=dry_run)
+                    raise
+                finally:
+                    # The new tags change the versions of the components
+                    self.__dict__.pop("tag_partition", None)
+                    for prefix in bumps:
+                        self.components[prefix].invalidate()
+        logger.success(f"⭐ New version tags: {', '.join(new_tags)}")
+        return new_tags
@@ -0,0 +1,97 @@
+"""Batch utilities."""
+
+import json
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Optional
+
+from semvergit.app import SemverGit
+from semvergit.bump_utils import BumpType
+from semvergit.git_utils import close_repo, get_repo
+from semvergit.log_utils import logger
+from semvergit.timing_utils import Timings
+
+BATCH_WORKERS = 8
+
+
+class BatchJob(NamedTuple):
+    """Bump of a repository."""
+
+    repo: str
+    bump_type: str
+
+
+def make_job(repo: str, bump_type: Optional[str], default_bump_type: Optional[str]) -> BatchJob:
+    """Make job."""
+    bump_type = bump_type or default_bump_type
+    if not repo:
+        raise ValueError("Missing repository path")
+    if bump_type is None:
+        raise ValueError(f"Missing bump type of {repo}, use {repo}=BUMP_TYPE or --bump_type")
+    try:
+        return BatchJob(repo=repo, bump_type=str(BumpType(bump_type)))
+    except ValueError as exp:
+        raise ValueError(f"Invalid bump type {bump_type} of {repo}, use {BumpType.print_options()}") from exp
+
+
+def parse_job(spec: str, default_bump_type: Optional[str] = None) -> BatchJob:
+    """Parse job, PATH[=BUMP_TYPE]."""
+    repo, _, bump_type = spec.partition("=")
+    return make_job(repo, bump_type, default_bump_type)
+
+
+def parse_job_line(line: str, default_bump_type: Optional[str] = None) -> BatchJob:
+    """Parse job line."""
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError(f'Invalid job {line.strip()}, use {{"repo": PATH, "bump_type": BUMP_TYPE}}')
+    return make_job(str(record.get("repo") or ""), record.get("bump_type"), default_bump_type)
+
+
+def iter_jobs(
+    specs: Iterable[str], lines: Iterable[str], default_bump_type: Optional[str] = None
+) -> Iterator[BatchJob]:
+    """Iterate jobs."""
+    for spec in specs:
+        yield parse_job(spec, default_bump_type)
+    for line in lines:
+        if line.strip():
+            yield parse_job_line(line, default_bump_type)
+
+
+def run_job(job: BatchJob, dry_run: bool, retries: int, svg_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Run job."""
+    timings = Timings()
+    record: Dict[str, Any] = {"repo": job.repo, "bump_type": job.bump_type, "tag": None, "error": None}
+    start = time.perf_counter()
+    try:
+        repo = get_repo(job.repo)
+        try:
+            svg = SemverGit(repo=repo, timings=timings, **svg_kwargs)
+            svg.echo_tag = False
+            record["tag"] = svg.update(bump_type=job.bump_type, dry_run=dry_run, retries=retries)
+        finally:
+            close_repo(repo)
+    except Exception as exp:  # pylint: disable=broad-exception-caught
+        logger.error(f"Bump of {job.repo} failed ({exp})")
+        record["error"] = f"{type(exp).__name__}: {exp}"
+    record["seconds"] = time.perf_counter() - start
+    record["timings"] = {span["name"]: span["seconds"] for span in timings.report()["spans"]}
+    return record
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def run_batch(
+    jobs: Iterable[BatchJob],
+    dry_run: bool,
+    retries: int = 0,
+    svg_kwargs: Optional[Dict[str, Any]] = None,
+    workers: int = BATCH_WORKERS,
+    processes: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """Run batch."""
+    executor: Executor = (ProcessPoolExecutor if processes else ThreadPoolExecutor)(max_workers=workers)
+    with executor:
+        futures = [executor.submit(run_job, job, dry_run, retries, svg_kwargs or {}) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
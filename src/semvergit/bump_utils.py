@@ -0,0 +1,22 @@
+"""Bump utilities."""
+
+from enum import Enum
+
+
+class BumpType(str, Enum):
+    """BumpType."""
+
+    MAJOR = "major"
+    MINOR = "minor"
+    PATCH = "patch"
+    PRERELEASE = "prerelease"
+    # Major, minor or patch from the Conventional Commits messages since the latest version
+    AUTO = "auto"
+
+    def __str__(self) -> str:
+        return self.value
+
+    @classmethod
+    def print_options(cls) -> str:
+        """Print options."""
+        return f"{[str(bump_type) for bump_type in list(cls)]}"
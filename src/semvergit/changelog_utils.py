@@ -0,0 +1,99 @@
+"""Changelog utilities."""
+
+import json
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from git import Repo
+
+from semvergit.git_utils import stream_git
+from semvergit.log_utils import logger
+from semvergit.ref_utils import TAGS_REF
+from semvergit.version_utils import PartsLike, PrecedenceKey, format_parts, precedence_key
+
+DECORATION_TAG = "tag: "
+
+
+class LogEntry(NamedTuple):
+    """Commit of the log."""
+
+    sha: str
+    date: str
+    tags: List[str]
+    subject: str
+
+
+class Section(NamedTuple):
+    """Changelog section."""
+
+    tag: Optional[str]
+    date: Optional[str]
+    commits: List[LogEntry]
+
+
+def iter_log_entries(repo: Repo, rev_range: str, prefix: str = "v") -> Iterator[LogEntry]:
+    """Iterate log entries."""
+    args = ["-z", "--topo-order", f"--decorate-refs={TAGS_REF}{prefix}*", "--format=%H%n%cs%n%D%n%s", rev_range]
+    for record in stream_git(repo, "log", *args, separator=b"\0"):
+        sha, date, decorations, subject = record.split("\n", 3)
+        tags = [item[len(DECORATION_TAG) :] for item in decorations.split(", ") if item.startswith(DECORATION_TAG)]
+        yield LogEntry(sha=sha, date=date, tags=tags, subject=subject)
+
+
+def iter_sections(entries: Iterable[LogEntry], version_tags: Dict[str, PrecedenceKey]) -> Iterator[Section]:
+    """Iterate sections."""
+    section = Section(tag=None, date=None, commits=[])
+    for entry in entries:
+        tags = [tag for tag in entry.tags if tag in version_tags]
+        if tags:
+            if section.commits:
+                yield section
+            # Several versions of one commit make a single section (of the latest version)
+            section = Section(tag=max(tags, key=version_tags.__getitem__), date=entry.date, commits=[])
+        section.commits.append(entry)
+    if section.commits:
+        yield section
+
+
+def iter_changelog(repo: Repo, rev_range: str, prefix: str, version_parts: Iterable[PartsLike]) -> Iterator[Section]:
+    """Iterate changelog."""
+    version_tags = {f"{prefix}{format_parts(parts)}": precedence_key(parts) for parts in version_parts}
+    return iter_sections(iter_log_entries(repo, rev_range, prefix=prefix), version_tags)
+
+
+def section_record(section: Section) -> Dict[str, Any]:
+    """Section record."""
+    return {
+        "tag": section.tag,
+        "date": section.date,
+        "commits": [{"sha": entry.sha, "subject": entry.subject} for entry in section.commits],
+    }
+
+
+def write_markdown(sections: Iterable[Section], output: IO[str]) -> int:
+    """Write markdown changelog."""
+    output.write("# Changelog\n")
+    count = 0
+    for count, section in enumerate(sections, start=1):
+        title = f"{section.tag} ({section.date})" if section.tag else "Unreleased"
+        lines = "".join(f"- {entry.subject} ({entry.sha[:7]})\n" for entry in section.commits)
+        output.write(f"\n## {title}\n\n{lines}")
+    return count
+
+
+def write_json(sections: Iterable[Section], output: IO[str]) -> int:
+    """Write JSON changelog."""
+    count = 0
+    for count, section in enumerate(sections, start=1):
+        output.write(f"{'[' if count == 1 else ','}\n{json.dumps(section_record(section))}")
+    output.write("\n]\n" if count else "[]\n")
+    return count
+
+
+WRITERS: Dict[str, Callable[[Iterable[Section], IO[str]], int]] = {"markdown": write_markdown, "json": write_json}
+
+
+def write_changelog(sections: Iterable[Section], output: IO[str], output_format: str = "markdown") -> int:
+    """Write changelog."""
+    count = WRITERS[output_format](sections, output)
+    logger.debug(f"Wrote {count} changelog sections ({output_format})")
+    return count
@@ -1,27 +1,94 @@
 """CLI for semvergit."""
 
+import json
 import sys
-from typing import Optional
+from contextlib import contextmanager, nullcontext
+from functools import partial
+from typing import IO, TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import click
 
-from semvergit.app import BumpType, SemverGit
-from semvergit.log_utils import LogLevel, set_logger
+from semvergit import __version__
+from semvergit.bump_utils import BumpType
+
+if TYPE_CHECKING:  # pragma: no cover
+    from semvergit.app import SemverGit
+    from semvergit.file_utils import Stamp
 
 
 def validate_bump_type(
-    ctx: click.Context, param: click.Parameter, value: str  # pylint: disable=unused-argument
-) -> BumpType:
+    ctx: click.Context, param: click.Parameter, value: Optional[str]  # pylint: disable=unused-argument
+) -> Optional[BumpType]:
     """Validate bump type."""
+    if value is None:
+        return None
     try:
         return BumpType(value)
     except ValueError as exp:
         raise click.BadParameter(f"Please use {BumpType.print_options()}") from exp
 
 
+def validate_stamps(
+    ctx: click.Context, param: click.Parameter, value: Tuple[str, ...]  # pylint: disable=unused-argument
+) -> List["Stamp"]:
+    """Validate stamps."""
+    if not value:
+        return []
+    from semvergit.file_utils import parse_stamp  # pylint: disable=import-outside-toplevel
+
+    stamps = []
+    for spec in value:
+        try:
+            stamps.extend(parse_stamp(spec))
+        except ValueError as exp:
+            raise click.BadParameter(str(exp)) from exp
+    return stamps
+
+
+def remote_only_url(remote: str) -> str:
+    """Remote only URL."""
+    from semvergit.git_utils import resolve_remote_url  # pylint: disable=import-outside-toplevel
+
+    # The tag is pushed from a temporary repository, remote names only resolve here
+    try:
+        return resolve_remote_url(remote)
+    except ValueError as exp:
+        raise click.BadParameter(str(exp), param_hint="--remote") from exp
+
+
+def validate_line(
+    ctx: click.Context, param: click.Parameter, value: Optional[str]  # pylint: disable=unused-argument
+) -> Optional[str]:
+    """Validate the maintenance line, MAJOR or MAJOR.MINOR."""
+    if value is None:
+        return None
+    from semvergit.version_utils import parse_line  # pylint: disable=import-outside-toplevel
+
+    try:
+        return parse_line(value)
+    except ValueError as exp:
+        raise click.BadParameter(str(exp)) from exp
+
+
+def validate_component_bumps(
+    ctx: click.Context, param: click.Parameter, value: Tuple[str, ...]  # pylint: disable=unused-argument
+) -> Dict[str, str]:
+    """Validate the component bumps, PREFIX=BUMP_TYPE."""
+    from semvergit.prefix_utils import parse_component_bump  # pylint: disable=import-outside-toplevel
+
+    bumps = {}
+    for spec in value:
+        try:
+            prefix, bump_type = parse_component_bump(spec)
+            bumps[prefix] = str(BumpType(bump_type))
+        except ValueError as exp:
+            raise click.BadParameter(f"{exp}, bump types: {BumpType.print_options()}") from exp
+    return bumps
+
+
 # pylint: disable=too-many-arguments
 @click.group(invoke_without_command=True, no_args_is_help=True)
-@click.version_option()
+@click.version_option(version=__version__)
 @click.option("--dry_run", "-d", is_flag=True, help="Dry run", default=False)
 @click.option("--verbose", "-v", count=True, help="Verbose level", default=0, type=click.IntRange(0, 2))
 @click.option(
@@ -42,17 +109,413 @@ def validate_bump_type(
     default=None,
     type=click.Path(exists=True, file_okay=True, dir_okay=False, resolve_path=True, readable=True, writable=True),
 )
-def cli(  # pylint: disable=too-many-positional-arguments
-    bump_type: str, verbose: int, dry_run: bool, message: Optional[str], auto_message: bool, version_file: str
+@click.option(
+    "--stamp",
+    "-s",
+    "stamps",
+    envvar="STAMP",
+    help="Stamp the version into files, PATH[=PATTERN] (globs, e.g. 'packages/*/package.json'), repeatable",
+    multiple=True,
+    callback=validate_stamps,
+)
+@click.option(
+    "--plumbing_commit",
+    envvar="PLUMBING_COMMIT",
+    is_flag=True,
+    help=(
+        "Commit HEAD and the version files only, with git plumbing (the index isn't loaded into Python, only the "
+        "version file entries are updated, staged changes are left out)"
+    ),
+    default=False,
+)
+@click.option("--no_cache", is_flag=True, help="Don't use the version index cache", default=False)
+@click.option(
+    "--fetch_tags", is_flag=True, help="Fetch the version tags from the remote (no branch pull)", default=False
+)
+@click.option(
+    "--remote_only", is_flag=True, help="Use the remote tags only (ls-remote, no local clone needed)", default=False
+)
+@click.option(
+    "--remote",
+    "-r",
+    envvar="REMOTE",
+    help="Remote (name, URL or path), repeat to push to several remotes",
+    default=("origin",),
+    multiple=True,
+    show_default=True,
+)
+@click.option("--commit", "-c", envvar="COMMIT", help="Commit to tag in remote only mode [remote HEAD]", default=None)
+@click.option(
+    "--retries",
+    envvar="RETRIES",
+    help="Retries when a concurrent job pushed the same tag first (tag only updates)",
+    default=0,
+    show_default=True,
+    type=click.IntRange(min=0),
+)
+@click.option(
+    "--strict", is_flag=True, help="Fail on tags that aren't valid versions (skipped by default)", default=False
+)
+@click.option(
+    "--reachable_from",
+    envvar="REACHABLE_FROM",
+    help="Only use the tags reachable from this ref (e.g. HEAD on release branches)",
+    default=None,
+)
+@click.option(
+    "--line",
+    envvar="VERSION_LINE",
+    help="Bump from the latest version of this line (MAJOR or MAJOR.MINOR, e.g. 1.4) instead of the latest version",
+    default=None,
+    callback=validate_line,
+)
+@click.option(
+    "timings_path",
+    "--timings",
+    envvar="TIMINGS",
+    help="Write a JSON report of the time spent per phase to this file (- for stderr)",
+    default=None,
+)
+@click.option(
+    "log_json",
+    "--log_json",
+    envvar="LOG_JSON",
+    help="Write the logs as JSON lines to this file (- for stderr, instead of the text logs)",
+    default=None,
+)
+@click.pass_context
+def cli(  # pylint: disable=too-many-positional-arguments,too-many-locals
+    ctx: click.Context,
+    bump_type: Optional[str],
+    verbose: int,
+    dry_run: bool,
+    message: Optional[str],
+    auto_message: bool,
+    version_file: str,
+    stamps: List["Stamp"],
+    plumbing_commit: bool,
+    no_cache: bool,
+    fetch_tags: bool,
+    remote_only: bool,
+    remote: Tuple[str, ...],
+    commit: Optional[str],
+    retries: int,
+    strict: bool,
+    reachable_from: Optional[str],
+    line: Optional[str],
+    timings_path: Optional[str],
+    log_json: Optional[str],
 ) -> None:
     """CLI for semvergit."""
-    set_logger(log_level=LogLevel(verbose))
-    svg = SemverGit()
-    svg.update(
-        bump_type=bump_type,
-        dry_run=dry_run,
-        commit_message=message,
-        auto_message=auto_message,
-        version_file=version_file,
-    )
+    # Heavy imports (GitPython, semver, loguru) are deferred until a git operation is needed
+    # pylint: disable-next=import-outside-toplevel
+    from semvergit.app import InvalidTagError, RemoteSemverGit, SemverGit, Timings, VersionLineError
+    from semvergit.log_utils import LogLevel, set_logger  # pylint: disable=import-outside-toplevel
+
+    if remote_only and any((message, auto_message, version_file, stamps, plumbing_commit)):
+        raise click.UsageError(
+            "--remote_only can only create tags"
+            " (no --message, --auto_message, --version_file, --stamp or --plumbing_commit)"
+        )
+    if remote_only and len(remote) > 1:
+        raise click.UsageError("--remote_only works with a single --remote")
+    if remote_only and bump_type == BumpType.AUTO:
+        raise click.UsageError("--remote_only can't read the commits (no auto bump type)")
+    if remote_only and reachable_from:
+        raise click.UsageError("--remote_only can't check reachability (no local history)")
+    if timings_path and ctx.invoked_subcommand == "batch":
+        raise click.UsageError("batch reports the timings of each job in its result lines (no --timings)")
+    set_logger(log_level=LogLevel(verbose), json_sink=log_json)
+    timings = Timings() if timings_path else None
+    if ctx.invoked_subcommand is not None:
+        if timings_path and timings is not None:
+            # The report is written once the subcommand is done (even when it fails)
+            ctx.call_on_close(partial(timings.write, timings_path))
+            ctx.with_resource(timings.track_git())
+        ctx.obj = {
+            "dry_run": dry_run,
+            "remote_only": remote_only,
+            "timings": timings,
+            "svg_kwargs": {
+                "use_cache": not no_cache,
+                "fetch_tags": fetch_tags,
+                "remotes": remote,
+                "strict": strict,
+                "reachable_from": reachable_from,
+                "line": line,
+            },
+            # Resolved only when a subcommand runs in remote only mode
+            "remote": remote[0],
+            "remote_kwargs": {"commit": commit, "strict": strict, "line": line},
+        }
+        return
+    if bump_type is None:
+        raise click.UsageError(f"Missing --bump_type, please use {BumpType.print_options()}")
+    try:
+        with timings.track_git() if timings else nullcontext():
+            svg = (
+                RemoteSemverGit(
+                    remote=remote_only_url(remote[0]), commit=commit, timings=timings, strict=strict, line=line
+                )
+                if remote_only
+                else SemverGit(
+                    use_cache=not no_cache,
+                    fetch_tags=fetch_tags,
+                    remotes=remote,
+                    timings=timings,
+                    strict=strict,
+                    reachable_from=reachable_from,
+                    line=line,
+                )
+            )
+            with svg:
+                svg.update(
+                    bump_type=bump_type,
+                    dry_run=dry_run,
+                    commit_message=message,
+                    auto_message=auto_message,
+                    version_file=version_file,
+                    retries=retries,
+                    stamps=stamps,
+                    plumbing=plumbing_commit,
+                )
+    except (InvalidTagError, VersionLineError) as exp:
+        raise click.ClickException(str(exp)) from exp
+    finally:
+        if timings_path and timings is not None:
+            timings.write(timings_path)
     sys.exit(0)
+
+
+@cli.command()
+@click.option("--host", help="Host to listen on", default="127.0.0.1", show_default=True)
+@click.option("--port", "-p", help="Port to listen on", default=8765, show_default=True, type=click.IntRange(0, 65535))
+@click.option("--socket", "socket_path", help="Unix socket to listen on (instead of host and port)", default=None)
+@click.option("--lease", help="Lease time in seconds", default=30.0, show_default=True, type=click.FloatRange(min=0))
+@click.option(
+    "--flush_interval",
+    help="Seconds between the batched pushes of the confirmed tags",
+    default=1.0,
+    show_default=True,
+    type=click.FloatRange(min=0),
+)
+@click.option("--batch_size", help="Maximum tags per push", default=100, show_default=True, type=click.IntRange(min=1))
+@click.pass_obj
+def serve(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    obj: Dict[str, Any],
+    host: str,
+    port: int,
+    socket_path: Optional[str],
+    lease: float,
+    flush_interval: float,
+    batch_size: int,
+) -> None:
+    """Serve version leases to build jobs (confirmed tags are pushed in batches)."""
+    from semvergit.app import SemverGit  # pylint: disable=import-outside-toplevel
+    from semvergit.server import VersionAllocator, make_server, run_server  # pylint: disable=import-outside-toplevel
+
+    if obj["remote_only"]:
+        raise click.UsageError("serve needs a local clone (no --remote_only)")
+    with SemverGit(timings=obj["timings"], **obj["svg_kwargs"]) as svg:
+        allocator = VersionAllocator(
+            svg, lease_seconds=lease, flush_interval=flush_interval, batch_size=batch_size, dry_run=obj["dry_run"]
+        )
+        try:
+            server = make_server(allocator, host=host, port=port, socket_path=socket_path)
+        except ValueError as exp:
+            raise click.BadParameter(str(exp), param_hint="--socket") from exp
+        run_server(server, allocator)
+
+
+@contextmanager
+def open_semvergit(obj: Dict[str, Any]) -> Iterator["SemverGit"]:
+    """Open SemverGit."""
+    # pylint: disable-next=import-outside-toplevel
+    from semvergit.app import InvalidTagError, RemoteSemverGit, SemverGit, VersionLineError
+
+    try:
+        with (
+            RemoteSemverGit(remote=remote_only_url(obj["remote"]), timings=obj["timings"], **obj["remote_kwargs"])
+            if obj["remote_only"]
+            else SemverGit(timings=obj["timings"], **obj["svg_kwargs"])
+        ) as svg:
+            yield svg
+    except (InvalidTagError, VersionLineError) as exp:
+        raise click.ClickException(str(exp)) from exp
+
+
+def echo_result(result: Any, text: str, as_json: bool) -> None:
+    """Echo the result as JSON or as text."""
+    click.echo(json.dumps(result) if as_json else text)
+
+
+json_option = click.option("as_json", "--json", is_flag=True, help="JSON output", default=False)
+
+
+@cli.command()
+@json_option
+@click.pass_obj
+def latest(obj: Dict[str, Any], as_json: bool) -> None:
+    """Show the latest version (nothing is tagged)."""
+    from semvergit.version_utils import latest_parts, version_record  # pylint: disable=import-outside-toplevel
+
+    with open_semvergit(obj) as svg:
+        parts = latest_parts(svg.version_parts) if svg.line is None else svg.version_lines.get(svg.line)
+        record = version_record(parts, svg.version_prefix) if parts is not None else None
+    if record is None and not as_json:
+        raise click.ClickException("No versions found")
+    echo_result(record, record["tag"] if record else "", as_json)
+
+
+@cli.command(name="next")
+@click.option(
+    "--bump_type",
+    "-t",
+    envvar="BUMP_TYPE",
+    type=click.UNPROCESSED,
+    help=f"Bump Type {BumpType.print_options()}",
+    callback=validate_bump_type,
+    required=True,
+)
+@json_option
+@click.pass_obj
+def next_version(obj: Dict[str, Any], bump_type: str, as_json: bool) -> None:
+    """Show the next version (nothing is tagged)."""
+    from semvergit.version_utils import version_parts, version_record  # pylint: disable=import-outside-toplevel
+
+    with open_semvergit(obj) as svg:
+        latest_version = svg.latest_version
+        try:
+            resolved = svg.resolve_bump_type(str(bump_type))
+        except ValueError as exp:
+            raise click.UsageError(str(exp)) from exp
+        record = version_record(version_parts(svg.next_version(resolved)), svg.version_prefix)
+    record.update({"bump_type": resolved, "latest": str(latest_version)})
+    echo_result(record, record["tag"], as_json)
+
+
+@cli.command(name="list")
+@click.option("--range", "version_range", help="Version range, e.g. '>=1.0.0,<2.0.0'", default=None)
+@click.option("--limit", "-n", help="Only the latest N versions", default=None, type=click.IntRange(min=1))
+@json_option
+@click.pass_obj
+def list_versions(obj: Dict[str, Any], version_range: Optional[str], limit: Optional[int], as_json: bool) -> None:
+    """List the versions, oldest first (nothing is tagged)."""
+    # pylint: disable-next=import-outside-toplevel
+    from semvergit.version_utils import in_range, parse_range, precedence_key, top_parts, version_record
+
+    try:
+        bounds = parse_range(version_range) if version_range else []
+    except ValueError as exp:
+        raise click.BadParameter(str(exp), param_hint="--range") from exp
+    with open_semvergit(obj) as svg:
+        matching = (parts for parts in svg.version_parts if in_range(parts, bounds))
+        selected = top_parts(matching, limit)[::-1] if limit else sorted(matching, key=precedence_key)
+        records = [version_record(parts, svg.version_prefix) for parts in selected]
+    echo_result(records, "\n".join(record["tag"] for record in records), as_json)
+
+
+@cli.command()
+@click.option(
+    "output_format",
+    "--format",
+    help="Output format",
+    default="markdown",
+    show_default=True,
+    type=click.Choice(["markdown", "json"]),
+)
+@click.option("--output", "-o", help="Output file", default="-", type=click.File("w", lazy=True))
+@click.option("--since", help="Only the commits after this tag (e.g. the previous release)", default=None)
+@click.pass_obj
+def changelog(obj: Dict[str, Any], output_format: str, output: IO[str], since: Optional[str]) -> None:
+    """Write the changelog, the commits of each version newest first (nothing is tagged)."""
+    from git import GitCommandError  # pylint: disable=import-outside-toplevel
+
+    from semvergit.changelog_utils import iter_changelog, write_changelog  # pylint: disable=import-outside-toplevel
+
+    if obj["remote_only"]:
+        raise click.UsageError("changelog needs a local clone (no --remote_only)")
+    with open_semvergit(obj) as svg:
+        head = svg.reachable_from or "HEAD"
+        rev_range = f"{since}..{head}" if since else head
+        sections = iter_changelog(svg.current_repo, rev_range, svg.version_prefix, svg.version_parts)
+        try:
+            write_changelog(sections, output, output_format)
+        except GitCommandError as exp:
+            raise click.ClickException(f"Can't read the commits of {rev_range} ({exp.stderr.strip()})") from exp
+
+
+@cli.command()
+@click.argument("bumps", nargs=-1, required=True, callback=validate_component_bumps)
+@json_option
+@click.pass_obj
+def bump(obj: Dict[str, Any], bumps: Dict[str, str], as_json: bool) -> None:
+    """Bump several components (PREFIX=BUMP_TYPE, e.g. api/v=minor web/v=patch), their tags are pushed together."""
+    # pylint: disable-next=import-outside-toplevel
+    from semvergit.app import InvalidTagError, MultiSemverGit, VersionLineError
+
+    if obj["remote_only"]:
+        raise click.UsageError("bump needs a local clone (no --remote_only)")
+    try:
+        with MultiSemverGit(list(bumps), timings=obj["timings"], **obj["svg_kwargs"]) as multi_svg:
+            new_tags = multi_svg.update(bumps, dry_run=obj["dry_run"])
+    except (InvalidTagError, VersionLineError) as exp:
+        raise click.ClickException(str(exp)) from exp
+    echo_result(new_tags, "\n".join(new_tags), as_json)
+
+
+@cli.command()
+@click.argument("jobs", nargs=-1)
+@click.option(
+    "--bump_type",
+    "-t",
+    envvar="BUMP_TYPE",
+    type=click.UNPROCESSED,
+    help=f"Bump Type of the jobs without one {BumpType.print_options()}",
+    callback=validate_bump_type,
+)
+@click.option(
+    "--workers", "-w", help="Repositories bumped at once", default=8, show_default=True, type=click.IntRange(min=1)
+)
+@click.option(
+    "--processes", is_flag=True, help="Run the jobs in processes (many tags to parse) instead of threads", default=False
+)
+@click.option(
+    "--retries",
+    envvar="RETRIES",
+    help="Retries when a concurrent job pushed the same tag first",
+    default=0,
+    show_default=True,
+    type=click.IntRange(min=0),
+)
+@click.pass_obj
+def batch(  # pylint: disable=too-many-positional-arguments
+    obj: Dict[str, Any], jobs: Tuple[str, ...], bump_type: Optional[str], workers: int, processes: bool, retries: int
+) -> None:
+    """Bump many repositories, PATH[=BUMP_TYPE] or JSON lines on stdin ({"repo": PATH, "bump_type": BUMP_TYPE}).
+
+    One JSON result line is written per repository as it completes, a failure doesn't stop the others.
+    """
+    from semvergit.batch_utils import iter_jobs, run_batch  # pylint: disable=import-outside-toplevel
+
+    if obj["remote_only"]:
+        raise click.UsageError("batch needs local clones (no --remote_only)")
+    lines: Iterable[str] = () if jobs else sys.stdin
+    try:
+        batch_jobs = list(iter_jobs(jobs, lines, bump_type))
+    except ValueError as exp:
+        raise click.BadParameter(str(exp), param_hint="JOBS") from exp
+    failed = 0
+    results = run_batch(
+        batch_jobs,
+        dry_run=obj["dry_run"],
+        retries=retries,
+        svg_kwargs=obj["svg_kwargs"],
+        workers=workers,
+        processes=processes,
+    )
+    for record in results:
+        click.echo(json.dumps(record))
+        failed += record["error"] is not None
+    if failed:
+        raise click.ClickException(f"{failed} of {len(batch_jobs)} repositories failed")
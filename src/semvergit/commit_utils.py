@@ -0,0 +1,142 @@
+"""Commit utilities."""
+
+import json
+import os
+import re
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from git import Repo
+
+from semvergit.bump_utils import BumpType
+from semvergit.file_utils import write_atomic
+from semvergit.git_utils import Messages, iter_commit_messages, iter_commit_shas
+from semvergit.index_utils import INDEX_DIR
+from semvergit.log_utils import logger
+
+BUMPS_FILE = "bumps.json"
+BUMPS_FORMAT = 1
+# Commits per git log of the uncached commits (keeps the command line short)
+LOG_CHUNK = 1000
+
+# Conventional Commits headers, see https://www.conventionalcommits.org
+HEADER_REGEX = re.compile(r"(?P<type>[a-zA-Z]+)(?:\([^()\r\n]*\))?(?P<breaking>!)?: ")
+BREAKING_REGEX = re.compile(r"^BREAKING[ -]CHANGE: ", re.MULTILINE)
+MINOR_TYPES = frozenset({"feat"})
+BUMP_RANKS = {BumpType.PATCH: 0, BumpType.MINOR: 1, BumpType.MAJOR: 2}
+
+
+def classify_message(message: str) -> BumpType:
+    """Classify message."""
+    match = HEADER_REGEX.match(message)
+    if (match is not None and match["breaking"]) or BREAKING_REGEX.search(message):
+        return BumpType.MAJOR
+    if match is not None and match["type"].lower() in MINOR_TYPES:
+        return BumpType.MINOR
+    return BumpType.PATCH
+
+
+def highest_bump(bump_types: Iterable[BumpType]) -> Optional[BumpType]:
+    """Highest bump type."""
+    highest = None
+    for bump_type in bump_types:
+        if highest is None or BUMP_RANKS[bump_type] > BUMP_RANKS[highest]:
+            highest = bump_type
+        if highest == BumpType.MAJOR:
+            break
+    return highest
+
+
+class BumpCache:
+    """Bump type cache."""
+
+    def __init__(self, git_dir: str) -> None:
+        """Init."""
+        self.path = os.path.join(git_dir, INDEX_DIR, BUMPS_FILE)
+        self.bumps: Dict[str, str] = self.load()
+        # Commits looked up since the cache was loaded, only they are saved
+        self.used: Set[str] = set()
+        self.changed = False
+
+    def load(self) -> Dict[str, str]:
+        """Load cache."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as bumps_handle:
+                data = json.load(bumps_handle)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as exp:
+            logger.debug(f"Ignoring unreadable bump cache {self.path} ({exp})")
+            return {}
+        if not isinstance(data, dict) or data.get("format") != BUMPS_FORMAT:
+            logger.debug(f"Ignoring incompatible bump cache {self.path}")
+            return {}
+        return data["bumps"]
+
+    def save(self) -> None:
+        """Save cache."""
+        stale = self.bumps.keys() - self.used
+        if stale:
+            logger.debug(f"Pruning {len(stale)} commits from the bump cache")
+            self.bumps = {sha: bump_type for sha, bump_type in self.bumps.items() if sha in self.used}
+            self.changed = True
+        if not self.changed:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        write_atomic(self.path, json.dumps({"format": BUMPS_FORMAT, "bumps": self.bumps}))
+        self.changed = False
+        logger.debug(f"Saved bump cache {self.path}")
+
+    def get(self, sha: str) -> Optional[BumpType]:
+        """Cached bump type of a commit."""
+        self.used.add(sha)
+        bump_type = self.bumps.get(sha)
+        return BumpType(bump_type) if bump_type is not None else None
+
+    def set(self, sha: str, bump_type: BumpType) -> None:
+        """Cache the bump type of a commit."""
+        self.used.add(sha)
+        self.bumps[sha] = str(bump_type)
+        self.changed = True
+
+
+def iter_uncached_messages(repo: Repo, shas: List[str]) -> Messages:
+    """Iterate uncached messages."""
+    for start in range(0, len(shas), LOG_CHUNK):
+        yield from iter_commit_messages(repo, *shas[start : start + LOG_CHUNK], no_walk=True)
+
+
+def classify_messages(messages: Iterable[Tuple[str, str]], cache: Optional[BumpCache]) -> Iterator[BumpType]:
+    """Classify messages."""
+    for sha, message in messages:
+        bump_type = classify_message(message)
+        if cache is not None:
+            cache.set(sha, bump_type)
+        yield bump_type
+
+
+def classify_commits(repo: Repo, rev_range: str, cache: Optional[BumpCache] = None) -> Optional[BumpType]:
+    """Classify commits."""
+    cached: List[BumpType] = []
+    messages: Messages
+    if cache is not None and cache.bumps:
+        uncached = []
+        for sha in iter_commit_shas(repo, rev_range):
+            bump_type = cache.get(sha)
+            if bump_type is None:
+                uncached.append(sha)
+            elif bump_type == BumpType.MAJOR:
+                return bump_type
+            else:
+                cached.append(bump_type)
+        messages = iter_uncached_messages(repo, uncached)
+        logger.debug(f"Classifying {len(uncached)} new commits ({len(cached)} cached) in {rev_range}")
+    else:
+        messages = iter_commit_messages(repo, rev_range)
+    try:
+        return highest_bump(chain(cached, classify_messages(messages, cache)))
+    finally:
+        # The log is streamed once and a major bump stops it early
+        messages.close()
+        if cache is not None:
+            cache.save()
@@ -1,8 +1,41 @@
 """File utilities for semvergit."""
 
-from loguru import logger
+import fnmatch
+import glob
+import os
+import re
+import secrets
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import IO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Pattern, Sequence, Tuple
+
 from semver import VersionInfo
 
+from semvergit.log_utils import logger
+
+VERSION_GROUP = "version"
+# Default version patterns (file name glob: pattern, how many matches to replace, 0 for all, TOML tables or None)
+STAMP_PATTERNS: Dict[str, Tuple[str, int, Optional[str]]] = {
+    # Dependency tables (e.g. [tool.poetry.dependencies.requests]) have version keys too
+    "pyproject.toml": (r'^version\s*=\s*"(?P<version>[^"]+)"', 0, r"^\[(?:project|tool\.poetry)\]\s*$"),
+    "package.json": (r'^\s*"version"\s*:\s*"(?P<version>[^"]+)"', 1, None),
+    "Chart.yaml": (r'^version:\s*"?(?P<version>[^"\s]+)"?', 1, None),
+    "*.py": (r'^__version__\s*=\s*["\'](?P<version>[^"\']+)["\']', 0, None),
+}
+TOML_TABLE_REGEX = re.compile(r"^\s*\[")
+STAMP_WORKERS = 8
+
+
+class Stamp(NamedTuple):
+    """Version stamp of a file."""
+
+    path: str
+    pattern: Pattern[str]
+    limit: int = 0
+    # Only the lines of the TOML tables with a matching header are stamped
+    tables: Optional[Pattern[str]] = None
+
 
 def update_verion_file(version_file: str, new_version: VersionInfo, dry_run: bool) -> None:
     """Update version file."""
@@ -17,5 +50,147 @@ def update_verion_file(version_file: str, new_version: VersionInfo, dry_run: boo
     if dry_run:
         logger.debug(f"Dry run, version file content:\n{version_file_content}")
     else:
-        with open(version_file, "w", encoding="utf-8") as version_file_handle:
-            version_file_handle.write(version_file_content)
+        write_atomic(version_file, version_file_content)
+
+
+@contextmanager
+def atomic_writer(path: str) -> Iterator[IO[str]]:
+    """Atomic writer."""
+    temp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{secrets.token_hex(8)}.tmp")
+    # New files get the mode open gives them (0o666 less the umask), mkstemp would make them private
+    file_descriptor = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(file_descriptor, "w", encoding="utf-8", newline="") as file_handle:
+            yield file_handle
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def write_atomic(path: str, content: str) -> None:
+    """Write file atomically."""
+    with atomic_writer(path) as file_handle:
+        file_handle.write(content)
+
+
+def compile_pattern(pattern: str) -> Pattern[str]:
+    """Compile pattern."""
+    try:
+        regex = re.compile(pattern)
+    except re.error as exp:
+        raise ValueError(f"Invalid pattern {pattern} ({exp})") from exp
+    if VERSION_GROUP not in regex.groupindex:
+        raise ValueError(f"Pattern {pattern} has no (?P<{VERSION_GROUP}>...) group")
+    return regex
+
+
+def default_pattern(file_path: str) -> Tuple[str, int, Optional[str]]:
+    """Default pattern."""
+    name = os.path.basename(file_path)
+    for name_glob, default in STAMP_PATTERNS.items():
+        if fnmatch.fnmatch(name, name_glob):
+            return default
+    raise ValueError(f"No default version pattern for {file_path}, use {file_path}=PATTERN")
+
+
+def parse_stamp(spec: str) -> List[Stamp]:
+    """Parse stamp."""
+    path, _, pattern = spec.partition("=")
+    paths = sorted(os.path.abspath(file_path) for file_path in glob.glob(path, recursive=True))
+    if not paths:
+        raise ValueError(f"No files match {path}")
+    stamps = []
+    for file_path in paths:
+        file_pattern, limit, tables = (pattern, 0, None) if pattern else default_pattern(file_path)
+        stamps.append(
+            Stamp(
+                path=file_path,
+                pattern=compile_pattern(file_pattern),
+                limit=limit,
+                tables=re.compile(tables) if tables is not None else None,
+            )
+        )
+    return stamps
+
+
+def iter_stamp_lines(stamp: Stamp, lines: Iterable[str]) -> Iterator[Tuple[str, bool]]:
+    """Iterate stamp lines."""
+    stampable = stamp.tables is None
+    for line in lines:
+        if stamp.tables is not None and TOML_TABLE_REGEX.match(line):
+            stampable = bool(stamp.tables.match(line))
+        yield line, stampable
+
+
+def stamp_line(line: str, stamp: Stamp, version: str, budget: int) -> Tuple[str, int]:
+    """Stamp line."""
+
+    def replace(match: "re.Match[str]") -> str:
+        start, end = match.span(VERSION_GROUP)
+        text = match.group(0)
+        return f"{text[: start - match.start()]}{version}{text[end - match.start() :]}"
+
+    return stamp.pattern.subn(replace, line, count=budget)
+
+
+def needs_stamp(stamp: Stamp, version: str) -> Optional[bool]:
+    """Check if file needs stamp."""
+    matched = False
+    replaced = 0
+    with open(stamp.path, "r", encoding="utf-8", newline="") as file_handle:
+        for line, stampable in iter_stamp_lines(stamp, file_handle):
+            if not stampable:
+                continue
+            for match in stamp.pattern.finditer(line):
+                if stamp.limit and replaced >= stamp.limit:
+                    return False
+                matched = True
+                replaced += 1
+                if match.group(VERSION_GROUP) != version:
+                    return True
+    return False if matched else None
+
+
+def stamp_file(stamp: Stamp, version: str, dry_run: bool = False) -> bool:
+    """Stamp file."""
+    needed = needs_stamp(stamp, version)
+    if needed is None:
+        raise ValueError(f"Version pattern {stamp.pattern.pattern} not found in {stamp.path}")
+    if not needed:
+        logger.debug(f"{stamp.path} already has version {version}")
+        return False
+    if dry_run:
+        logger.debug(f"Dry run, {stamp.path} would be stamped with version {version}")
+        return True
+    replaced = 0
+    with open(stamp.path, "r", encoding="utf-8", newline="") as source, atomic_writer(stamp.path) as target:
+        for line, stampable in iter_stamp_lines(stamp, source):
+            if stampable and (not stamp.limit or replaced < stamp.limit):
+                line, matches = stamp_line(line, stamp, version, stamp.limit - replaced if stamp.limit else 0)
+                replaced += matches
+            target.write(line)
+    logger.debug(f"Stamped {stamp.path} with version {version}")
+    return True
+
+
+def stamp_files(stamps: Sequence[Stamp], new_version: VersionInfo, dry_run: bool) -> List[str]:
+    """Stamp files."""
+    version = str(new_version)
+    by_path: Dict[str, List[Stamp]] = {}
+    for stamp in stamps:
+        by_path.setdefault(stamp.path, []).append(stamp)
+    if not by_path:
+        return []
+
+    def stamp_path(path_stamps: List[Stamp]) -> bool:
+        changed = False
+        for stamp in path_stamps:
+            changed = stamp_file(stamp, version, dry_run) or changed
+        return changed
+
+    with ThreadPoolExecutor(max_workers=min(STAMP_WORKERS, len(by_path))) as executor:
+        changed = list(executor.map(stamp_path, by_path.values()))
+    return [path for path, path_changed in zip(by_path, changed) if path_changed]
@@ -1,12 +1,41 @@
 """Git utilities."""
 
+import asyncio
+import os
+import re
+import signal
+import subprocess  # nosec B404 # git commands only, never through a shell
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
 from functools import wraps
-from typing import Any, Callable, List, Optional
+from itertools import chain
+from typing import Any, Callable, Dict, Generator, Iterator, List, Optional, Sequence, Set, Tuple
 
-from git import Head, Repo
-from loguru import logger
+from git import Git, GitCommandError, Head, Repo
 from semver import VersionInfo
 
+from semvergit.log_utils import logger, summarize
+from semvergit.ref_utils import TAGS_REF, RefsReadError, read_tags
+
+HEADS_REF = "refs/heads/"
+# (sha, message) of commits
+Messages = Generator[Tuple[str, str], None, None]
+STREAM_CHUNK = 64 * 1024
+BLOB_MODE = "100644"
+EXECUTABLE_MODE = "100755"
+TREE_MODE = "040000"
+# Split commit-graph files (written by fetch or gc) live in the commit-graphs directory
+COMMIT_GRAPH_PATHS = ("objects/info/commit-graph", "objects/info/commit-graphs")
+# A ref created by another push first: known before the push ("[rejected] ... (already exists)"), or lost
+# the race on the remote ("cannot lock ref ...: reference already exists", or the other push holds its lock)
+PUSH_CONFLICT_REGEX = re.compile(
+    r"! \[rejected\]|cannot lock ref '[^']*': (?:reference already exists|Unable to create '[^']*': File exists)"
+)
+# Async transport: git processes running at once and seconds per command
+GIT_CONCURRENCY = 8
+GIT_TIMEOUT = 120.0
+
 
 def drywrap(func: Callable) -> Callable:
     """Dry run wrapper."""
@@ -16,7 +45,8 @@ def drywrap(func: Callable) -> Callable:
         """Dry run function."""
         dry_run = kwargs.get("dry_run")
         if dry_run is not None and dry_run:
-            logger.debug(f"Dry run: {func.__name__}(*{args}, **{kwargs})")
+            # Formatted only if a sink logs debug messages (args may hold thousands of tags)
+            logger.opt(lazy=True).debug("Dry run: {}(*{}, **{})", lambda: func.__name__, lambda: args, lambda: kwargs)
             return None
 
         if dry_run is not None:
@@ -26,13 +56,24 @@ def drywrap(func: Callable) -> Callable:
     return dryfunc
 
 
-def get_repo(search_parent_directories: bool = True) -> Repo:
+def get_repo(path: Optional[str] = None, search_parent_directories: bool = True) -> Repo:
     """Get repo."""
-    repo = Repo(search_parent_directories=search_parent_directories)
+    repo = Repo(path, search_parent_directories=search_parent_directories)
     logger.debug(f"Working on Repository: {repo.working_tree_dir}")
     return repo
 
 
+def close_repo(repo: Repo) -> None:
+    """Close repo."""
+    repo.close()
+    logger.debug(f"Closed Repository: {repo.working_tree_dir}")
+
+
+def get_git_dir(repo: Repo) -> str:
+    """Get git dir."""
+    return str(repo.common_dir)
+
+
 def get_active_branch(repo: Repo) -> Head:
     """Get active branch."""
     branch = repo.active_branch
@@ -46,15 +87,166 @@ def pull_remote(repo: Repo) -> None:
     logger.debug(f"Pulled remote {remote.name}")
 
 
-def get_tags_with_prefix(repo: Repo, prefix: str = "v") -> List[str]:
+def is_shallow(repo: Repo) -> bool:
+    """Check if shallow."""
+    return os.path.exists(os.path.join(get_git_dir(repo), "shallow"))
+
+
+def fetch_tags_args(prefix: str) -> List[str]:
+    """Fetch tags args."""
+    # Partial clones apply their own filter (remote.<name>.partialclonefilter) to the fetch
+    return ["--no-tags", f"+{TAGS_REF}{prefix}*:{TAGS_REF}{prefix}*"]
+
+
+def parse_ls_remote_commits(output: str, prefix: str) -> Dict[str, str]:
+    """Parse ls-remote commits."""
+    commits: Dict[str, str] = {}
+    for line in output.splitlines():
+        sha, _, ref = line.partition("\t")
+        if not ref.startswith(f"{TAGS_REF}{prefix}"):
+            continue
+        tag = ref[len(TAGS_REF) :]
+        if tag.endswith("^{}"):
+            commits[tag[:-3]] = sha
+        else:
+            commits.setdefault(tag, sha)
+    return commits
+
+
+def get_missing_objects(repo: Repo, shas: Sequence[str]) -> Set[str]:
+    """Get missing objects."""
+    if not shas:
+        return set()
+    output = run_git_input(repo, "cat_file", "--batch-check", data="".join(f"{sha}\n" for sha in shas).encode())
+    return {line.split()[0] for line in output.splitlines() if line.endswith(" missing")}
+
+
+def shallow_fetches(repo: Repo, ls_remote_output: str, prefix: str) -> List[Tuple[List[str], List[str]]]:
+    """Shallow fetches."""
+    commits = parse_ls_remote_commits(ls_remote_output, prefix)
+    missing = get_missing_objects(repo, sorted(set(commits.values())))
+    local_refspecs: List[str] = []
+    missing_refspecs: List[str] = []
+    for tag, commit in sorted(commits.items()):
+        refspecs = missing_refspecs if commit in missing else local_refspecs
+        refspecs.append(f"+{TAGS_REF}{tag}:{TAGS_REF}{tag}")
+    fetches: List[Tuple[List[str], List[str]]] = []
+    if local_refspecs:
+        # No --depth, it would cut the local history at these commits (only their tag objects are fetched)
+        fetches.append((["--no-tags", "--stdin"], local_refspecs))
+    if missing_refspecs:
+        # Only the tagged commits, not their history
+        fetches.append((["--no-tags", "--depth=1", "--stdin"], missing_refspecs))
+    return fetches
+
+
+def fetch_remote_tags(repo: Repo, prefix: str = "v", remote: str = "origin") -> int:
+    """Fetch remote tags."""
+    known_tags = set(get_tags_with_prefix(repo=repo, prefix=prefix))
+    if is_shallow(repo):
+        output = str(repo.git.ls_remote("--tags", remote, f"{TAGS_REF}{prefix}*"))
+        for args, refspecs in shallow_fetches(repo, output, prefix):
+            run_git_input(repo, "fetch", remote, *args, data="".join(f"{refspec}\n" for refspec in refspecs).encode())
+    else:
+        repo.git.fetch(remote, *fetch_tags_args(prefix))
+    new_tags = len(set(get_tags_with_prefix(repo=repo, prefix=prefix)) - known_tags)
+    logger.debug("Fetched tags from remote {} ({} new with prefix -{}-)", remote, new_tags, prefix)
+    return new_tags
+
+
+def get_tags_with_prefix(repo: Repo, prefix: str = "v", use_refs: bool = True) -> List[str]:
     """Get tags as list of strings."""
-    tags = repo.tags
-    results = [tag.name for tag in tags if tag.name.startswith(prefix)]
+    results = None
+    if use_refs:
+        try:
+            results = read_tags(git_dir=get_git_dir(repo), prefix=prefix)
+        except (RefsReadError, OSError) as exp:
+            logger.debug(f"Reading refs failed ({exp}), falling back to GitPython")
+    if results is None:
+        results = [tag.name for tag in repo.tags if tag.name.startswith(prefix)]
     logger_detail = f"with prefix -{prefix}-" if prefix else "no prefix"
-    logger.debug(f"Fetched tags: {results} ({logger_detail})")
+    logger.opt(lazy=True).debug("Fetched tags: {} ({})", lambda: summarize(results), lambda: logger_detail)
     return results
 
 
+def resolve_commit(repo: Repo, ref: str = "HEAD") -> str:
+    """Resolve a ref to its commit sha."""
+    return str(repo.git.rev_parse("--verify", f"{ref}^{{commit}}"))
+
+
+def ensure_commit_graph(repo: Repo) -> bool:
+    """Ensure commit-graph."""
+    git_dir = get_git_dir(repo)
+    if any(os.path.exists(os.path.join(git_dir, path)) for path in COMMIT_GRAPH_PATHS):
+        return False
+    # Generation numbers let git stop the reachability walk early instead of visiting every commit
+    try:
+        repo.git.commit_graph("write", "--reachable")
+    except GitCommandError as exp:
+        # Best effort (e.g. a read-only or shared git dir), the walk works without it
+        logger.debug(f"Can't write the commit-graph of {git_dir} ({exp})")
+        return False
+    logger.debug(f"Wrote the commit-graph of {git_dir}")
+    return True
+
+
+def has_commit(repo: Repo, commit: str) -> bool:
+    """Check if commit is in repo."""
+    try:
+        repo.git.cat_file("-e", "--end-of-options", f"{commit}^{{commit}}")
+    except GitCommandError:
+        return False
+    return True
+
+
+def fetch_commit(repo: Repo, commit: str, remote: str = "origin") -> None:
+    """Fetch commit."""
+    repo.git.fetch("--no-tags", "--end-of-options", remote, commit)
+    logger.debug(f"Fetched commit {commit} from remote {remote}")
+
+
+def get_reachable_tags(repo: Repo, prefix: str = "v", ref: str = "HEAD") -> List[str]:
+    """Get reachable tags."""
+    output = str(repo.git.for_each_ref(f"--merged={ref}", "--format=%(refname:strip=2)", f"{TAGS_REF}{prefix}*"))
+    results = [tag for tag in output.splitlines() if tag.startswith(prefix)]
+    logger.debug("Fetched {} tags reachable from {} (with prefix -{}-)", len(results), ref, prefix)
+    return results
+
+
+def stream_git(repo: Repo, command: str, *args: str, separator: bytes = b"\n") -> Iterator[str]:
+    """Stream git."""
+    process = getattr(repo.git, command)(*args, as_process=True)
+    try:
+        buffer = b""
+        for chunk in iter(lambda: process.stdout.read(STREAM_CHUNK), b""):
+            *records, buffer = (buffer + chunk).split(separator)
+            for record in records:
+                yield record.decode()
+        if buffer:
+            yield buffer.decode()
+        process.wait()
+    finally:
+        # The iteration stopped early
+        if process.poll() is None:
+            process.kill()
+            process.proc.wait()
+
+
+def iter_commit_shas(repo: Repo, rev_range: str) -> Iterator[str]:
+    """Iterate commit shas."""
+    return stream_git(repo, "rev_list", rev_range)
+
+
+def iter_commit_messages(repo: Repo, *revisions: str, no_walk: bool = False) -> Messages:
+    """Iterate commit messages."""
+    args = ["-z", "--format=%H%n%B"]
+    if no_walk:
+        args.append("--no-walk=unsorted")
+    for record in stream_git(repo, "log", *args, *revisions, separator=b"\0"):
+        sha, _, message = record.partition("\n")
+        yield sha, message
+
+
 @drywrap
 def new_commit(repo: Repo, message: str) -> str:
     """New commit."""
@@ -71,17 +263,306 @@ def add_file(repo: Repo, file_path: str) -> None:
     logger.debug(f"Added file {file_path}")
 
 
+def run_git_input(repo: Repo, command: str, *args: str, data: bytes) -> str:
+    """Run git with input."""
+    process = getattr(repo.git, command)(*args, as_process=True, istream=subprocess.PIPE)
+    stdout, stderr = process.communicate(data)
+    process.wait(stderr=stderr)
+    return stdout.decode().strip()
+
+
+def read_tree(repo: Repo, tree: str) -> Dict[str, str]:
+    """Read tree."""
+    entries = {}
+    for record in str(repo.git.ls_tree("-z", tree)).split("\0"):
+        if record:
+            meta, _, name = record.partition("\t")
+            entries[name] = meta
+    return entries
+
+
+def write_tree(repo: Repo, tree: Optional[str], changes: Dict[str, Tuple[str, str]]) -> str:
+    """Write tree."""
+    entries = read_tree(repo, tree) if tree is not None else {}
+    subtrees: Dict[str, Dict[str, Tuple[str, str]]] = {}
+    for path, (mode, blob) in changes.items():
+        name, separator, rest = path.partition("/")
+        if separator:
+            subtrees.setdefault(name, {})[rest] = (mode, blob)
+        else:
+            entries[name] = f"{mode} blob {blob}"
+    for name, subtree_changes in subtrees.items():
+        _, object_type, sha = entries.get(name, "- - -").split(" ")
+        sha = write_tree(repo, sha if object_type == "tree" else None, subtree_changes)
+        entries[name] = f"{TREE_MODE} tree {sha}"
+    data = "".join(f"{meta}\t{name}\0" for name, meta in entries.items())
+    # mktree sorts the entries
+    return run_git_input(repo, "mktree", "-z", data=data.encode())
+
+
+def hash_files(repo: Repo, file_paths: Sequence[str]) -> Dict[str, Tuple[str, str]]:
+    """Hash files."""
+    root = str(repo.working_tree_dir)
+    paths = [os.path.relpath(os.path.abspath(file_path), root).replace(os.sep, "/") for file_path in file_paths]
+    if not paths:
+        return {}
+    blobs = str(repo.git.hash_object("-w", "--", *paths)).splitlines()
+    return {
+        path: (EXECUTABLE_MODE if os.access(os.path.join(root, path), os.X_OK) else BLOB_MODE, blob)
+        for path, blob in zip(paths, blobs)
+    }
+
+
+@drywrap
+def commit_files(repo: Repo, file_paths: Sequence[str], message: str, branch: str) -> str:
+    """Commit files."""
+    changes = hash_files(repo, file_paths)
+    ref = f"{HEADS_REF}{branch}"
+    parent = str(repo.git.rev_parse("--verify", f"{ref}^{{commit}}"))
+    tree = write_tree(repo, f"{parent}^{{tree}}", changes)
+    commit = str(repo.git.commit_tree(tree, "-p", parent, "-m", message))
+    # The ref only moves if nobody else moved it since it was read
+    repo.git.update_ref("-m", f"commit: {message}", ref, commit, parent)
+    if changes:
+        # Only the committed entries of the index are updated (git still rewrites the index file, in C)
+        cacheinfo = (("--cacheinfo", f"{mode},{blob},{path}") for path, (mode, blob) in changes.items())
+        repo.git.update_index("--add", *chain.from_iterable(cacheinfo))
+    logger.debug(f"Created commit [{commit[:7]}] {message} (plumbing)")
+    return commit[:7]
+
+
+@drywrap
+def add_files(repo: Repo, file_paths: Sequence[str]) -> None:
+    """Add files."""
+    repo.index.add(list(file_paths))
+    logger.opt(lazy=True).debug("Added files {}", lambda: summarize(file_paths))
+
+
 @drywrap
-def set_tag(repo: Repo, tag: str) -> VersionInfo:
+def set_tag(repo: Repo, tag: str, commit: Optional[str] = None) -> VersionInfo:
     """Set tag."""
-    new_tag = repo.create_tag(tag)
+    if commit is None:
+        new_tag = repo.create_tag(tag)
+    else:
+        # The commit may come from a client (version service), it's never parsed as an option
+        repo.git.tag("--end-of-options", tag, commit)
+        new_tag = repo.tag(tag)
     logger.debug(f"Created {str(new_tag)}")
     return new_tag
 
 
 @drywrap
-def push_remote(repo: Repo, tag_str: str) -> None:
+def delete_tag(repo: Repo, tag: str) -> None:
+    """Delete tag."""
+    repo.delete_tag(repo.tag(tag))
+    logger.debug(f"Deleted tag {tag}")
+
+
+class PushError(GitCommandError):
+    """Push error."""
+
+    def __init__(self, errors: Dict[str, GitCommandError], pushed: Sequence[str]) -> None:
+        """Init."""
+        first = next(iter(errors.values()))
+        super().__init__(first.command, first.status)
+        self.stdout, self.stderr = first.stdout, first.stderr
+        self.errors = errors
+        self.pushed = list(pushed)
+
+
+def is_push_rejected(error: GitCommandError) -> bool:
+    """Check if push was rejected."""
+    if isinstance(error, PushError):
+        # Refs accepted by a remote can't be allocated again
+        return not error.pushed and all(is_push_rejected(remote_error) for remote_error in error.errors.values())
+    # Other "[remote rejected]" reasons (hooks, protected branches) are not conflicts and are not matched
+    return PUSH_CONFLICT_REGEX.search(str(error.stderr)) is not None
+
+
+def pushed_remotes(error: GitCommandError) -> List[str]:
+    """Pushed remotes."""
+    return error.pushed if isinstance(error, PushError) else []
+
+
+def retract_unpushed_tags(repo: Repo, tags: Sequence[str], error: GitCommandError, dry_run: bool = False) -> bool:
+    """Retract unpushed tags."""
+    pushed = pushed_remotes(error)
+    if pushed:
+        # Pushes are only atomic per remote, the tags are published on these remotes
+        logger.error(f"Tags {list(tags)} were only pushed to {pushed}, kept them locally")
+        return True
+    for tag in tags:
+        delete_tag(repo=repo, tag=tag, dry_run=dry_run)
+    return False
+
+
+def raise_push_errors(refspecs: Sequence[str], results: Dict[str, Optional[BaseException]]) -> None:
+    """Raise push errors."""
+    errors: Dict[str, GitCommandError] = {}
+    for remote, error in results.items():
+        if error is None:
+            logger.debug(f"Pushed {refspecs} to remote {remote}")
+            continue
+        logger.error(f"Push to remote {remote} failed: {error}")
+        if not isinstance(error, GitCommandError):
+            raise error
+        errors[remote] = error
+    if errors:
+        raise PushError(errors, pushed=[remote for remote in results if remote not in errors])
+
+
+def atomic_push_args(remote: str, refspecs: Sequence[str]) -> List[str]:
+    """Atomic push args."""
+    # An empty push would push the current branch
+    if not refspecs:
+        raise ValueError(f"Nothing to push to {remote}")
+    return ["--atomic", remote, *refspecs]
+
+
+@drywrap
+def push_refs(repo: Repo, refspecs: Sequence[str], remotes: Sequence[str] = ("origin",)) -> None:
+    """Push refs."""
+    with ThreadPoolExecutor(max_workers=len(remotes)) as executor:
+        pushes = {remote: executor.submit(repo.git.push, *atomic_push_args(remote, refspecs)) for remote in remotes}
+    raise_push_errors(refspecs, {remote: push.exception() for remote, push in pushes.items()})
+
+
+@drywrap
+def push_remote(repo: Repo, tag_str: str, branch: Optional[str] = None, remotes: Sequence[str] = ("origin",)) -> None:
     """Push remote."""
-    remote = repo.remotes.origin
-    remote.push(tag_str)
-    logger.debug(f"Pushed remote {remote.name}")
+    refspecs = [f"{TAGS_REF}{tag_str}"]
+    if branch:
+        refspecs.append(f"{HEADS_REF}{branch}")
+    push_refs(repo=repo, refspecs=refspecs, remotes=remotes)
+
+
+def resolve_remote_url(remote: str, cwd: Optional[str] = None) -> str:
+    """Resolve remote URL."""
+    if os.path.exists(remote):
+        return os.path.abspath(remote)
+    if ":" in remote:
+        return remote
+    try:
+        url = str(Git(cwd).remote("get-url", remote))
+    except GitCommandError as exp:
+        raise ValueError(f"Unknown remote {remote} (not a remote of the current repository, a URL or a path)") from exp
+    return os.path.abspath(url) if os.path.exists(url) else url
+
+
+def ls_remote_tags(remote: str, prefix: str = "v", repo: Optional[Repo] = None) -> List[str]:
+    """List remote tags."""
+    git = repo.git if repo is not None else Git()
+    output = str(git.ls_remote("--tags", "--refs", remote, f"{TAGS_REF}{prefix}*"))
+    results = parse_ls_remote_tags(output, prefix)
+    logger.debug("Fetched {} remote tags from {} (with prefix -{}-)", len(results), remote, prefix)
+    return results
+
+
+def parse_ls_remote_tags(output: str, prefix: str) -> List[str]:
+    """Parse ls-remote tags."""
+    refs = [line.partition("\t")[2] for line in output.splitlines()]
+    return [ref[len(TAGS_REF) :] for ref in refs if ref.startswith(f"{TAGS_REF}{prefix}")]
+
+
+def resolve_remote_ref(remote: str, ref: str = "HEAD") -> str:
+    """Resolve remote ref."""
+    output = str(Git().ls_remote(remote, ref))
+    if not output:
+        raise ValueError(f"Ref {ref} not found on {remote}")
+    sha = output.splitlines()[0].partition("\t")[0]
+    logger.debug(f"Resolved {ref} on {remote} to {sha}")
+    return sha
+
+
+@drywrap
+def push_remote_tag(remote: str, tag_str: str, commit: str) -> None:
+    """Push remote tag."""
+    remote_url = resolve_remote_url(remote)
+    with tempfile.TemporaryDirectory(prefix="semvergit-") as temp_dir:
+        # Pushing needs the tagged commit locally, fetch only that commit object (no trees or blobs)
+        temp_repo = Repo.init(temp_dir, bare=True)
+        try:
+            temp_repo.git.fetch("--depth=1", "--filter=tree:0", remote_url, commit)
+            temp_repo.git.push(remote_url, f"{commit}:{TAGS_REF}{tag_str}")
+        finally:
+            temp_repo.close()
+    logger.debug(f"Pushed tag {tag_str} ({commit}) to {remote}")
+
+
+class AsyncGit:  # pylint: disable=too-few-public-methods
+    """Git on asyncio."""
+
+    def __init__(self, concurrency: int = GIT_CONCURRENCY, timeout: Optional[float] = GIT_TIMEOUT) -> None:
+        """Init."""
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(self, *args: str, cwd: Optional[str] = None, data: Optional[bytes] = None) -> str:
+        """Run git command."""
+        command = ["git", *args]
+        # A command waiting for credentials would only end with the timeout
+        env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+        async with self.semaphore:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                cwd=cwd,
+                env=env,
+                stdin=asyncio.subprocess.DEVNULL if data is None else asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(data), self.timeout)
+            except asyncio.TimeoutError as exp:
+                raise GitCommandError(command, f"timed out after {self.timeout}s") from exp
+            finally:
+                # Cancelled or timed out commands (and their ssh or hook children) don't outlive their task
+                if process.returncode is None:
+                    with suppress(ProcessLookupError):
+                        os.killpg(process.pid, signal.SIGKILL)
+                    # Reads the pipes to their end (closes them)
+                    await process.communicate()
+        if process.returncode:
+            raise GitCommandError(command, process.returncode, stderr, stdout)
+        return stdout.decode("utf-8", errors="replace").strip()
+
+
+async def async_ls_remote_tags(git: AsyncGit, remote: str, prefix: str = "v", cwd: Optional[str] = None) -> List[str]:
+    """List remote tags on asyncio."""
+    output = await git.run("ls-remote", "--tags", "--refs", remote, f"{TAGS_REF}{prefix}*", cwd=cwd)
+    results = parse_ls_remote_tags(output, prefix)
+    logger.debug("Fetched {} remote tags from {} (with prefix -{}-)", len(results), remote, prefix)
+    return results
+
+
+async def async_pull_remote(git: AsyncGit, repo: Repo, remote: str = "origin") -> None:
+    """Pull remote on asyncio."""
+    await git.run("pull", remote, cwd=str(repo.git.working_dir))
+    logger.debug(f"Pulled remote {remote}")
+
+
+async def async_fetch_tags(git: AsyncGit, repo: Repo, prefix: str = "v", remote: str = "origin") -> None:
+    """Fetch tags on asyncio."""
+    cwd = str(repo.git.working_dir)
+    if is_shallow(repo):
+        output = await git.run("ls-remote", "--tags", remote, f"{TAGS_REF}{prefix}*", cwd=cwd)
+        fetches = await asyncio.to_thread(shallow_fetches, repo, output, prefix)
+        for args, refspecs in fetches:
+            await git.run(
+                "fetch", remote, *args, cwd=cwd, data="".join(f"{refspec}\n" for refspec in refspecs).encode()
+            )
+    else:
+        await git.run("fetch", remote, *fetch_tags_args(prefix), cwd=cwd)
+    logger.debug("Fetched tags from remote {} (with prefix -{}-)", remote, prefix)
+
+
+async def async_push_refs(git: AsyncGit, repo: Repo, refspecs: Sequence[str], remotes: Sequence[str]) -> None:
+    """Push refs on asyncio."""
+    cwd = str(repo.git.working_dir)
+    pushes = [git.run("push", *atomic_push_args(remote, refspecs), cwd=cwd) for remote in remotes]
+    results = await asyncio.gather(*pushes, return_exceptions=True)
+    raise_push_errors(
+        refspecs,
+        {remote: result if isinstance(result, BaseException) else None for remote, result in zip(remotes, results)},
+    )
@@ -0,0 +1,132 @@
+"""Version index utilities."""
+
+import json
+import os
+from bisect import insort
+from typing import Any, Callable, Collection, Dict, List, Optional, Set
+
+from semver import VersionInfo
+
+from semvergit.file_utils import write_atomic
+from semvergit.log_utils import logger
+from semvergit.ref_utils import refs_fingerprint
+from semvergit.version_utils import (
+    PartsLike,
+    PrecedenceKey,
+    VersionParts,
+    iter_tag_parts,
+    line_index,
+    precedence_key,
+    to_version,
+)
+
+INDEX_DIR = "semvergit"
+INDEX_FILE = "index.json"
+INDEX_FORMAT = 2
+# Above this many new tags a full sort is cheaper than inserting them one by one
+INSORT_LIMIT = 64
+
+
+def sort_key(item: List[Any]) -> PrecedenceKey:
+    """Sort key."""
+    return precedence_key(item[1])
+
+
+class VersionIndex:
+    """Version index."""
+
+    def __init__(self, git_dir: str) -> None:
+        """Init."""
+        self.git_dir = git_dir
+        self.path = os.path.join(git_dir, INDEX_DIR, INDEX_FILE)
+        self.entries: Dict[str, Dict[str, Any]] = self.load()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Load index."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as index_handle:
+                data = json.load(index_handle)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as exp:
+            logger.debug(f"Ignoring unreadable version index {self.path} ({exp})")
+            return {}
+        if not isinstance(data, dict) or data.get("format") != INDEX_FORMAT:
+            logger.debug(f"Ignoring incompatible version index {self.path}")
+            return {}
+        return data["prefixes"]
+
+    def save(self) -> None:
+        """Save index."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        write_atomic(self.path, json.dumps({"format": INDEX_FORMAT, "prefixes": self.entries}))
+        logger.debug(f"Saved version index {self.path}")
+
+    # pylint: disable-next=too-many-locals
+    def refresh(self, prefix: str, list_tags: Callable[[], List[str]], parse: Callable[[str], VersionParts]) -> None:
+        """Refresh prefix."""
+        fingerprint = refs_fingerprint(self.git_dir)
+        entry = self.entries.get(prefix)
+        if entry is not None and fingerprint is not None and entry["fingerprint"] == fingerprint:
+            logger.debug(f"Version index is up to date for prefix -{prefix}-")
+            return
+
+        tags = list_tags()
+        known = entry["tags"] if entry is not None else []
+        # Invalid tags are remembered too, so they aren't parsed again
+        known_invalid = entry.get("invalid", []) if entry is not None else []
+        current = set(tags)
+        kept = [item for item in known if item[0] in current]
+        invalid = [tag for tag in known_invalid if tag in current]
+        known_names = {item[0] for item in kept}.union(invalid)
+        removed = len(known) + len(known_invalid) - len(known_names)
+        new_tags = (tag for tag in tags if tag not in known_names)
+        added = [[tag, list(parts)] for tag, parts in iter_tag_parts(new_tags, parse, invalid)]
+        if len(added) > INSORT_LIMIT:
+            kept.extend(added)
+            kept.sort(key=sort_key)
+        else:
+            for item in added:
+                insort(kept, item, key=sort_key)
+        logger.debug("Version index for prefix -{}-: {} added, {} removed", prefix, len(added), removed)
+        # Lines are indexed only when the tags change, a lookup never scans the versions
+        lines = line_index(item[1] for item in kept)
+        self.entries[prefix] = {"fingerprint": fingerprint, "tags": kept, "invalid": invalid, "lines": lines}
+        self.save()
+
+    def reachable(self, prefix: str, commit: str, list_reachable: Callable[[], List[str]]) -> Set[str]:
+        """Reachable tags."""
+        entry = self.entries[prefix]
+        cached = entry.get("reachable")
+        if cached is not None and cached["commit"] == commit:
+            logger.debug(f"Reachable tags are cached for {commit}")
+            return set(cached["tags"])
+        tags = list_reachable()
+        # A refresh with new tags replaces the entry, so a cached set never misses a tag
+        entry["reachable"] = {"commit": commit, "tags": tags}
+        self.save()
+        return set(tags)
+
+    def parts(self, prefix: str, tags: Optional[Collection[str]] = None) -> List[VersionParts]:
+        """Version parts."""
+        entry = self.entries.get(prefix, {"tags": []})
+        return [tuple(parts) for tag, parts in entry["tags"] if tags is None or tag in tags]
+
+    def lines(self, prefix: str) -> Dict[str, PartsLike]:
+        """Latest version parts per line."""
+        return dict(self.entries.get(prefix, {}).get("lines", {}))
+
+    def invalid(self, prefix: str) -> List[str]:
+        """Invalid tags of the prefix."""
+        return list(self.entries.get(prefix, {}).get("invalid", []))
+
+    def versions(self, prefix: str) -> List[VersionInfo]:
+        """Versions."""
+        return [to_version(parts) for parts in self.parts(prefix)]
+
+    def latest(self, prefix: str) -> Optional[VersionInfo]:
+        """Latest version of the prefix."""
+        entry = self.entries.get(prefix)
+        if not entry or not entry["tags"]:
+            return None
+        return to_version(entry["tags"][-1][1])
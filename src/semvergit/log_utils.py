@@ -2,9 +2,15 @@
 
 import sys
 from enum import Enum
+from typing import Any, List, Optional, Sequence
 
 from loguru import logger
 
+__all__ = ["LogLevel", "logger", "set_logger", "summarize"]
+
+# Nothing is logged until a sink is set (see set_logger)
+logger.remove()
+
 
 class LogLevel(Enum):
     """LogLevel."""
@@ -23,14 +29,25 @@ LOGGER_FORMAT_DEBUG = (
     "{message}"
 )
 
+# Items shown in the summary of a collection
+SUMMARY_ITEMS = 5
+
+
+def summarize(items: Sequence[Any], limit: int = SUMMARY_ITEMS) -> str:
+    """Summarize."""
+    shown = ", ".join(str(item) for item in items[:limit])
+    more = ", ..." if len(items) > limit else ""
+    return f"{len(items)} [{shown}{more}]"
+
 
-def set_logger(log_level: LogLevel = LogLevel.INFO) -> None:
+def set_logger(log_level: LogLevel = LogLevel.INFO, json_sink: Optional[str] = None) -> List[int]:
     """Set logger."""
-    if log_level == LogLevel.DEBUG:
-        logger.add(sys.stderr, format=LOGGER_FORMAT_DEBUG, level="DEBUG")
-    elif log_level == LogLevel.INFO:
-        logger.add(sys.stderr, format=LOGGER_FORMAT, level="INFO")
-    elif log_level == LogLevel.ERROR:
-        logger.add(sys.stderr, format=LOGGER_FORMAT, level="ERROR")
-    else:
+    if not isinstance(log_level, LogLevel):
         raise ValueError(f"Invalid debug mode: {log_level}")
+    sink_ids = []
+    if json_sink != "-":
+        log_format = LOGGER_FORMAT_DEBUG if log_level == LogLevel.DEBUG else LOGGER_FORMAT
+        sink_ids.append(logger.add(sys.stderr, format=log_format, level=log_level.name))
+    if json_sink:
+        sink_ids.append(logger.add(sys.stderr if json_sink == "-" else json_sink, serialize=True, level=log_level.name))
+    return sink_ids
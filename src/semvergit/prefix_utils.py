@@ -0,0 +1,61 @@
+"""Tag prefix utilities."""
+
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Trie nodes are keyed by single characters, so the empty key can't clash
+PREFIX_KEY = ""
+
+
+class PrefixTrie:
+    """Trie of tag prefixes."""
+
+    def __init__(self, prefixes: Iterable[str] = ()) -> None:
+        """Init."""
+        self.root: Dict[str, Any] = {}
+        self.prefixes: List[str] = []
+        for prefix in prefixes:
+            self.add(prefix)
+
+    def add(self, prefix: str) -> None:
+        """Add a prefix."""
+        node = self.root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        if PREFIX_KEY not in node:
+            node[PREFIX_KEY] = prefix
+            self.prefixes.append(prefix)
+
+    def match(self, tag: str) -> Optional[str]:
+        """Match tag."""
+        node = self.root
+        matched = node.get(PREFIX_KEY)
+        for char in tag:
+            child = node.get(char)
+            if child is None:
+                break
+            node = child
+            matched = node.get(PREFIX_KEY, matched)
+        return matched
+
+    def partition(self, tags: Iterable[str]) -> Dict[str, List[str]]:
+        """Partition tags."""
+        parts: Dict[str, List[str]] = {prefix: [] for prefix in self.prefixes}
+        for tag in tags:
+            prefix = self.match(tag)
+            if prefix is not None:
+                parts[prefix].append(tag)
+        return parts
+
+
+def common_prefix(prefixes: Sequence[str]) -> str:
+    """Common prefix."""
+    return os.path.commonprefix(list(prefixes))
+
+
+def parse_component_bump(spec: str) -> Tuple[str, str]:
+    """Parse component bump."""
+    prefix, separator, bump_type = spec.rpartition("=")
+    if not separator or not prefix or not bump_type:
+        raise ValueError(f"Invalid component bump {spec}, use PREFIX=BUMP_TYPE (e.g. api/v=minor)")
+    return prefix, bump_type
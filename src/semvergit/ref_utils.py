@@ -0,0 +1,99 @@
+"""Refs utilities."""
+
+import hashlib
+import os
+import time
+from typing import Iterator, List, Optional
+
+TAGS_REF = "refs/tags/"
+PACKED_REFS = "packed-refs"
+REFTABLE_DIR = "reftable"
+# Rewritten with the names of the new tables on every ref update
+REFTABLE_LIST = "tables.list"
+LOCK_SUFFIX = ".lock"
+# Changes this recent might share an mtime with a following change, so they are not trusted
+RACY_WINDOW_NS = 2_000_000_000
+
+
+class RefsReadError(Exception):
+    """Raised when the refs storage can't be read directly."""
+
+
+def check_refs_backend(git_dir: str) -> None:
+    """Check refs backend."""
+    if os.path.isdir(os.path.join(git_dir, REFTABLE_DIR)):
+        raise RefsReadError(f"Unsupported refs backend (reftable) in {git_dir}")
+
+
+def iter_packed_tags(git_dir: str, prefix: str = "") -> Iterator[str]:
+    """Iterate packed tags."""
+    needle = f"{TAGS_REF}{prefix}".encode()
+    skip = len(TAGS_REF)
+    try:
+        packed_refs = open(os.path.join(git_dir, PACKED_REFS), "rb")  # pylint: disable=consider-using-with
+    except FileNotFoundError:
+        return
+    with packed_refs:
+        for line in packed_refs:
+            # Lines are "<sha> <refname>", the header starts with "#" and peeled lines with "^"
+            _, _, ref = line.rstrip(b"\r\n").partition(b" ")
+            if ref.startswith(needle):
+                yield ref[skip:].decode()
+
+
+def iter_loose_tags(git_dir: str, prefix: str = "") -> Iterator[str]:
+    """Iterate loose tags."""
+    tags_dir = os.path.join(git_dir, TAGS_REF)
+    # Only walk the sub directory the prefix points to (e.g. "api/v" -> refs/tags/api)
+    prefix_dir, _, _ = prefix.rpartition("/")
+    walk_root = os.path.join(tags_dir, prefix_dir) if prefix_dir else tags_dir
+    for root, _, files in os.walk(walk_root):
+        rel_root = os.path.relpath(root, tags_dir).replace(os.sep, "/")
+        for file_name in files:
+            if file_name.endswith(LOCK_SUFFIX):
+                continue
+            tag = file_name if rel_root == "." else f"{rel_root}/{file_name}"
+            if tag.startswith(prefix):
+                yield tag
+
+
+def read_tags(git_dir: str, prefix: str = "") -> List[str]:
+    """Read tags."""
+    check_refs_backend(git_dir)
+    tags = set(iter_packed_tags(git_dir, prefix))
+    tags.update(iter_loose_tags(git_dir, prefix))
+    return sorted(tags)
+
+
+def refs_fingerprint(git_dir: str) -> Optional[str]:
+    """Refs fingerprint."""
+    if os.path.isdir(os.path.join(git_dir, REFTABLE_DIR)):
+        return reftable_fingerprint(git_dir)
+    stats = []
+    mtimes = [0]
+    try:
+        packed_stat = os.stat(os.path.join(git_dir, PACKED_REFS))
+        stats.append(f"{PACKED_REFS}:{packed_stat.st_ino}:{packed_stat.st_size}:{packed_stat.st_mtime_ns}")
+        mtimes.append(packed_stat.st_mtime_ns)
+    except FileNotFoundError:
+        stats.append(f"{PACKED_REFS}:-")
+    # Adding, deleting or rewriting a loose tag always touches its directory
+    tags_dir = os.path.join(git_dir, TAGS_REF)
+    for root, dirs, _ in os.walk(tags_dir):
+        dirs.sort()
+        dir_stat = os.stat(root)
+        stats.append(f"{os.path.relpath(root, tags_dir)}:{dir_stat.st_mtime_ns}")
+        mtimes.append(dir_stat.st_mtime_ns)
+    if time.time_ns() - max(mtimes) < RACY_WINDOW_NS:
+        return None
+    return hashlib.sha256("\n".join(stats).encode()).hexdigest()
+
+
+def reftable_fingerprint(git_dir: str) -> Optional[str]:
+    """Reftable fingerprint."""
+    try:
+        with open(os.path.join(git_dir, REFTABLE_DIR, REFTABLE_LIST), "rb") as tables_list:
+            # Table names are unique, so the list changes on every update (no mtime is involved)
+            return hashlib.sha256(tables_list.read()).hexdigest()
+    except FileNotFoundError:
+        return None
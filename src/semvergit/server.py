@@ -0,0 +1,358 @@
+"""Version allocation service."""
+
+import json
+import os
+import re
+import signal
+import stat
+import threading
+import time
+import uuid
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import BaseServer, ThreadingMixIn, UnixStreamServer
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from git import GitCommandError
+from semver import VersionInfo
+
+from semvergit.app import SemverGit
+from semvergit.bump_utils import BumpType
+from semvergit.git_utils import (
+    fetch_commit,
+    has_commit,
+    is_push_rejected,
+    push_refs,
+    retract_unpushed_tags,
+    set_tag,
+)
+from semvergit.log_utils import logger
+from semvergit.ref_utils import TAGS_REF
+
+# Full (SHA-1 or SHA-256) commit shas, the commits are fetched by sha
+COMMIT_SHA_REGEX = re.compile(r"[0-9a-f]{40}|[0-9a-f]{64}")
+
+
+class LeaseError(Exception):
+    """Raised for unknown or expired leases."""
+
+
+class Lease(NamedTuple):
+    """Lease of a version."""
+
+    lease_id: str
+    version: VersionInfo
+    tag: str
+    expires: float
+
+
+class VersionAllocator:  # pylint: disable=too-many-instance-attributes
+    """Version allocator."""
+
+    # Finished (pushed, partial or failed) tags kept for the status, the oldest ones are forgotten
+    tag_history: int = 1000
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        svg: SemverGit,
+        lease_seconds: float = 30.0,
+        flush_interval: float = 1.0,
+        batch_size: int = 100,
+        dry_run: bool = False,
+    ) -> None:
+        """Init."""
+        self.svg = svg
+        self.lease_seconds = lease_seconds
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.flusher: Optional[threading.Thread] = None
+        # Every reservation moves the high water mark, so an expired lease only leaves a gap
+        self.high_water: VersionInfo = svg.latest_version
+        self.leases: Dict[str, Lease] = {}
+        self.pending: List[Tuple[str, Optional[str]]] = []
+        self.tags: Dict[str, str] = {}
+
+    def expire_leases(self) -> None:
+        """Expire leases."""
+        now = time.monotonic()
+        for lease_id in [lease.lease_id for lease in self.leases.values() if lease.expires <= now]:
+            logger.debug(f"Lease {lease_id} expired")
+            del self.leases[lease_id]
+
+    def reserve(self, bump_type: str) -> Lease:
+        """Reserve next version."""
+        bump_type = str(BumpType(bump_type))
+        if bump_type == BumpType.AUTO:
+            raise ValueError("The auto bump type needs the commits of a job (use major, minor or patch)")
+        with self.lock:
+            self.expire_leases()
+            version = self.svg.bump_version(self.high_water, bump_type)
+            self.high_water = version
+            lease = Lease(
+                lease_id=uuid.uuid4().hex,
+                version=version,
+                tag=f"{self.svg.version_prefix}{version}",
+                expires=time.monotonic() + self.lease_seconds,
+            )
+            self.leases[lease.lease_id] = lease
+        logger.info(f"Reserved {lease.tag} (lease {lease.lease_id})")
+        return lease
+
+    def confirm(self, lease_id: str, commit: Optional[str] = None) -> str:
+        """Confirm lease."""
+        if commit is not None and not COMMIT_SHA_REGEX.fullmatch(commit):
+            raise ValueError(f"Invalid commit {commit!r} (expected a full sha)")
+        with self.lock:
+            self.expire_leases()
+            lease = self.leases.pop(lease_id, None)
+            if lease is None:
+                raise LeaseError(f"Unknown or expired lease {lease_id}")
+            self.pending.append((lease.tag, commit))
+            self.tags[lease.tag] = "pending"
+        logger.info(f"Confirmed {lease.tag} (lease {lease_id})")
+        return lease.tag
+
+    def release(self, lease_id: str) -> None:
+        """Release lease."""
+        with self.lock:
+            if self.leases.pop(lease_id, None) is None:
+                raise LeaseError(f"Unknown or expired lease {lease_id}")
+        logger.info(f"Released lease {lease_id}")
+
+    def flush(self) -> int:
+        """Flush confirmed tags."""
+        with self.flush_lock:
+            with self.lock:
+                batch, self.pending = self.pending[: self.batch_size], self.pending[self.batch_size :]
+            if not batch:
+                return 0
+            tags = self.create_tags(batch)
+            if not tags:
+                return 0
+            pushed, rejected = self.push_tags(tags)
+            if rejected:
+                # Another job took some of these versions, move past the remote tags
+                self.svg.refresh_remote_versions()
+                with self.lock:
+                    self.high_water = max(self.high_water, self.svg.latest_version)
+        if pushed:
+            logger.success(f"⭐ Pushed {len(pushed)} tags")
+        return len(pushed)
+
+    def create_tags(self, batch: List[Tuple[str, Optional[str]]]) -> List[str]:
+        """Create tags."""
+        tags = []
+        for tag, commit in batch:
+            try:
+                if commit is not None and not has_commit(self.svg.current_repo, commit):
+                    fetch_commit(repo=self.svg.current_repo, commit=commit, remote=self.svg.remotes[0])
+                set_tag(repo=self.svg.current_repo, tag=tag, commit=commit, dry_run=self.dry_run)
+                tags.append(tag)
+            except (GitCommandError, ValueError) as exp:
+                logger.error(f"Can't create {tag} ({exp})")
+                self.set_states([tag], "failed")
+        return tags
+
+    def push_tags(self, tags: List[str]) -> Tuple[List[str], bool]:
+        """Push tags."""
+        repo = self.svg.current_repo
+        try:
+            push_refs(
+                repo=repo,
+                refspecs=[f"{TAGS_REF}{tag}" for tag in tags],
+                remotes=self.svg.remotes,
+                dry_run=self.dry_run,
+            )
+        except GitCommandError as exp:
+            if len(tags) > 1 and is_push_rejected(exp):
+                # One taken tag rejects the whole batch, push the tags one by one so only the taken ones fail
+                logger.warning(f"Push of {len(tags)} tags was rejected, pushing them one by one")
+                results = [self.push_tags([tag]) for tag in tags]
+                return [tag for pushed, _ in results for tag in pushed], True
+            logger.error(f"Push of {len(tags)} tags failed ({exp})")
+            kept = retract_unpushed_tags(repo=repo, tags=tags, error=exp, dry_run=self.dry_run)
+            self.set_states(tags, "partial" if kept else "failed")
+            return [], is_push_rejected(exp)
+        self.set_states(tags, "pushed")
+        return tags, False
+
+    def set_states(self, tags: List[str], state: str) -> None:
+        """Set states."""
+        with self.lock:
+            for tag in tags:
+                # Moved to the end, the finished tags are kept in the order they finished
+                self.tags.pop(tag, None)
+                self.tags[tag] = state
+            finished = [tag for tag, tag_state in self.tags.items() if tag_state != "pending"]
+            for tag in finished[: max(0, len(finished) - self.tag_history)]:
+                del self.tags[tag]
+
+    def status(self) -> Dict[str, Any]:
+        """Status of the allocator."""
+        with self.lock:
+            self.expire_leases()
+            return {
+                "latest": str(self.svg.latest_version),
+                "high_water": str(self.high_water),
+                "leases": len(self.leases),
+                "pending": len(self.pending),
+                "tags": dict(self.tags),
+            }
+
+    def flush_safely(self) -> int:
+        """Flush safely."""
+        try:
+            return self.flush()
+        except Exception as exp:  # pylint: disable=broad-exception-caught
+            # The batch was already taken from the pending tags, the next flush goes on with the next one
+            logger.error(f"Flush failed ({exp!r})")
+            return 0
+
+    def run_flusher(self) -> None:
+        """Run flusher."""
+        while not self.stop_event.wait(self.flush_interval):
+            while self.flush_safely() == self.batch_size:
+                pass
+
+    def start(self) -> None:
+        """Start flushing."""
+        self.flusher = threading.Thread(target=self.run_flusher, name="semvergit-flusher", daemon=True)
+        self.flusher.start()
+
+    def stop(self) -> None:
+        """Stop flushing."""
+        self.stop_event.set()
+        if self.flusher is not None:
+            self.flusher.join()
+        # Every flush takes a batch, failed tags are recorded and don't stop the remaining batches
+        while self.pending:
+            self.flush_safely()
+
+
+class AllocationHandler(BaseHTTPRequestHandler):
+    """Allocation handler."""
+
+    def __init__(self, *args: Any, allocator: VersionAllocator, **kwargs: Any) -> None:
+        """Init."""
+        self.allocator = allocator
+        super().__init__(*args, **kwargs)
+
+    def address_string(self) -> str:
+        """Address string."""
+        return str(self.client_address[0]) if self.client_address else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+        """Log requests with the logger."""
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def reply(self, status: int, body: Dict[str, Any]) -> None:
+        """Reply with a JSON body."""
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def read_json(self) -> Dict[str, Any]:
+        """Read JSON."""
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not isinstance(body, dict):
+            raise ValueError("Expected a JSON object")
+        return body
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Handle GET requests."""
+        if self.path == "/status":
+            self.reply(200, self.allocator.status())
+        else:
+            self.reply(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """Handle POST requests."""
+        try:
+            body = self.read_json()
+            if self.path == "/reserve":
+                lease = self.allocator.reserve(body.get("bump_type", str(BumpType.PRERELEASE)))
+                self.reply(
+                    200,
+                    {
+                        "lease": lease.lease_id,
+                        "version": str(lease.version),
+                        "tag": lease.tag,
+                        "expires_in": self.allocator.lease_seconds,
+                    },
+                )
+            elif self.path == "/confirm":
+                tag = self.allocator.confirm(body["lease"], commit=body.get("commit"))
+                self.reply(200, {"tag": tag, "state": "pending"})
+            elif self.path == "/release":
+                self.allocator.release(body["lease"])
+                self.reply(200, {"released": body["lease"]})
+            elif self.path == "/flush":
+                self.reply(200, {"pushed": self.allocator.flush()})
+            else:
+                self.reply(404, {"error": f"Unknown path {self.path}"})
+        except LeaseError as exp:
+            self.reply(409, {"error": str(exp)})
+        except (KeyError, ValueError) as exp:
+            self.reply(400, {"error": f"Bad request ({exp})"})
+
+
+class UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    """HTTP server on a Unix socket."""
+
+    daemon_threads = True
+
+
+def remove_stale_socket(socket_path: str) -> None:
+    """Remove stale socket."""
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise ValueError(f"{socket_path} exists and is not a socket")
+    os.unlink(socket_path)
+
+
+def make_server(
+    allocator: VersionAllocator, host: str = "127.0.0.1", port: int = 8765, socket_path: Optional[str] = None
+) -> BaseServer:
+    """Make server."""
+    handler = partial(AllocationHandler, allocator=allocator)
+    if socket_path is not None:
+        remove_stale_socket(socket_path)
+        return UnixHTTPServer(socket_path, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def interrupt(signum: int, _frame: Any) -> None:
+    """Signal handler stopping the server as Ctrl+C does."""
+    raise KeyboardInterrupt(signal.Signals(signum).name)
+
+
+def run_server(server: BaseServer, allocator: VersionAllocator) -> None:
+    """Run server."""
+    # Signal handlers can only be set in the main thread
+    handle_sigterm = threading.current_thread() is threading.main_thread()
+    previous_handler = signal.signal(signal.SIGTERM, interrupt) if handle_sigterm else None
+    allocator.start()
+    logger.success(f"Serving versions on {server.server_address!r}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Stopping...")
+    finally:
+        if handle_sigterm:
+            signal.signal(signal.SIGTERM, previous_handler)
+        server.server_close()
+        allocator.stop()
+        if isinstance(server, UnixHTTPServer):
+            os.unlink(str(server.server_address))
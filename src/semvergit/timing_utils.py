@@ -0,0 +1,79 @@
+"""Timing utilities."""
+
+import json
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+from git import Git
+
+__all__ = ["Timings"]
+
+TIMINGS_FORMAT = 1
+
+
+class Timings:
+    """Timings."""
+
+    def __init__(self) -> None:
+        """Init."""
+        self.start = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self.counters: Dict[str, int] = {}
+        self.stack: List[str] = []
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the enclosed block."""
+        self.stack.append(name)
+        path = ".".join(self.stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stack.pop()
+            self.spans.append(
+                {"name": path, "start": start - self.start, "seconds": time.perf_counter() - start},
+            )
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Add to a counter."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def track_git(self) -> Iterator[None]:
+        """Track git commands."""
+        execute = Git.execute
+
+        def timed_execute(git: Git, *args: Any, **kwargs: Any) -> Any:
+            self.count("git_commands")
+            start = time.perf_counter()
+            try:
+                return execute(git, *args, **kwargs)
+            finally:
+                self.count("git_microseconds", int((time.perf_counter() - start) * 1_000_000))
+
+        Git.execute = timed_execute  # type: ignore[method-assign,assignment]
+        try:
+            yield
+        finally:
+            Git.execute = execute  # type: ignore[method-assign]
+
+    def report(self) -> Dict[str, Any]:
+        """Report."""
+        return {
+            "format": TIMINGS_FORMAT,
+            "total_seconds": time.perf_counter() - self.start,
+            "spans": sorted(self.spans, key=lambda span: span["start"]),
+            "counters": dict(self.counters),
+        }
+
+    def write(self, path: str) -> None:
+        """Write report."""
+        report = json.dumps(self.report(), indent=2)
+        if path == "-":
+            sys.stderr.write(f"{report}\n")
+            return
+        with open(path, "w", encoding="utf-8") as report_handle:
+            report_handle.write(f"{report}\n")
@@ -0,0 +1,178 @@
+"""Version utilities."""
+
+import heapq
+import operator
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from semver import VersionInfo
+
+VersionParts = Tuple[int, int, int, Optional[str], Optional[str]]
+# The index stores the parts as JSON lists
+PartsLike = Union[VersionParts, Sequence]
+PrereleaseKey = Tuple[Tuple[int, Union[int, str]], ...]
+PrecedenceKey = Tuple[int, int, int, int, PrereleaseKey]
+
+# Same grammar as semver's VersionInfo.parse (https://semver.org)
+SEMVER_REGEX = re.compile(
+    r"(?P<major>0|[1-9]\d*)\.(?P<minor>0|[1-9]\d*)\.(?P<patch>0|[1-9]\d*)"
+    r"(?:-(?P<prerelease>(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*)(?:\.(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*))*))?"
+    r"(?:\+(?P<build>[0-9a-zA-Z-]+(?:\.[0-9a-zA-Z-]+)*))?"
+)
+
+RANGE_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+RANGE_REGEX = re.compile(r"\s*(>=|<=|==|!=|>|<)?\s*(\S+)\s*")
+# Maintenance line: MAJOR or MAJOR.MINOR
+LINE_REGEX = re.compile(r"(0|[1-9]\d*)(?:\.(0|[1-9]\d*))?")
+VersionRange = List[Tuple[Callable[[Any, Any], bool], PrecedenceKey]]
+
+# Invalid tags shown in the summary
+INVALID_EXAMPLES = 5
+
+
+class InvalidTagError(ValueError):
+    """Invalid tag error."""
+
+
+class VersionLineError(ValueError):
+    """Version line error."""
+
+
+def parse_parts(version: str) -> VersionParts:
+    """Parse parts."""
+    match = SEMVER_REGEX.fullmatch(version)
+    if match is None:
+        raise ValueError(f"{version} is not valid SemVer string")
+    major, minor, patch, prerelease, build = match.groups()
+    return (int(major), int(minor), int(patch), prerelease, build)
+
+
+def version_parts(version: VersionInfo) -> VersionParts:
+    """Version parts."""
+    return (version.major, version.minor, version.patch, version.prerelease, version.build)
+
+
+def format_parts(parts: PartsLike) -> str:
+    """Format parts."""
+    version = f"{parts[0]}.{parts[1]}.{parts[2]}"
+    if parts[3]:
+        version = f"{version}-{parts[3]}"
+    if parts[4]:
+        version = f"{version}+{parts[4]}"
+    return version
+
+
+def to_version(parts: PartsLike) -> VersionInfo:
+    """To version."""
+    return VersionInfo(*parts)
+
+
+def precedence_key(parts: PartsLike) -> PrecedenceKey:
+    """Precedence key."""
+    prerelease = parts[3]
+    if not prerelease:
+        return (parts[0], parts[1], parts[2], 1, ())
+    # Numeric identifiers have lower precedence than alphanumeric ones
+    identifiers = tuple((0, int(part)) if part.isdigit() else (1, part) for part in prerelease.split("."))
+    return (parts[0], parts[1], parts[2], 0, identifiers)
+
+
+def latest_parts(parts: Iterable[PartsLike]) -> Optional[PartsLike]:
+    """Latest parts."""
+    return max(parts, key=precedence_key, default=None)
+
+
+def top_parts(parts: Iterable[PartsLike], count: int) -> List[PartsLike]:
+    """Top parts."""
+    return heapq.nlargest(count, parts, key=precedence_key)
+
+
+def iter_tag_parts(
+    tags: Iterable[str], parse: Callable[[str], VersionParts], invalid: List[str], strict: bool = False
+) -> Iterator[Tuple[str, VersionParts]]:
+    """Iterate tag parts."""
+    for tag in tags:
+        try:
+            parts = parse(tag)
+        except ValueError as exp:
+            if strict:
+                raise InvalidTagError(f"Invalid version tag {tag} ({exp})") from exp
+            invalid.append(tag)
+            continue
+        yield tag, parts
+
+
+def invalid_summary(invalid: Sequence[str]) -> str:
+    """Invalid summary."""
+    examples = ", ".join(invalid[:INVALID_EXAMPLES])
+    more = ", ..." if len(invalid) > INVALID_EXAMPLES else ""
+    return f"{len(invalid)} invalid version tags ({examples}{more})"
+
+
+def parse_range(expression: str) -> VersionRange:
+    """Parse range."""
+    version_range = []
+    for item in expression.split(","):
+        match = RANGE_REGEX.fullmatch(item)
+        if match is None:
+            raise ValueError(f"Invalid version range {expression}")
+        comparison, version = match.groups()
+        version_range.append((RANGE_OPERATORS[comparison or "=="], precedence_key(parse_parts(version))))
+    return version_range
+
+
+def in_range(parts: PartsLike, version_range: VersionRange) -> bool:
+    """Check if in range."""
+    key = precedence_key(parts)
+    return all(compare(key, bound) for compare, bound in version_range)
+
+
+def version_record(parts: PartsLike, prefix: str) -> Dict[str, Any]:
+    """Version record."""
+    version = to_version(parts)
+    return {
+        "tag": f"{prefix}{version}",
+        "version": str(version),
+        "major": version.major,
+        "minor": version.minor,
+        "patch": version.patch,
+        "prerelease": version.prerelease,
+        "build": version.build,
+    }
+
+
+def parse_line(line: str) -> str:
+    """Parse line."""
+    if LINE_REGEX.fullmatch(line) is None:
+        raise ValueError(f"Invalid version line {line} (MAJOR or MAJOR.MINOR, e.g. 1.4)")
+    return line
+
+
+def line_keys(major: int, minor: int) -> Tuple[str, str]:
+    """Line keys."""
+    return (f"{major}", f"{major}.{minor}")
+
+
+def in_line(line: str, major: int, minor: int) -> bool:
+    """Check if in line."""
+    return line in line_keys(major, minor)
+
+
+def line_index(parts: Iterable[PartsLike]) -> Dict[str, PartsLike]:
+    """Line index."""
+    lines: Dict[str, PartsLike] = {}
+    keys: Dict[str, PrecedenceKey] = {}
+    for item in parts:
+        key = precedence_key(item)
+        for line in line_keys(item[0], item[1]):
+            if line not in keys or key > keys[line]:
+                lines[line] = item
+                keys[line] = key
+    return lines
@@ -1,12 +1,16 @@
 """Pytest configuration."""
 
-from typing import Generator, List
+import subprocess
+from pathlib import Path
+from typing import Callable, Generator, List, Optional, Sequence
 
 import pytest
 from git import Repo
 from loguru import logger
 from pytest import LogCaptureFixture, MonkeyPatch
 
+from semvergit import app, git_utils
+
 
 @pytest.fixture(autouse=True)
 def caplog(caplog: LogCaptureFixture) -> Generator:  # pylint: disable=redefined-outer-name
@@ -20,6 +24,32 @@ def caplog(caplog: LogCaptureFixture) -> Generator:  # pylint: disable=redefined
     logger.remove()
 
 
+def run_git(*args: str, cwd: Path) -> str:
+    """Run a git command and return its output."""
+    result = subprocess.run(["git", *args], capture_output=True, text=True, check=True, cwd=cwd)
+    return result.stdout.strip()
+
+
+@pytest.fixture()
+def git() -> Callable[..., str]:
+    """Git command runner."""
+    return run_git
+
+
+@pytest.fixture()
+def git_repo(tmp_path: Path) -> Path:
+    """Create a git repository with a single commit."""
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    run_git("-c", "init.defaultBranch=master", "init", cwd=repo_dir)
+    run_git("config", "user.email", "test@test", cwd=repo_dir)
+    run_git("config", "user.name", "Test User", cwd=repo_dir)
+    (repo_dir / "initial.txt").write_text("initial", encoding="utf-8")
+    run_git("add", ".", cwd=repo_dir)
+    run_git("commit", "-m", "Initial commit", cwd=repo_dir)
+    return repo_dir
+
+
 @pytest.fixture(autouse=True)
 def mock_get_repo(monkeypatch: MonkeyPatch) -> None:
     """Mock get_repo."""
@@ -30,6 +60,39 @@ def mock_get_repo(monkeypatch: MonkeyPatch) -> None:
     monkeypatch.setattr("semvergit.app.get_repo", get_repo)
 
 
+@pytest.fixture()
+def git_remote(git_repo: Path, tmp_path: Path) -> Path:  # pylint: disable=redefined-outer-name
+    """Create a bare remote (origin) of git_repo."""
+    remote_dir = tmp_path / "remote.git"
+    run_git("clone", "--bare", str(git_repo), str(remote_dir), cwd=tmp_path)
+    run_git("remote", "add", "origin", str(remote_dir), cwd=git_repo)
+    run_git("fetch", "origin", cwd=git_repo)
+    run_git("branch", "--set-upstream-to=origin/master", cwd=git_repo)
+    return remote_dir
+
+
+@pytest.fixture(autouse=True)
+def mock_close_repo(monkeypatch: MonkeyPatch) -> List[str]:
+    """Mock close_repo (returns the closed repos)."""
+    closed_repos: List[str] = []
+
+    def close_repo(repo: str) -> None:
+        closed_repos.append(repo)
+
+    monkeypatch.setattr("semvergit.app.close_repo", close_repo)
+    return closed_repos
+
+
+@pytest.fixture(autouse=True)
+def mock_get_git_dir(monkeypatch: MonkeyPatch) -> None:
+    """Mock get_git_dir (no git dir means no version index)."""
+
+    def get_git_dir(repo: Repo) -> str:  # pylint: disable=unused-argument
+        return ""
+
+    monkeypatch.setattr("semvergit.app.get_git_dir", get_git_dir)
+
+
 @pytest.fixture(autouse=True)
 def mock_get_active_branch(monkeypatch: MonkeyPatch) -> None:
     """Mock get_active_branch."""
@@ -78,6 +141,16 @@ def mock_pull_remote(monkeypatch: MonkeyPatch) -> None:
     monkeypatch.setattr("semvergit.app.pull_remote", pull_remote)
 
 
+@pytest.fixture(autouse=True)
+def mock_fetch_remote_tags(monkeypatch: MonkeyPatch) -> None:
+    """Mock fetch_remote_tags."""
+
+    def fetch_remote_tags(repo: Repo, prefix: str, remote: str) -> int:  # pylint: disable=unused-argument
+        return 1
+
+    monkeypatch.setattr("semvergit.app.fetch_remote_tags", fetch_remote_tags)
+
+
 @pytest.fixture(autouse=True)
 def mock_set_tag(monkeypatch: MonkeyPatch) -> None:
     """Mock set_tag."""
@@ -90,16 +163,46 @@ def mock_set_tag(monkeypatch: MonkeyPatch) -> None:
     monkeypatch.setattr("semvergit.app.set_tag", set_tag)
 
 
+@pytest.fixture(autouse=True)
+def mock_delete_tag(monkeypatch: MonkeyPatch) -> None:
+    """Mock delete_tag."""
+
+    def delete_tag(repo: Repo, tag: str, dry_run: bool) -> None:  # pylint: disable=unused-argument
+        logger.debug(f"Deleted mock-set-tag-{tag}")
+
+    monkeypatch.setattr("semvergit.app.delete_tag", delete_tag)
+
+
+@pytest.fixture()
+def real_git_utils(monkeypatch: MonkeyPatch) -> None:
+    """Use the real git_utils functions in the app (undo the autouse mocks)."""
+    for name in dir(git_utils):
+        if hasattr(app, name) and getattr(app, name) is not getattr(git_utils, name):
+            monkeypatch.setattr(app, name, getattr(git_utils, name))
+
+
 @pytest.fixture(autouse=True)
 def mock_push_remote(monkeypatch: MonkeyPatch) -> None:
     """Mock push_remote."""
 
-    def push_remote(repo: Repo, tag_str: str, dry_run: bool) -> None:  # pylint: disable=unused-argument
-        pass
+    def push_remote(  # pylint: disable=unused-argument
+        repo: Repo, tag_str: str, remotes: Sequence[str], dry_run: bool, branch: Optional[str] = None
+    ) -> None:
+        logger.debug(f"Pushed {tag_str} (branch {branch}) to {list(remotes)}")
 
     monkeypatch.setattr("semvergit.app.push_remote", push_remote)
 
 
+@pytest.fixture(autouse=True)
+def mock_push_refs(monkeypatch: MonkeyPatch) -> None:
+    """Mock push_refs."""
+
+    def push_refs(repo: Repo, refspecs: Sequence[str], remotes: Sequence[str], dry_run: bool) -> None:
+        logger.debug(f"Pushed {list(refspecs)} to {list(remotes)} (dry run: {dry_run}, {repo})")
+
+    monkeypatch.setattr("semvergit.app.push_refs", push_refs)
+
+
 @pytest.fixture(autouse=True)
 def mock_new_commit(monkeypatch: MonkeyPatch) -> None:
     """Mock new_commit."""
@@ -111,13 +214,25 @@ def mock_new_commit(monkeypatch: MonkeyPatch) -> None:
 
 
 @pytest.fixture(autouse=True)
-def mock_add_file(monkeypatch: MonkeyPatch) -> None:
-    """Mock add_file."""
+def mock_commit_files(monkeypatch: MonkeyPatch) -> None:
+    """Mock commit_files."""
+
+    def commit_files(  # pylint: disable=unused-argument
+        repo: Repo, file_paths: Sequence[str], message: str, branch: str, dry_run: bool
+    ) -> None:
+        pass
+
+    monkeypatch.setattr("semvergit.app.commit_files", commit_files)
+
+
+@pytest.fixture(autouse=True)
+def mock_add_files(monkeypatch: MonkeyPatch) -> None:
+    """Mock add_files."""
 
-    def add_file(repo: Repo, file_path: str, dry_run: bool) -> None:  # pylint: disable=unused-argument
+    def add_files(repo: Repo, file_paths: Sequence[str], dry_run: bool) -> None:  # pylint: disable=unused-argument
         pass
 
-    monkeypatch.setattr("semvergit.app.add_file", add_file)
+    monkeypatch.setattr("semvergit.app.add_files", add_files)
 
 
 @pytest.fixture()
@@ -1,11 +1,29 @@
 """Test app."""
 
-from typing import Callable, List, Optional
+# pylint: disable=too-many-lines
 
-from pytest import CaptureFixture, LogCaptureFixture, mark
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+from git import GitCommandError, Repo
+from pytest import CaptureFixture, LogCaptureFixture, MonkeyPatch, mark, raises
 from semver import VersionInfo
 
-from semvergit.app import BumpType, SemverGit
+from semvergit import git_utils
+from semvergit.app import (
+    BumpType,
+    InvalidTagError,
+    MultiSemverGit,
+    RemoteSemverGit,
+    SemverGit,
+    Timings,
+    VersionLineError,
+)
+from semvergit.file_utils import parse_stamp
+from semvergit.git_utils import AsyncGit, PushError
 
 
 @mark.parametrize(
@@ -59,6 +77,191 @@ def test_app(pull_branch: bool, expected: VersionInfo) -> None:
     assert svg.latest_version == VersionInfo(0, 0, 4)
 
 
+@mark.parametrize(
+    "commit_message, version_file, expected_branch",
+    [(None, None, None), ("message", None, "test_branch"), (None, "test_version_file", "test_branch")],
+)
+def test_app_update_push(
+    caplog: LogCaptureFixture,
+    mock_update_verion_file: Callable,  # pylint: disable=unused-argument
+    commit_message: Optional[str],
+    version_file: Optional[str],
+    expected_branch: Optional[str],
+) -> None:
+    """Test app pushes the new commit together with the tag."""
+    svg = SemverGit(remotes=["origin", "backup"])
+    svg.update(str(BumpType.PATCH), dry_run=False, commit_message=commit_message, version_file=version_file)
+    assert f"Pushed v0.0.5 (branch {expected_branch}) to ['origin', 'backup']" in caplog.messages
+
+
+def test_app_fetch_tags(caplog: LogCaptureFixture) -> None:
+    """Test app fetching the tags."""
+    svg = SemverGit(fetch_tags=True, remotes=["upstream"])
+    assert svg.remotes == ("upstream",)
+    assert not check_substring("Fetched 1 new tags", caplog.messages)
+    assert svg.latest_version == VersionInfo(0, 0, 4)
+    assert check_substring("Fetched 1 new tags", caplog.messages)
+    # Fetched once
+    svg.invalidate()
+    assert svg.version_parts
+    assert len([message for message in caplog.messages if "Fetched 1 new tags" in message]) == 1
+
+
+def test_app_close(mock_close_repo: List[str]) -> None:
+    """Test app closes the repo it opened."""
+    with SemverGit() as svg:
+        assert svg.owns_repo
+        assert svg.latest_version == VersionInfo(0, 0, 4)
+        assert not mock_close_repo
+    assert mock_close_repo == ["test_repo"]
+    # A repo that was never opened isn't closed
+    with SemverGit():
+        pass
+    assert mock_close_repo == ["test_repo"]
+
+
+def test_app_lazy(monkeypatch: MonkeyPatch) -> None:
+    """Test app does no git I/O until the state is first accessed (and computes it once)."""
+
+    def get_repo() -> str:
+        raise AssertionError("Should not open the repo")
+
+    monkeypatch.setattr("semvergit.app.get_repo", get_repo)
+    with SemverGit(pull_branch=True, fetch_tags=True):
+        pass
+    monkeypatch.setattr("semvergit.app.get_repo", lambda: "test_repo")
+    listed: List[str] = []
+
+    def get_tags_with_prefix(repo: str, prefix: str) -> List[str]:
+        listed.append(repo)
+        return [f"{prefix}1.0.0"]
+
+    def get_active_branch(repo: str) -> None:
+        raise TypeError(f"HEAD of {repo} is detached")
+
+    monkeypatch.setattr("semvergit.app.get_tags_with_prefix", get_tags_with_prefix)
+    monkeypatch.setattr("semvergit.app.get_active_branch", get_active_branch)
+    svg = SemverGit(use_cache=False)
+    # A tag only update never needs the (detached) branch
+    assert svg.update(str(BumpType.PATCH), dry_run=True) == "v1.0.1"
+    assert svg.versions == [VersionInfo(1, 0, 0)]
+    assert listed == ["test_repo"]
+    svg.invalidate()
+    assert svg.latest_version == VersionInfo(1, 0, 0)
+    assert listed == ["test_repo", "test_repo"]
+    with raises(TypeError, match="detached"):
+        assert svg.branch
+
+
+def test_app_injected_repo(monkeypatch: MonkeyPatch, mock_close_repo: List[str]) -> None:
+    """Test app with an injected repo."""
+    opened_repos = []
+    monkeypatch.setattr("semvergit.app.get_repo", lambda: opened_repos.append("opened"))
+    tag_repos = []
+
+    def get_tags_with_prefix(repo: str, prefix: str) -> List[str]:
+        tag_repos.append(repo)
+        return [f"{prefix}1.0.0"]
+
+    monkeypatch.setattr("semvergit.app.get_tags_with_prefix", get_tags_with_prefix)
+    with SemverGit(repo="injected_repo") as svg:  # type: ignore[arg-type]
+        assert svg.current_repo == "injected_repo"
+        assert svg.latest_version == VersionInfo(1, 0, 0)
+    assert not opened_repos
+    assert tag_repos == ["injected_repo"]
+    assert not mock_close_repo
+
+
+def test_app_index(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test app with the version index."""
+    monkeypatch.setattr("semvergit.app.get_git_dir", lambda repo: str(tmp_path))
+    svg = SemverGit()
+    assert svg.index is not None
+    assert svg.versions == [VersionInfo(0, 0, 1), VersionInfo(0, 0, 2), VersionInfo(0, 0, 3), VersionInfo(0, 0, 4)]
+    assert svg.latest_version == VersionInfo(0, 0, 4)
+    assert (tmp_path / "semvergit" / "index.json").exists()
+
+    def get_tags_with_prefix(repo: str, prefix: str) -> List[str]:
+        raise AssertionError(f"Should use the index ({repo}, {prefix})")
+
+    monkeypatch.setattr("semvergit.app.get_tags_with_prefix", get_tags_with_prefix)
+    assert SemverGit().latest_version == VersionInfo(0, 0, 4)
+
+
+def test_app_version_parts() -> None:
+    """Test app keeps compact version parts and materializes the versions on demand."""
+    svg = SemverGit(use_cache=False)
+    assert svg.version_parts == [
+        (0, 0, 1, None, None),
+        (0, 0, 2, None, None),
+        (0, 0, 3, None, None),
+        (0, 0, 4, None, None),
+    ]
+    assert svg.get_versions() == svg.versions
+    assert svg.parse_tag("v1.2.3-dev.1") == VersionInfo(1, 2, 3, "dev.1")
+    assert svg.parse_tag_parts("1.2.3") == (1, 2, 3, None, None)
+
+
+def test_app_invalid_tags(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture, tmp_path: Path) -> None:
+    """Test app skips the tags that aren't valid versions (with and without the index)."""
+    monkeypatch.setattr("semvergit.app.get_tags_with_prefix", lambda repo, prefix: ["v1.2", "v0.1.0", "very-old-tag"])
+    svg = SemverGit(use_cache=False)
+    assert svg.latest_version == VersionInfo(0, 1, 0)
+    assert svg.invalid_tags == ["v1.2", "very-old-tag"]
+    assert check_substring("Skipped 2 invalid version tags (v1.2, very-old-tag)", caplog.messages)
+    monkeypatch.setattr("semvergit.app.get_git_dir", lambda repo: str(tmp_path))
+    svg = SemverGit()
+    assert svg.latest_version == VersionInfo(0, 1, 0)
+    assert svg.invalid_tags == ["v1.2", "very-old-tag"]
+
+
+@mark.parametrize("use_cache", [True, False])
+def test_app_invalid_tags_strict(monkeypatch: MonkeyPatch, tmp_path: Path, use_cache: bool) -> None:
+    """Test app fails on invalid tags in strict mode."""
+    monkeypatch.setattr("semvergit.app.get_git_dir", lambda repo: str(tmp_path))
+    monkeypatch.setattr("semvergit.app.get_tags_with_prefix", lambda repo, prefix: ["v0.1.0", "v1.2"])
+    svg = SemverGit(use_cache=use_cache, strict=True)
+    with raises(InvalidTagError, match="v1.2"):
+        assert svg.latest_version
+
+
+def test_app_timings(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test app timings hook (spans of each phase and counters)."""
+    monkeypatch.setattr("semvergit.app.get_git_dir", lambda repo: str(tmp_path))
+    timings = Timings()
+    svg = SemverGit(timings=timings)
+    svg.update(str(BumpType.PATCH), dry_run=True, commit_message="message")
+    svg.update(str(BumpType.PATCH), dry_run=True)
+    names = {span["name"] for span in timings.report()["spans"]}
+    assert {"update.latest.get_repo", "update.latest.list_tags", "update.commit", "update.push"} <= names
+    assert "update.push.publish_tag" in names
+    assert timings.counters == {"tags_scanned": 4, "tags_parsed": 4, "tags_invalid": 0}
+    timings = Timings()
+    assert SemverGit(use_cache=False, timings=timings).version_parts
+    assert "versions.parse" in {span["name"] for span in timings.report()["spans"]}
+    assert timings.counters == {"tags_scanned": 4, "tags_parsed": 4, "tags_invalid": 0}
+
+
+def test_remote_app_timings(monkeypatch: MonkeyPatch) -> None:
+    """Test remote only app timings."""
+    monkeypatch.setattr("semvergit.app.ls_remote_tags", lambda remote, prefix: [f"{prefix}0.1.0"])
+    monkeypatch.setattr("semvergit.app.push_remote_tag", lambda remote, tag_str, commit, dry_run: None)
+    timings = Timings()
+    RemoteSemverGit(commit="headsha", timings=timings).update(str(BumpType.PATCH), dry_run=True)
+    names = {span["name"] for span in timings.report()["spans"]}
+    assert {"update.latest.versions.list_tags", "update.latest.versions.parse", "update.push.publish_tag"} <= names
+    assert timings.counters == {"tags_scanned": 1, "tags_parsed": 1, "tags_invalid": 0}
+
+
+def test_app_no_cache(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test app without the version index."""
+    monkeypatch.setattr("semvergit.app.get_git_dir", lambda repo: str(tmp_path))
+    svg = SemverGit(use_cache=False)
+    assert svg.index is None
+    assert svg.latest_version == VersionInfo(0, 0, 4)
+    assert not (tmp_path / "semvergit").exists()
+
+
 @mark.parametrize(
     "dry_run",
     [
@@ -184,3 +387,630 @@ def test_app_update(  # pylint: disable=too-many-arguments,too-many-positional-a
     assert new_version == expected_tag_str
     print(f"{caplog.messages=}")
     assert check_substring(f"New version tag: {expected_tag_str}", caplog.messages)
+
+
+@mark.parametrize("dry_run", [True, False])
+@mark.parametrize("commit", [None, "1234abc"])
+def test_remote_app_update(monkeypatch: MonkeyPatch, capsys: CaptureFixture, dry_run: bool, commit: str) -> None:
+    """Test remote only app."""
+    monkeypatch.setattr("semvergit.app.ls_remote_tags", lambda remote, prefix: [f"{prefix}0.1.0", f"{prefix}0.2.0"])
+    monkeypatch.setattr("semvergit.app.resolve_remote_ref", lambda remote: "headsha")
+    pushed = []
+
+    def push_remote_tag(remote: str, tag_str: str, commit: str, dry_run: bool) -> None:
+        pushed.append((remote, tag_str, commit, dry_run))
+
+    monkeypatch.setattr("semvergit.app.push_remote_tag", push_remote_tag)
+    with RemoteSemverGit(remote="upstream", commit=commit) as svg:
+        assert svg.latest_version == VersionInfo(0, 2, 0)
+        assert svg.update(str(BumpType.PATCH), dry_run=dry_run) == "v0.2.1"
+    assert pushed == [("upstream", "v0.2.1", commit or "headsha", dry_run)]
+    assert capsys.readouterr().out == "v0.2.1"
+    # The base state is set up without the cache, and no local repository is opened (or closed)
+    assert (svg.remotes, svg.index, "current_repo" in svg.__dict__) == (("upstream",), None, False)
+
+
+def test_remote_app_invalid_tags(monkeypatch: MonkeyPatch) -> None:
+    """Test remote only app skips invalid tags (also when refreshing)."""
+    monkeypatch.setattr("semvergit.app.ls_remote_tags", lambda remote, prefix: ["v0.1.0", "v-legacy"])
+    svg = RemoteSemverGit()
+    assert svg.latest_version == VersionInfo(0, 1, 0)
+    assert svg.invalid_tags == ["v-legacy"]
+    svg.refresh_remote_versions()
+    assert svg.latest_version == VersionInfo(0, 1, 0)
+    with raises(InvalidTagError):
+        assert RemoteSemverGit(strict=True).latest_version
+
+
+def test_remote_app_no_versions(monkeypatch: MonkeyPatch) -> None:
+    """Test remote only app with no versions."""
+    monkeypatch.setattr("semvergit.app.ls_remote_tags", lambda remote, prefix: [])
+    assert RemoteSemverGit().latest_version == VersionInfo(0, 0, 0)
+
+
+@mark.parametrize(
+    "commit_message, auto_message, version_file", [("message", False, None), (None, True, None), (None, False, "file")]
+)
+def test_remote_app_no_commit(
+    monkeypatch: MonkeyPatch, commit_message: Optional[str], auto_message: bool, version_file: Optional[str]
+) -> None:
+    """Test remote only app can't commit."""
+    monkeypatch.setattr("semvergit.app.ls_remote_tags", lambda remote, prefix: [])
+    with raises(ValueError):
+        RemoteSemverGit().update(
+            str(BumpType.PATCH),
+            dry_run=True,
+            commit_message=commit_message,
+            auto_message=auto_message,
+            version_file=version_file,
+        )
+
+
+def test_remote_app_bare_remote(git: Callable[..., str], git_repo: Path, git_remote: Path) -> None:
+    """Test remote only app against a local bare remote."""
+    git("tag", "v1.2.3", cwd=git_repo)
+    git("push", "origin", "v1.2.3", cwd=git_repo)
+    svg = RemoteSemverGit(remote=str(git_remote))
+    assert svg.update(str(BumpType.MINOR), dry_run=False) == "v1.3.0"
+    assert git("rev-parse", "v1.3.0", cwd=git_remote) == git("rev-parse", "HEAD", cwd=git_repo)
+
+
+def rejected_push(tag_str: str) -> GitCommandError:
+    """Push error of a tag that already exists on the remote."""
+    return GitCommandError(["git", "push"], 1, stderr=f" ! [rejected]  {tag_str} -> {tag_str} (already exists)")
+
+
+def test_app_update_retry(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture, capsys: CaptureFixture) -> None:
+    """Test app allocates the next version again when the tag push is rejected."""
+    monkeypatch.setattr(SemverGit, "retry_base_delay", 0.0)
+    pushes: List[str] = []
+
+    def push_remote(  # pylint: disable=unused-argument
+        repo: str, tag_str: str, remotes: List[str], dry_run: bool
+    ) -> None:
+        pushes.append(tag_str)
+        if len(pushes) < 3:
+            raise rejected_push(tag_str)
+
+    remote_tags = [["v0.0.5"], ["v0.0.5", "v0.0.6"]]
+    monkeypatch.setattr("semvergit.app.push_remote", push_remote)
+    monkeypatch.setattr("semvergit.app.ls_remote_tags", lambda remote, prefix, repo: remote_tags.pop(0))
+    svg = SemverGit()
+    assert svg.update(str(BumpType.PATCH), dry_run=False, retries=2) == "v0.0.7"
+    assert pushes == ["v0.0.5", "v0.0.6", "v0.0.7"]
+    assert "Deleted mock-set-tag-v0.0.5" in caplog.messages
+    assert "Created mock-set-tag-v0.0.7" in caplog.messages
+    assert check_substring("Pushed v0.0.7 (attempts: 3, latency: ", caplog.messages)
+    assert capsys.readouterr().out == "v0.0.7"
+    caplog.clear()
+    svg.update(str(BumpType.PATCH), dry_run=True)
+    assert not check_substring("Pushed", caplog.messages)
+
+
+@mark.parametrize(
+    "error, retries",
+    [
+        (rejected_push("v0.0.5"), 0),
+        (GitCommandError(["git", "push"], 1, stderr="fatal: unable to access"), 3),
+        (GitCommandError(["git", "push"], 1, stderr=" ! [remote rejected] v0.0.5 -> v0.0.5 (hook declined)"), 3),
+    ],
+)
+def test_app_update_no_retry(monkeypatch: MonkeyPatch, error: GitCommandError, retries: int) -> None:
+    """Test app only retries rejected tag pushes (up to retries times)."""
+
+    def push_remote(*args: str, **kwargs: str) -> None:
+        raise error
+
+    monkeypatch.setattr("semvergit.app.push_remote", push_remote)
+    monkeypatch.setattr("semvergit.app.ls_remote_tags", lambda remote, prefix, repo: [])
+    monkeypatch.setattr(SemverGit, "retry_base_delay", 0.0)
+    with raises(GitCommandError):
+        SemverGit().update(str(BumpType.PATCH), dry_run=False, retries=retries)
+
+
+def test_app_update_commit_no_retry(monkeypatch: MonkeyPatch) -> None:
+    """Test app doesn't retry when the pushed commit holds the version."""
+    pushes: List[str] = []
+
+    def push_remote(  # pylint: disable=unused-argument,too-many-arguments,too-many-positional-arguments
+        repo: str, tag_str: str, branch: str, remotes: List[str], dry_run: bool
+    ) -> None:
+        pushes.append(tag_str)
+        raise rejected_push(tag_str)
+
+    monkeypatch.setattr("semvergit.app.push_remote", push_remote)
+    with raises(GitCommandError):
+        SemverGit().update(str(BumpType.PATCH), dry_run=False, commit_message="message", retries=3)
+    assert pushes == ["v0.0.5"]
+
+
+@mark.parametrize("attempt, expected_max", [(1, 0.2), (2, 0.4), (3, 0.8), (10, 5.0)])
+def test_app_retry_delay(attempt: int, expected_max: float) -> None:
+    """Test app retry delay."""
+    delay = SemverGit().retry_delay(attempt)
+    assert expected_max / 2 <= delay <= expected_max
+
+
+def test_app_update_race(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    real_git_utils: None,  # pylint: disable=unused-argument
+    monkeypatch: MonkeyPatch,
+    git: Callable[..., str],
+    git_repo: Path,
+    git_remote: Path,
+    tmp_path: Path,
+) -> None:
+    """Test two jobs allocating the same version against a local bare remote."""
+    monkeypatch.setattr(SemverGit, "retry_base_delay", 0.0)
+    other_dir = tmp_path / "other"
+    git("clone", str(git_remote), str(other_dir), cwd=tmp_path)
+    git("config", "user.email", "test@test", cwd=other_dir)
+    git("config", "user.name", "Test User", cwd=other_dir)
+    git("commit", "--allow-empty", "-m", "Other job", cwd=other_dir)
+    first = SemverGit(repo=Repo(git_repo))
+    other = SemverGit(repo=Repo(other_dir))
+    assert other.update(str(BumpType.PRERELEASE), dry_run=False) == "v0.0.1-dev.1"
+    assert first.update(str(BumpType.PRERELEASE), dry_run=False, retries=1) == "v0.0.1-dev.2"
+    assert git("tag", "-l", cwd=git_repo) == "v0.0.1-dev.2"
+    assert git("tag", "-l", cwd=git_remote).splitlines() == ["v0.0.1-dev.1", "v0.0.1-dev.2"]
+
+
+def test_app_update_concurrent(
+    real_git_utils: None,  # pylint: disable=unused-argument
+    monkeypatch: MonkeyPatch,
+    git: Callable[..., str],
+    git_remote: Path,
+    tmp_path: Path,
+) -> None:
+    """Test concurrent jobs racing for the same version (the remote rejects the losers) all get a version."""
+    monkeypatch.setattr(SemverGit, "retry_base_delay", 0.0)
+    jobs = 4
+    repo_dirs = [tmp_path / f"job{job}" for job in range(jobs)]
+    for repo_dir in repo_dirs:
+        git("clone", str(git_remote), str(repo_dir), cwd=tmp_path)
+        git("config", "user.email", "test@test", cwd=repo_dir)
+        git("config", "user.name", "Test User", cwd=repo_dir)
+        # Each job tags its own commit (pushing a tag identical to the remote one is a no-op, not a conflict)
+        git("commit", "--allow-empty", "-m", f"Build {repo_dir.name}", cwd=repo_dir)
+    # Every job allocates its version before any of them pushes (the first push of each job waits for the others)
+    barrier = threading.Barrier(jobs, timeout=30)
+    waited: Set[int] = set()
+
+    def push_remote(**kwargs: Any) -> None:
+        if threading.get_ident() not in waited:
+            waited.add(threading.get_ident())
+            barrier.wait()
+        git_utils.push_remote(**kwargs)
+
+    monkeypatch.setattr("semvergit.app.push_remote", push_remote)
+
+    def update(repo_dir: Path) -> str:
+        with SemverGit(repo=Repo(repo_dir)) as svg:
+            return svg.update(str(BumpType.PRERELEASE), dry_run=False, retries=jobs)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        new_tags = list(executor.map(update, repo_dirs))
+    expected = [f"v0.0.1-dev.{number}" for number in range(1, jobs + 1)]
+    assert sorted(new_tags) == expected
+    assert sorted(git("tag", "-l", cwd=git_remote).splitlines()) == expected
+
+
+def test_remote_app_update_retry(monkeypatch: MonkeyPatch) -> None:
+    """Test remote only app allocates the next version again when the tag push is rejected."""
+    monkeypatch.setattr(SemverGit, "retry_base_delay", 0.0)
+    remote_tags = [["v0.1.0"], ["v0.1.0", "v0.1.1"]]
+    monkeypatch.setattr("semvergit.app.ls_remote_tags", lambda remote, prefix: remote_tags.pop(0))
+    pushes = []
+
+    def push_remote_tag(remote: str, tag_str: str, commit: str, dry_run: bool) -> None:
+        pushes.append((remote, tag_str, commit, dry_run))
+        if len(pushes) == 1:
+            raise rejected_push(tag_str)
+
+    monkeypatch.setattr("semvergit.app.push_remote_tag", push_remote_tag)
+    svg = RemoteSemverGit(commit="1234abc")
+    assert svg.update(str(BumpType.PATCH), dry_run=False, retries=1) == "v0.1.2"
+    assert pushes == [("origin", "v0.1.1", "1234abc", False), ("origin", "v0.1.2", "1234abc", False)]
+
+
+def test_app_update_async_race(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    real_git_utils: None,  # pylint: disable=unused-argument
+    monkeypatch: MonkeyPatch,
+    capsys: CaptureFixture,
+    git: Callable[..., str],
+    git_repo: Path,
+    git_remote: Path,
+    tmp_path: Path,
+) -> None:
+    """Test two concurrent async updates allocating the same version against a local bare remote."""
+    monkeypatch.setattr(SemverGit, "retry_base_delay", 0.0)
+    other_dir = tmp_path / "other"
+    git("clone", str(git_remote), str(other_dir), cwd=tmp_path)
+    git("config", "user.email", "test@test", cwd=other_dir)
+    git("config", "user.name", "Test User", cwd=other_dir)
+    git("commit", "--allow-empty", "-m", "Other job", cwd=other_dir)
+    transport = AsyncGit(concurrency=1)
+
+    async def update_both() -> List[str]:
+        updates = [
+            SemverGit(repo=Repo(repo_dir)).update_async(str(BumpType.PRERELEASE), False, 1, transport)
+            for repo_dir in [git_repo, other_dir]
+        ]
+        return list(await asyncio.gather(*updates))
+
+    assert sorted(asyncio.run(update_both())) == ["v0.0.1-dev.1", "v0.0.1-dev.2"]
+    assert git("tag", "-l", cwd=git_remote).splitlines() == ["v0.0.1-dev.1", "v0.0.1-dev.2"]
+    assert (
+        sorted(git("tag", "-l", cwd=repo_dir) for repo_dir in [git_repo, other_dir])
+        == git("tag", "-l", cwd=git_remote).splitlines()
+    )
+    assert capsys.readouterr().out in ("v0.0.1-dev.1v0.0.1-dev.2", "v0.0.1-dev.2v0.0.1-dev.1")
+
+
+def test_app_update_async_dry_run(capsys: CaptureFixture, caplog: LogCaptureFixture) -> None:
+    """Test async update dry run (nothing pushed)."""
+    timings = Timings()
+    assert asyncio.run(SemverGit(timings=timings).update_async(str(BumpType.MINOR), dry_run=True)) == "v0.1.0"
+    assert "Dry run: push v0.1.0 to ['origin']" in caplog.messages
+    assert not check_substring("Pushed v0.1.0", caplog.messages)
+    assert capsys.readouterr().out == "v0.1.0"
+    assert {"update", "update.create_tag", "update.push", "update.push.publish_tag"} <= {
+        span["name"] for span in timings.report()["spans"]
+    }
+
+
+def test_app_update_async_sync_remote(monkeypatch: MonkeyPatch) -> None:
+    """Test async update pulls and fetches through the transport (once)."""
+    commands: List[str] = []
+
+    async def async_pull_remote(transport: AsyncGit, repo: str) -> None:  # pylint: disable=unused-argument
+        commands.append("pull")
+
+    async def async_fetch_tags(  # pylint: disable=unused-argument
+        transport: AsyncGit, repo: str, prefix: str, remote: str
+    ) -> None:
+        commands.append(f"fetch {remote} {prefix}")
+
+    def fetch_remote_tags(repo: str, prefix: str, remote: str) -> int:  # pylint: disable=unused-argument
+        raise AssertionError("The tags are fetched on asyncio")
+
+    monkeypatch.setattr("semvergit.app.async_pull_remote", async_pull_remote)
+    monkeypatch.setattr("semvergit.app.async_fetch_tags", async_fetch_tags)
+    monkeypatch.setattr("semvergit.app.fetch_remote_tags", fetch_remote_tags)
+    svg = SemverGit(pull_branch=True, fetch_tags=True)
+    assert asyncio.run(svg.update_async(str(BumpType.MINOR), dry_run=True)) == "v0.1.0"
+    assert asyncio.run(svg.update_async(str(BumpType.MINOR), dry_run=True)) == "v0.1.0"
+    assert commands == ["pull", "fetch origin v"]
+
+
+def test_app_update_async_reachable_from_retry(monkeypatch: MonkeyPatch) -> None:
+    """Test async update fetches the remote tags and keeps the reachable ones when the tag push is rejected."""
+    monkeypatch.setattr(SemverGit, "retry_base_delay", 0.0)
+    reachable_tags = [["v1.0.0"], ["v1.0.0", "v1.0.1"]]
+    pushes: List[List[str]] = []
+    fetches: List[str] = []
+
+    async def async_push_refs(  # pylint: disable=unused-argument
+        transport: AsyncGit, repo: str, refspecs: List[str], remotes: List[str]
+    ) -> None:
+        pushes.append(refspecs)
+        if refspecs == ["refs/tags/v1.0.1"]:
+            raise rejected_push("v1.0.1")
+
+    async def async_fetch_tags(  # pylint: disable=unused-argument
+        transport: AsyncGit, repo: str, prefix: str, remote: str
+    ) -> None:
+        fetches.append(remote)
+
+    monkeypatch.setattr("semvergit.app.async_push_refs", async_push_refs)
+    monkeypatch.setattr("semvergit.app.async_fetch_tags", async_fetch_tags)
+    monkeypatch.setattr("semvergit.app.ensure_commit_graph", lambda repo: False)
+    monkeypatch.setattr("semvergit.app.get_reachable_tags", lambda repo, prefix, ref: reachable_tags.pop(0))
+    svg = SemverGit(reachable_from="HEAD")
+    assert asyncio.run(svg.update_async(str(BumpType.PATCH), dry_run=False, retries=1)) == "v1.0.2"
+    assert pushes == [["refs/tags/v1.0.1"], ["refs/tags/v1.0.2"]]
+    assert fetches == ["origin"]
+    svg.latest_version = VersionInfo(1, 0, 0)
+    with raises(GitCommandError):
+        asyncio.run(svg.update_async(str(BumpType.PATCH), dry_run=False, retries=0))
+
+
+def test_remote_app_update_async(git: Callable[..., str], git_repo: Path, git_remote: Path) -> None:
+    """Test remote only async update against a local bare remote (a rejected tag is allocated again)."""
+    git("tag", "v1.2.3", cwd=git_repo)
+    git("push", "origin", "v1.2.3", cwd=git_repo)
+    svg = RemoteSemverGit(remote=str(git_remote))
+    publish_tag = svg.publish_tag
+    pushes: List[str] = []
+
+    def publish_racing(new_tag_str: str, dry_run: bool) -> None:
+        pushes.append(new_tag_str)
+        if len(pushes) == 1:
+            # A concurrent job tags the same version first
+            git("push", "origin", f"HEAD^{{tree}}:refs/tags/{new_tag_str}", cwd=git_repo)
+        publish_tag(new_tag_str, dry_run)
+
+    svg.publish_tag = publish_racing  # type: ignore[method-assign]
+    svg.retry_base_delay = 0.0
+    assert asyncio.run(svg.update_async(str(BumpType.MINOR), dry_run=False, retries=1)) == "v1.4.0"
+    assert pushes == ["v1.3.0", "v1.4.0"]
+    assert git("rev-parse", "v1.4.0", cwd=git_remote) == git("rev-parse", "HEAD", cwd=git_repo)
+
+
+@mark.parametrize("use_cache", [True, False])
+def test_app_reachable_from(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    real_git_utils: None,  # pylint: disable=unused-argument
+    monkeypatch: MonkeyPatch,
+    git: Callable[..., str],
+    git_repo: Path,
+    use_cache: bool,
+) -> None:
+    """Test app only uses the tags reachable from the ref (release branches)."""
+    git("tag", "v1.0.0", cwd=git_repo)
+    git("checkout", "-b", "release/1.0", cwd=git_repo)
+    git("commit", "--allow-empty", "-m", "Fix", cwd=git_repo)
+    git("tag", "v1.0.1", cwd=git_repo)
+    git("checkout", "master", cwd=git_repo)
+    git("commit", "--allow-empty", "-m", "Feature", cwd=git_repo)
+    git("tag", "v1.1.0", cwd=git_repo)
+    git("checkout", "release/1.0", cwd=git_repo)
+    # The tags were just written (racy), trust the index anyway
+    monkeypatch.setattr("semvergit.index_utils.refs_fingerprint", lambda git_dir: "tags")
+    assert SemverGit(repo=Repo(git_repo), use_cache=use_cache).latest_version == VersionInfo(1, 1, 0)
+    timings = Timings()
+    svg = SemverGit(repo=Repo(git_repo), use_cache=use_cache, reachable_from="HEAD", timings=timings)
+    assert svg.versions == [VersionInfo(1, 0, 0), VersionInfo(1, 0, 1)]
+    assert svg.next_version(str(BumpType.PATCH)) == VersionInfo(1, 0, 2)
+    assert timings.counters["tags_reachable"] == 2
+    svg = SemverGit(repo=Repo(git_repo), use_cache=use_cache, reachable_from="master", timings=Timings())
+    assert svg.latest_version == VersionInfo(1, 1, 0)
+    timings = Timings()
+    assert SemverGit(repo=Repo(git_repo), use_cache=use_cache, reachable_from="master", timings=timings).version_parts
+    # The index keeps the reachable tags of the last commit
+    assert ("tags_reachable" in timings.counters) is not use_cache
+
+
+def test_app_reachable_from_retry(monkeypatch: MonkeyPatch) -> None:
+    """Test app fetches the remote tags and keeps the reachable ones when the tag push is rejected."""
+    monkeypatch.setattr(SemverGit, "retry_base_delay", 0.0)
+    reachable_tags = [["v1.0.0"], ["v1.0.0", "v1.0.1"]]
+    fetches: List[str] = []
+
+    def push_remote(  # pylint: disable=unused-argument
+        repo: str, tag_str: str, remotes: List[str], dry_run: bool
+    ) -> None:
+        if tag_str == "v1.0.1":
+            raise rejected_push(tag_str)
+
+    monkeypatch.setattr("semvergit.app.push_remote", push_remote)
+    monkeypatch.setattr("semvergit.app.ensure_commit_graph", lambda repo: False)
+    monkeypatch.setattr("semvergit.app.get_reachable_tags", lambda repo, prefix, ref: reachable_tags.pop(0))
+    monkeypatch.setattr("semvergit.app.fetch_remote_tags", lambda repo, prefix, remote: fetches.append(remote))
+    svg = SemverGit(reachable_from="HEAD")
+    assert svg.update(str(BumpType.PATCH), dry_run=False, retries=1) == "v1.0.2"
+    assert fetches == ["origin"]
+
+
+@mark.parametrize("use_cache", [True, False])
+def test_app_line(
+    real_git_utils: None,  # pylint: disable=unused-argument
+    monkeypatch: MonkeyPatch,
+    git: Callable[..., str],
+    git_repo: Path,
+    use_cache: bool,
+) -> None:
+    """Test app bumps from the latest version of a maintenance line."""
+    for tag in ["v1.4.2", "v1.4.3-dev.1", "v1.5.0", "v2.0.0", "v2.1.0-dev.1"]:
+        git("tag", tag, cwd=git_repo)
+    # The tags were just written (racy), trust the index anyway
+    monkeypatch.setattr("semvergit.index_utils.refs_fingerprint", lambda git_dir: "tags")
+    svg = SemverGit(repo=Repo(git_repo), use_cache=use_cache, line="1.4")
+    assert svg.latest_version == VersionInfo(1, 4, 3, "dev.1")
+    assert svg.next_version(str(BumpType.PATCH)) == VersionInfo(1, 4, 3)
+    assert svg.next_version(str(BumpType.PRERELEASE)) == VersionInfo(1, 4, 3, "dev.2")
+    with raises(VersionLineError, match="A minor bump of 1.4.3-dev.1 leaves line 1.4"):
+        svg.next_version(str(BumpType.MINOR))
+    svg = SemverGit(repo=Repo(git_repo), use_cache=use_cache, line="1")
+    assert svg.next_version(str(BumpType.MINOR)) == VersionInfo(1, 6, 0)
+    with raises(VersionLineError, match="leaves line 1"):
+        svg.next_version(str(BumpType.MAJOR))
+    assert set(svg.version_lines) == {"1", "1.4", "1.5", "2", "2.0", "2.1"}
+    with raises(VersionLineError, match="No versions on line 3"):
+        assert SemverGit(repo=Repo(git_repo), use_cache=use_cache, line="3").latest_version
+    with raises(ValueError, match="Invalid version line"):
+        SemverGit(line="1.x")
+
+
+def test_app_line_retry(monkeypatch: MonkeyPatch) -> None:
+    """Test app only moves past the remote tags of its line when the tag push is rejected."""
+    monkeypatch.setattr(SemverGit, "retry_base_delay", 0.0)
+    pushes: List[str] = []
+
+    def push_remote(  # pylint: disable=unused-argument
+        repo: str, tag_str: str, remotes: List[str], dry_run: bool
+    ) -> None:
+        pushes.append(tag_str)
+        if len(pushes) == 1:
+            raise rejected_push(tag_str)
+
+    monkeypatch.setattr("semvergit.app.push_remote", push_remote)
+    monkeypatch.setattr("semvergit.app.ls_remote_tags", lambda remote, prefix, repo: ["v0.0.5", "v0.1.0"])
+    svg = SemverGit(line="0.0")
+    assert svg.update(str(BumpType.PATCH), dry_run=False, retries=1) == "v0.0.6"
+    assert pushes == ["v0.0.5", "v0.0.6"]
+
+
+def test_multi_app_line(monkeypatch: MonkeyPatch) -> None:
+    """Test the components of multi app bump on the line."""
+    monkeypatch.setattr("semvergit.app.get_tags_with_prefix", lambda repo, prefix: ["api/v1.0.0", "api/v2.0.0"])
+    multi_svg = MultiSemverGit(["api/v"], line="1")
+    assert multi_svg.update({"api/v": str(BumpType.MINOR)}, dry_run=True) == ["api/v1.1.0"]
+
+
+@mark.parametrize("use_cache", [True, False])
+def test_app_auto_bump_type(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    real_git_utils: None,  # pylint: disable=unused-argument
+    caplog: LogCaptureFixture,
+    git: Callable[..., str],
+    git_repo: Path,
+    use_cache: bool,
+) -> None:
+    """Test app auto bump type from the Conventional Commits since the latest version."""
+    assert SemverGit(repo=Repo(git_repo), use_cache=use_cache).resolve_bump_type(str(BumpType.AUTO)) == "patch"
+    git("tag", "v1.0.0", cwd=git_repo)
+    svg = SemverGit(repo=Repo(git_repo), use_cache=use_cache)
+    assert svg.resolve_bump_type(str(BumpType.AUTO)) == "patch"
+    assert check_substring("No commits in v1.0.0..HEAD, using patch", caplog.messages)
+    git("commit", "--allow-empty", "-m", "feat(cli): auto bump type", cwd=git_repo)
+    git("commit", "--allow-empty", "-m", "fix: typo", cwd=git_repo)
+    timings = Timings()
+    svg = SemverGit(repo=Repo(git_repo), use_cache=use_cache, timings=timings)
+    assert svg.update(str(BumpType.AUTO), dry_run=True) == "v1.1.0"
+    assert "update.auto_bump" in {span["name"] for span in timings.report()["spans"]}
+    assert svg.resolve_bump_type(str(BumpType.PRERELEASE)) == "prerelease"
+    assert (git_repo / ".git" / "semvergit" / "bumps.json").exists() is use_cache
+
+
+def test_remote_app_auto_bump_type(monkeypatch: MonkeyPatch) -> None:
+    """Test remote only app can't resolve the auto bump type."""
+    monkeypatch.setattr("semvergit.app.ls_remote_tags", lambda remote, prefix: ["v0.1.0"])
+    svg = RemoteSemverGit(commit="1234abc")
+    assert svg.resolve_bump_type(str(BumpType.MINOR)) == "minor"
+    with raises(ValueError, match="auto"):
+        svg.update(str(BumpType.AUTO), dry_run=True)
+
+
+def test_app_update_stamps(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test app stamps the version into files and stages the changed ones in one batch."""
+    added: List[List[str]] = []
+    commits: List[str] = []
+    monkeypatch.setattr("semvergit.app.add_files", lambda repo, file_paths, dry_run: added.append(list(file_paths)))
+    monkeypatch.setattr("semvergit.app.new_commit", lambda repo, message, dry_run: commits.append(message))
+    for name, version in [("a.py", "0.0.4"), ("b.py", "0.0.4"), ("c.py", "0.0.5")]:
+        (tmp_path / name).write_text(f'__version__ = "{version}"\n', encoding="utf-8")
+    stamps = parse_stamp(f"{tmp_path}/*.py")
+    svg = SemverGit()
+    assert svg.update(str(BumpType.PATCH), dry_run=False, stamps=stamps) == "v0.0.5"
+    assert added == [[str(tmp_path / "a.py"), str(tmp_path / "b.py")]]
+    assert commits == ["New version: 0.0.5"]
+    assert (tmp_path / "a.py").read_text(encoding="utf-8") == '__version__ = "0.0.5"\n'
+    # Nothing changed, nothing to commit
+    svg.latest_version = VersionInfo(0, 0, 4)
+    svg.update(str(BumpType.PATCH), dry_run=False, stamps=stamps)
+    assert len(added) == 1
+    assert len(commits) == 1
+    monkeypatch.setattr("semvergit.app.ls_remote_tags", lambda remote, prefix: [])
+    with raises(ValueError, match="stamps"):
+        RemoteSemverGit(commit="1234abc").update(str(BumpType.PATCH), dry_run=True, stamps=stamps)
+
+
+def test_app_update_plumbing(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test app commits the written files with plumbing (nothing is staged in the index)."""
+    added: List[List[str]] = []
+    commits: List[Tuple[List[str], str, str]] = []
+    monkeypatch.setattr("semvergit.app.add_files", lambda repo, file_paths, dry_run: added.append(list(file_paths)))
+    monkeypatch.setattr(
+        "semvergit.app.commit_files",
+        lambda repo, file_paths, message, branch, dry_run: commits.append((list(file_paths), message, branch)),
+    )
+    (tmp_path / "a.py").write_text('__version__ = "0.0.4"\n', encoding="utf-8")
+    svg = SemverGit()
+    svg.update(str(BumpType.PATCH), dry_run=False, stamps=parse_stamp(f"{tmp_path}/a.py"), plumbing=True)
+    assert not added
+    assert commits == [([str(tmp_path / "a.py")], "New version: 0.0.5", "test_branch")]
+    svg.update(str(BumpType.PATCH), dry_run=False, commit_message="Release", plumbing=True)
+    assert commits[-1] == ([], "Release", "test_branch")
+    monkeypatch.setattr("semvergit.app.ls_remote_tags", lambda remote, prefix: [])
+    with raises(ValueError, match="plumbing"):
+        RemoteSemverGit(commit="1234abc").update(str(BumpType.PATCH), dry_run=True, plumbing=True)
+
+
+@mark.parametrize("use_cache", [True, False])
+def test_multi_app(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    real_git_utils: None,  # pylint: disable=unused-argument
+    monkeypatch: MonkeyPatch,
+    git: Callable[..., str],
+    git_repo: Path,
+    git_remote: Path,
+    use_cache: bool,
+) -> None:
+    """Test the components share one tag scan and are bumped together."""
+    for tag in ["api/v1.0.0", "api/v1.1.0", "web/v2.0.0", "web/vbad", "other"]:
+        git("tag", tag, cwd=git_repo)
+    git("tag", "web/v3.0.0", cwd=git_remote)
+    scans: List[str] = []
+    get_tags_with_prefix = git_utils.get_tags_with_prefix
+
+    def scan_tags(repo: Repo, prefix: str) -> List[str]:
+        scans.append(prefix)
+        return get_tags_with_prefix(repo=repo, prefix=prefix)
+
+    monkeypatch.setattr("semvergit.app.get_tags_with_prefix", scan_tags)
+    timings = Timings()
+    multi = MultiSemverGit(
+        ["api/v", "web/v", "cli/v"], repo=Repo(git_repo), use_cache=use_cache, fetch_tags=True, timings=timings
+    )
+    with multi:
+        assert multi.component("api/v").latest_version == VersionInfo(1, 1, 0)
+        assert multi.component("web/v").latest_version == VersionInfo(3, 0, 0)
+        assert multi.component("web/v").invalid_tags == ["web/vbad"]
+        assert not multi.component("cli/v").version_parts
+        # One scan for all the components
+        assert scans == [""]
+        assert timings.counters["tags_scanned"] == 6
+        assert multi.update({"api/v": "minor", "cli/v": "patch"}, dry_run=False) == ["api/v1.2.0", "cli/v0.0.1"]
+        assert multi.component("api/v").latest_version == VersionInfo(1, 2, 0)
+        assert {"api/v1.2.0", "cli/v0.0.1"} <= set(git("tag", "-l", cwd=git_remote).splitlines())
+        with raises(ValueError, match="Unknown component other/v"):
+            multi.component("other/v")
+
+
+def test_multi_app_push_rejected(
+    real_git_utils: None,  # pylint: disable=unused-argument
+    git: Callable[..., str],
+    git_repo: Path,
+    git_remote: Path,
+) -> None:
+    """Test no component tag is kept when the (atomic) push is rejected."""
+    git("tag", "web/v1.0.0", cwd=git_remote)
+    git("commit", "--allow-empty", "-m", "Change", cwd=git_repo)
+    with MultiSemverGit(["api/v", "web/v"], repo=Repo(git_repo)) as multi:
+        with raises(GitCommandError):
+            multi.update({"api/v": "major", "web/v": "major"}, dry_run=False)
+    assert not git("tag", "-l", cwd=git_repo)
+    assert git("tag", "-l", cwd=git_remote) == "web/v1.0.0"
+
+
+def test_multi_app_partial_push(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    real_git_utils: None,  # pylint: disable=unused-argument
+    git: Callable[..., str],
+    git_repo: Path,
+    git_remote: Path,
+    tmp_path: Path,
+) -> None:
+    """Test the component tags are kept when a remote accepted them (pushes are only atomic per remote)."""
+    second_remote = tmp_path / "second.git"
+    git("clone", "--bare", str(git_remote), str(second_remote), cwd=tmp_path)
+    git("tag", "web/v1.0.0", cwd=git_remote)
+    git("commit", "--allow-empty", "-m", "Change", cwd=git_repo)
+    with MultiSemverGit(["api/v", "web/v"], repo=Repo(git_repo), remotes=["origin", str(second_remote)]) as multi:
+        with raises(PushError) as error:
+            multi.update({"api/v": "major", "web/v": "major"}, dry_run=False)
+        assert error.value.pushed == [str(second_remote)]
+        assert multi.component("web/v").latest_version == VersionInfo(1, 0, 0)
+    assert git("tag", "-l", cwd=git_repo).splitlines() == ["api/v1.0.0", "web/v1.0.0"]
+    assert git("tag", "-l", cwd=second_remote).splitlines() == ["api/v1.0.0", "web/v1.0.0"]
+
+
+def test_multi_app_lazy(mock_close_repo: List[str]) -> None:
+    """Test multi app opens (and closes) the repo on first use only."""
+    with raises(ValueError, match="No component prefixes"):
+        MultiSemverGit([])
+    with MultiSemverGit(["v", "v"]) as multi:
+        assert multi.prefixes == ["v"]
+        assert not mock_close_repo
+        # The mocked tags have no prefix filter, 0.0.4 isn't a component tag
+        assert multi.update({"v": "patch"}, dry_run=True) == ["v0.0.4"]
+    assert mock_close_repo == ["test_repo"]
+    with MultiSemverGit(["v"]):
+        pass
+    assert mock_close_repo == ["test_repo"]
@@ -0,0 +1,54 @@
+"""Test batch_utils module."""
+
+from pathlib import Path
+
+from pytest import CaptureFixture, mark, raises
+
+from semvergit.batch_utils import BatchJob, iter_jobs, parse_job, parse_job_line, run_batch, run_job
+
+
+def test_parse_job() -> None:
+    """Test parse job (the default bump type fills the jobs without one)."""
+    assert parse_job("services/api=minor") == BatchJob(repo="services/api", bump_type="minor")
+    assert parse_job("services/api", "patch") == BatchJob(repo="services/api", bump_type="patch")
+    assert parse_job_line('{"repo": "web", "bump_type": "major"}') == BatchJob(repo="web", bump_type="major")
+    assert parse_job_line('{"repo": "web"}', "auto") == BatchJob(repo="web", bump_type="auto")
+    with raises(ValueError, match="Missing bump type of web"):
+        parse_job("web")
+    with raises(ValueError, match="Invalid bump type huge of web"):
+        parse_job("web=huge")
+    with raises(ValueError, match="Missing repository path"):
+        parse_job("=patch")
+    for line in ['["web", "patch"]', "{not json"]:
+        with raises(ValueError):
+            parse_job_line(line)
+
+
+def test_iter_jobs() -> None:
+    """Test iter jobs (specs first, then the JSON lines)."""
+    jobs = iter_jobs(["a=patch"], ['{"repo": "b"}\n', "\n"], "minor")
+    assert list(jobs) == [BatchJob(repo="a", bump_type="patch"), BatchJob(repo="b", bump_type="minor")]
+
+
+def test_run_job(git_repo: Path, tmp_path: Path, capsys: CaptureFixture) -> None:
+    """Test run job reports the new tag or the failure (never raises)."""
+    record = run_job(BatchJob(repo=str(git_repo), bump_type="patch"), dry_run=True, retries=0, svg_kwargs={})
+    assert (record["repo"], record["tag"], record["error"]) == (str(git_repo), "v0.0.5", None)
+    assert record["seconds"] > 0
+    assert "update" in record["timings"]
+    # The tag is only in the result, not on stdout
+    assert not capsys.readouterr().out
+    record = run_job(BatchJob(repo=str(tmp_path / "missing"), bump_type="patch"), False, 0, {"use_cache": False})
+    assert record["tag"] is None
+    assert record["error"].startswith("NoSuchPathError")
+
+
+@mark.parametrize("processes", [False, True])
+def test_run_batch(git_repo: Path, tmp_path: Path, processes: bool) -> None:
+    """Test run batch isolates the failures (threads and processes)."""
+    jobs = [
+        BatchJob(repo=str(git_repo), bump_type="minor"),
+        BatchJob(repo=str(tmp_path / "missing"), bump_type="patch"),
+    ]
+    results = sorted(run_batch(jobs, dry_run=True, workers=2, processes=processes), key=lambda record: record["repo"])
+    assert [(record["tag"], record["error"] is None) for record in results] == [(None, False), ("v0.1.0", True)]
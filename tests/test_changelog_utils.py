@@ -0,0 +1,89 @@
+"""Test changelog_utils module."""
+
+import io
+import json
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from git import Repo
+from pytest import mark
+
+from semvergit.changelog_utils import LogEntry, Section, iter_log_entries, iter_sections, write_changelog
+from semvergit.version_utils import PrecedenceKey, parse_parts, precedence_key
+
+VERSION_TAGS: Dict[str, PrecedenceKey] = {
+    tag: precedence_key(parse_parts(tag[1:])) for tag in ["v1.0.0", "v1.1.0-rc.1", "v1.1.0"]
+}
+
+
+def entry(sha: str, *tags: str) -> LogEntry:
+    """Log entry."""
+    return LogEntry(sha=sha, date="2024-01-01", tags=list(tags), subject=f"Commit {sha}")
+
+
+def test_iter_sections() -> None:
+    """Test iter_sections groups the commits by version tag (newest first)."""
+    entries = [
+        entry("f"),
+        entry("e", "v1.1.0-rc.1", "v1.1.0", "other"),
+        entry("d"),
+        entry("c", "not-a-version"),
+        entry("b", "v1.0.0"),
+        entry("a"),
+    ]
+    sections = list(iter_sections(entries, VERSION_TAGS))
+    assert [(section.tag, [commit.sha for commit in section.commits]) for section in sections] == [
+        (None, ["f"]),
+        ("v1.1.0", ["e", "d", "c"]),
+        ("v1.0.0", ["b", "a"]),
+    ]
+    assert [section.tag for section in iter_sections([entry("b", "v1.0.0")], VERSION_TAGS)] == ["v1.0.0"]
+    assert not list(iter_sections([], VERSION_TAGS))
+
+
+SECTIONS = [
+    Section(tag=None, date=None, commits=[entry("1234567890")]),
+    Section(tag="v1.0.0", date="2024-01-01", commits=[entry("abcdef1234"), entry("bcdef12345")]),
+]
+
+
+def test_write_changelog_markdown() -> None:
+    """Test write_changelog markdown output."""
+    output = io.StringIO()
+    assert write_changelog(SECTIONS, output) == 2
+    assert output.getvalue() == (
+        "# Changelog\n\n"
+        "## Unreleased\n\n- Commit 1234567890 (1234567)\n\n"
+        "## v1.0.0 (2024-01-01)\n\n- Commit abcdef1234 (abcdef1)\n- Commit bcdef12345 (bcdef12)\n"
+    )
+
+
+@mark.parametrize("sections", [SECTIONS, SECTIONS[1:], []])
+def test_write_changelog_json(sections: List[Section]) -> None:
+    """Test write_changelog JSON output (one section per line)."""
+    output = io.StringIO()
+    assert write_changelog(sections, output, "json") == len(sections)
+    records = json.loads(output.getvalue())
+    assert [record["tag"] for record in records] == [section.tag for section in sections]
+    assert len(output.getvalue().splitlines()) == (len(sections) + 2 if sections else 1)
+    if sections:
+        assert records[-1]["commits"][0] == {"sha": "abcdef1234", "subject": "Commit abcdef1234"}
+
+
+def test_iter_log_entries(git: Callable[..., str], git_repo: Path) -> None:
+    """Test iter_log_entries reads the commits and their version tags in one log."""
+    git("tag", "v1.0.0", cwd=git_repo)
+    git("tag", "api/v2.0.0", cwd=git_repo)
+    git("commit", "--allow-empty", "-m", "fix: second\n\nBody", cwd=git_repo)
+    git("tag", "-a", "v1.0.1", "-m", "Release", cwd=git_repo)
+    git("tag", "v1.0.1+build.1", cwd=git_repo)
+    git("commit", "--allow-empty", "-m", "Unreleased", cwd=git_repo)
+    entries = list(iter_log_entries(Repo(git_repo), "HEAD"))
+    assert [(item.subject, sorted(item.tags)) for item in entries] == [
+        ("Unreleased", []),
+        ("fix: second", ["v1.0.1", "v1.0.1+build.1"]),
+        ("Initial commit", ["v1.0.0"]),
+    ]
+    assert entries[0].sha == git("rev-parse", "HEAD", cwd=git_repo)
+    assert len(entries[0].date) == len("2024-01-01")
+    assert [item.tags for item in iter_log_entries(Repo(git_repo), "v1.0.1..HEAD", prefix="api/v")] == [[]]
@@ -1,13 +1,22 @@
 """Test CLI."""
 
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Callable, List
 from unittest.mock import patch
 
 from click.testing import CliRunner
-from pytest import mark
+from pytest import MonkeyPatch, fixture, mark
 
-from semvergit.app import SemverGit
+from semvergit import __version__
+from semvergit.app import InvalidTagError, RemoteSemverGit, SemverGit
 from semvergit.cli import cli
 
+IMPORT_TIME_BUDGET_US = 150_000
+DEFERRED_MODULES = {"git", "semver", "loguru", "importlib.metadata", "semvergit.app"}
+
 
 @mark.parametrize("dry_run", [True, False])
 @mark.parametrize("verbose", ["-v", "--verbose", "-vv", ""])
@@ -50,3 +59,503 @@ def test_cli_invalid_bump_type(arg: str) -> None:
     mock_update.assert_not_called()
     assert result.exception
     assert result.exit_code == 2
+
+
+@mark.parametrize("no_cache", [True, False])
+def test_cli_no_cache(no_cache: bool) -> None:
+    """Test CLI no cache option."""
+    runner = CliRunner()
+    args = ["--bump_type", "patch"]
+    if no_cache:
+        args.append("--no_cache")
+    with (
+        patch.object(SemverGit, "__init__", return_value=None) as mock_init,
+        patch.object(SemverGit, "update"),
+        patch.object(SemverGit, "close"),
+    ):
+        result = runner.invoke(cli, args)
+    mock_init.assert_called_once_with(
+        use_cache=not no_cache,
+        fetch_tags=False,
+        remotes=("origin",),
+        timings=None,
+        strict=False,
+        reachable_from=None,
+        line=None,
+    )
+    assert result.exit_code == 0
+
+
+def test_cli_import_time() -> None:
+    """Test CLI import time budget (see CONTRIBUTING.md)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import semvergit.cli"], capture_output=True, text=True, check=True
+    )
+    imports = {}
+    for line in result.stderr.splitlines()[1:]:  # Skip the header line
+        _, cumulative, module = line.split("|")
+        imports[module.strip()] = int(cumulative)
+    assert not DEFERRED_MODULES & imports.keys()
+    assert imports["semvergit.cli"] < IMPORT_TIME_BUDGET_US
+
+
+def test_cli_version() -> None:
+    """Test CLI version doesn't need the app."""
+    runner = CliRunner()
+    with patch.object(SemverGit, "__init__") as mock_init:
+        result = runner.invoke(cli, ["--version"])
+    mock_init.assert_not_called()
+    assert result.exit_code == 0
+    assert __version__ in result.output
+
+
+@mark.parametrize("commit", [None, "1234abc"])
+def test_cli_remote_only(commit: str) -> None:
+    """Test CLI remote only mode."""
+    runner = CliRunner()
+    args = ["--bump_type", "patch", "--remote_only", "--remote", "https://example.com/repo.git"]
+    if commit:
+        args.extend(["--commit", commit])
+    with (
+        patch.object(RemoteSemverGit, "__init__", return_value=None) as mock_init,
+        patch.object(RemoteSemverGit, "update") as mock_update,
+        patch.object(RemoteSemverGit, "close"),
+    ):
+        result = runner.invoke(cli, args)
+    mock_init.assert_called_once_with(
+        remote="https://example.com/repo.git", commit=commit, timings=None, strict=False, line=None
+    )
+    mock_update.assert_called_once()
+    assert result.exit_code == 0
+
+
+@mark.parametrize(
+    "extra_args",
+    [["-m", "message"], ["-am"], ["-f", "README.md"], ["--plumbing_commit"], ["-r", "origin", "-r", "backup"]],
+)
+def test_cli_remote_only_no_commit(extra_args: List[str]) -> None:
+    """Test CLI remote only mode can't commit."""
+    runner = CliRunner()
+    with patch.object(RemoteSemverGit, "__init__", return_value=None) as mock_init:
+        result = runner.invoke(cli, ["-t", "patch", "--remote_only", *extra_args])
+    mock_init.assert_not_called()
+    assert result.exit_code == 2
+
+
+def test_cli_fetch_tags() -> None:
+    """Test CLI fetch tags option."""
+    runner = CliRunner()
+    with (
+        patch.object(SemverGit, "__init__", return_value=None) as mock_init,
+        patch.object(SemverGit, "update"),
+        patch.object(SemverGit, "close"),
+    ):
+        result = runner.invoke(cli, ["-t", "patch", "--fetch_tags", "-r", "upstream", "-r", "backup"])
+    mock_init.assert_called_once_with(
+        use_cache=True,
+        fetch_tags=True,
+        remotes=("upstream", "backup"),
+        timings=None,
+        strict=False,
+        reachable_from=None,
+        line=None,
+    )
+    assert result.exit_code == 0
+
+
+def test_cli_retries() -> None:
+    """Test CLI retries option."""
+    runner = CliRunner()
+    with patch.object(SemverGit, "update") as mock_update:
+        result = runner.invoke(cli, ["-t", "prerelease", "--retries", "3"])
+    assert mock_update.call_args.kwargs["retries"] == 3
+    assert result.exit_code == 0
+
+
+def test_cli_missing_bump_type() -> None:
+    """Test CLI errors without bump type (and no command)."""
+    runner = CliRunner()
+    with patch.object(SemverGit, "update", spec=SemverGit) as mock_update:
+        result = runner.invoke(cli, ["-v"])
+    mock_update.assert_not_called()
+    assert result.exit_code == 2
+
+
+def test_cli_serve() -> None:
+    """Test CLI serve command."""
+    runner = CliRunner()
+    with (
+        patch.object(SemverGit, "__init__", return_value=None) as mock_init,
+        patch.object(SemverGit, "close"),
+        patch("semvergit.server.VersionAllocator") as mock_allocator,
+        patch("semvergit.server.make_server") as mock_make_server,
+        patch("semvergit.server.run_server") as mock_run_server,
+    ):
+        result = runner.invoke(cli, ["--dry_run", "-r", "upstream", "serve", "--socket", "svg.sock", "--lease", "5"])
+    assert result.exit_code == 0
+    mock_init.assert_called_once_with(
+        timings=None,
+        use_cache=True,
+        fetch_tags=False,
+        remotes=("upstream",),
+        strict=False,
+        reachable_from=None,
+        line=None,
+    )
+    assert mock_allocator.call_args.kwargs == {
+        "lease_seconds": 5.0,
+        "flush_interval": 1.0,
+        "batch_size": 100,
+        "dry_run": True,
+    }
+    assert mock_make_server.call_args.kwargs == {"host": "127.0.0.1", "port": 8765, "socket_path": "svg.sock"}
+    mock_run_server.assert_called_once_with(mock_make_server.return_value, mock_allocator.return_value)
+
+
+def test_cli_serve_not_socket(tmp_path: Path) -> None:
+    """Test CLI serve command refuses a socket path of another file."""
+    config_path = tmp_path / "config.toml"
+    config_path.write_text("keep", encoding="utf-8")
+    runner = CliRunner()
+    with (
+        patch.object(SemverGit, "__init__", return_value=None),
+        patch.object(SemverGit, "close"),
+        patch("semvergit.server.VersionAllocator"),
+        patch("semvergit.server.run_server") as mock_run_server,
+    ):
+        result = runner.invoke(cli, ["serve", "--socket", str(config_path)])
+    assert result.exit_code == 2
+    assert "is not a socket" in result.output
+    mock_run_server.assert_not_called()
+    assert config_path.read_text(encoding="utf-8") == "keep"
+
+
+def test_cli_serve_remote_only() -> None:
+    """Test CLI serve command needs a local clone."""
+    runner = CliRunner()
+    with patch.object(SemverGit, "__init__", return_value=None) as mock_init:
+        result = runner.invoke(cli, ["--remote_only", "serve"])
+    mock_init.assert_not_called()
+    assert result.exit_code == 2
+
+
+def test_cli_timings(tmp_path: Path) -> None:
+    """Test CLI timings report (written even when the update fails)."""
+    runner = CliRunner()
+    report_path = tmp_path / "timings.json"
+    result = runner.invoke(cli, ["-t", "patch", "--dry_run", "--timings", str(report_path)])
+    assert result.exit_code == 0
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert {"update", "update.latest"} <= {span["name"] for span in report["spans"]}
+    with patch.object(SemverGit, "update", side_effect=ValueError("failed")):
+        result = runner.invoke(cli, ["-t", "patch", "--timings", "-"])
+    assert isinstance(result.exception, ValueError)
+    assert '"spans"' in result.stderr
+
+
+def test_cli_strict() -> None:
+    """Test CLI strict mode fails without a traceback on invalid tags."""
+    runner = CliRunner()
+    with patch.object(SemverGit, "__init__", side_effect=InvalidTagError("Found 1 invalid version tags (v1.2)")):
+        result = runner.invoke(cli, ["-t", "patch", "--strict"])
+    assert result.exit_code == 1
+    assert "Found 1 invalid version tags (v1.2)" in result.output
+
+
+@fixture(name="tagged_repo")
+def fixture_tagged_repo(
+    real_git_utils: None,  # pylint: disable=unused-argument
+    monkeypatch: MonkeyPatch,
+    git: Callable[..., str],
+    git_repo: Path,
+) -> Path:
+    """Repository with a few version tags (the working directory)."""
+    for tag in ["v0.9.0", "v1.0.0", "v1.1.0-dev.1", "v-legacy"]:
+        git("tag", tag, cwd=git_repo)
+    monkeypatch.chdir(git_repo)
+    return git_repo
+
+
+def test_cli_remote_only_name(git: Callable[..., str], tagged_repo: Path, git_remote: Path) -> None:
+    """Test CLI remote only mode with a remote name (origin of the current repository)."""
+    git("push", "origin", "--tags", cwd=tagged_repo)
+    runner = CliRunner()
+    result = runner.invoke(cli, ["-t", "minor", "--remote_only"])
+    assert result.exit_code == 0
+    assert git("rev-parse", "v1.1.0", cwd=git_remote) == git("rev-parse", "HEAD", cwd=tagged_repo)
+    result = runner.invoke(cli, ["-t", "minor", "--remote_only", "-r", "upstream"])
+    assert result.exit_code == 2
+    assert "Unknown remote upstream" in result.output
+
+
+def test_cli_timings_subcommand(tagged_repo: Path, tmp_path: Path) -> None:  # pylint: disable=unused-argument
+    """Test CLI timings report of the subcommands (written even when they fail, batch jobs report their own)."""
+    runner = CliRunner()
+    report_path = tmp_path / "timings.json"
+    assert runner.invoke(cli, ["--timings", str(report_path), "latest"]).exit_code == 0
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert "versions" in {span["name"] for span in report["spans"]}
+    report_path.unlink()
+    assert runner.invoke(cli, ["--timings", str(report_path), "--line", "2", "latest"]).exit_code == 1
+    assert report_path.exists()
+    result = runner.invoke(cli, ["--timings", "-", "batch", "."])
+    assert result.exit_code == 2
+    assert "no --timings" in result.output
+
+
+@mark.parametrize("remote_only", [False, True])
+def test_cli_latest(tagged_repo: Path, remote_only: bool) -> None:
+    """Test CLI latest command."""
+    runner = CliRunner()
+    args = ["--remote_only", "-r", str(tagged_repo)] if remote_only else []
+    result = runner.invoke(cli, [*args, "latest"])
+    assert result.exit_code == 0
+    assert result.stdout == "v1.1.0-dev.1\n"
+    result = runner.invoke(cli, [*args, "latest", "--json"])
+    assert json.loads(result.stdout) == {
+        "tag": "v1.1.0-dev.1",
+        "version": "1.1.0-dev.1",
+        "major": 1,
+        "minor": 1,
+        "patch": 0,
+        "prerelease": "dev.1",
+        "build": None,
+    }
+
+
+def test_cli_line(tagged_repo: Path) -> None:
+    """Test CLI bumps on a maintenance line."""
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--line", "0", "latest"])
+    assert result.stdout == "v0.9.0\n"
+    result = runner.invoke(cli, ["--remote_only", "-r", str(tagged_repo), "--line", "1", "next", "-t", "patch"])
+    assert result.stdout == "v1.1.0\n"
+    assert runner.invoke(cli, ["--line", "2", "latest"]).exit_code == 1
+    assert runner.invoke(cli, ["--line", "1.0", "next", "-t", "patch"]).stdout == "v1.0.1\n"
+    result = runner.invoke(cli, ["--line", "1.0", "next", "-t", "minor"])
+    assert result.exit_code == 1
+    assert "leaves line 1.0" in result.output
+    result = runner.invoke(cli, ["--line", "0", "--dry_run", "-t", "minor"])
+    assert result.exit_code == 0
+    assert result.stdout == "v0.10.0"
+    assert runner.invoke(cli, ["--line", "0", "--dry_run", "-t", "major"]).exit_code == 1
+    assert runner.invoke(cli, ["--line", "0", "--dry_run", "bump", "v=patch"]).stdout == "v0.9.1\n"
+    assert runner.invoke(cli, ["--line", "0", "--dry_run", "bump", "v=major"]).exit_code == 1
+    assert runner.invoke(cli, ["--line", "1.x", "latest"]).exit_code == 2
+
+
+def test_cli_latest_no_versions(real_git_utils: None, monkeypatch: MonkeyPatch, git_repo: Path) -> None:
+    """Test CLI latest command without versions."""
+    del real_git_utils
+    monkeypatch.chdir(git_repo)
+    runner = CliRunner()
+    assert runner.invoke(cli, ["latest"]).exit_code == 1
+    result = runner.invoke(cli, ["latest", "--json"])
+    assert result.exit_code == 0
+    assert json.loads(result.stdout) is None
+
+
+def test_cli_next(tagged_repo: Path, git: Callable[..., str]) -> None:
+    """Test CLI next command (nothing is tagged)."""
+    runner = CliRunner()
+    result = runner.invoke(cli, ["next", "-t", "minor"])
+    assert result.stdout == "v1.1.0\n"
+    result = runner.invoke(cli, ["next", "-t", "prerelease", "--json"])
+    record = json.loads(result.stdout)
+    assert (record["tag"], record["bump_type"], record["latest"]) == ("v1.1.0-dev.2", "prerelease", "1.1.0-dev.1")
+    git("commit", "--allow-empty", "-m", "feat!: breaking", cwd=tagged_repo)
+    record = json.loads(runner.invoke(cli, ["next", "-t", "auto", "--json"]).stdout)
+    assert (record["tag"], record["bump_type"]) == ("v2.0.0", "major")
+    result = runner.invoke(cli, ["--remote_only", "-r", str(tagged_repo), "next", "-t", "auto"])
+    assert result.exit_code == 2
+    assert "no auto bump type" in result.output
+    assert runner.invoke(cli, ["next"]).exit_code == 2
+    assert runner.invoke(cli, ["next", "-t", "invalid"]).exit_code == 2
+    assert "v1.1.0" not in git("tag", "-l", cwd=tagged_repo).splitlines()
+
+
+@mark.parametrize(
+    "args, expected",
+    [
+        ([], ["v0.9.0", "v1.0.0", "v1.1.0-dev.1"]),
+        (["--range", ">=1.0.0"], ["v1.0.0", "v1.1.0-dev.1"]),
+        (["--range", ">0.9.0, <1.1.0-dev.1"], ["v1.0.0"]),
+        (["--range", "1.0.0"], ["v1.0.0"]),
+        (["-n", "2"], ["v1.0.0", "v1.1.0-dev.1"]),
+        (["--range", "<1.0.1", "--limit", "1"], ["v1.0.0"]),
+    ],
+)
+def test_cli_list(tagged_repo: Path, args: List[str], expected: List[str]) -> None:
+    """Test CLI list command."""
+    del tagged_repo
+    runner = CliRunner()
+    result = runner.invoke(cli, ["list", *args])
+    assert result.exit_code == 0
+    assert result.stdout.splitlines() == expected
+    result = runner.invoke(cli, ["list", *args, "--json"])
+    assert [record["tag"] for record in json.loads(result.stdout)] == expected
+
+
+def test_cli_list_invalid(tagged_repo: Path) -> None:
+    """Test CLI list command errors."""
+    del tagged_repo
+    runner = CliRunner()
+    assert runner.invoke(cli, ["list", "--range", ">=1.0"]).exit_code == 2
+    assert runner.invoke(cli, ["list", "--range", ">=1.0.0,"]).exit_code == 2
+    result = runner.invoke(cli, ["--strict", "list"])
+    assert result.exit_code == 1
+    assert "v-legacy" in result.output
+
+
+@mark.parametrize("ref", ["HEAD", "release/1.0"])
+def test_cli_reachable_from(ref: str) -> None:
+    """Test CLI reachable from option (the ref is required)."""
+    runner = CliRunner()
+    with (
+        patch.object(SemverGit, "__init__", return_value=None) as mock_init,
+        patch.object(SemverGit, "update"),
+        patch.object(SemverGit, "close"),
+    ):
+        result = runner.invoke(cli, ["--reachable_from", ref, "-t", "patch"])
+    assert result.exit_code == 0
+    assert mock_init.call_args.kwargs["reachable_from"] == ref
+    assert runner.invoke(cli, ["-t", "patch", "--reachable_from"]).exit_code == 2
+    assert runner.invoke(cli, ["-t", "patch", "--remote_only", "--reachable_from", ref]).exit_code == 2
+
+
+def test_cli_reachable_from_latest(tagged_repo: Path) -> None:  # pylint: disable=unused-argument
+    """Test CLI reachable from option before a subcommand (the subcommand isn't read as the ref)."""
+    result = CliRunner().invoke(cli, ["--reachable_from", "HEAD", "latest"])
+    assert result.exit_code == 0
+    assert result.stdout == "v1.1.0-dev.1\n"
+
+
+def test_cli_auto_remote_only() -> None:
+    """Test CLI auto bump type needs the commits (no remote only mode)."""
+    runner = CliRunner()
+    with patch.object(RemoteSemverGit, "__init__", return_value=None) as mock_init:
+        result = runner.invoke(cli, ["-t", "auto", "--remote_only"])
+    mock_init.assert_not_called()
+    assert result.exit_code == 2
+
+
+def test_cli_changelog(tagged_repo: Path, git: Callable[..., str], tmp_path: Path) -> None:
+    """Test CLI changelog command (markdown, JSON and a commits range)."""
+    git("commit", "--allow-empty", "-m", "feat: unreleased", cwd=tagged_repo)
+    runner = CliRunner()
+    result = runner.invoke(cli, ["changelog"])
+    assert result.exit_code == 0
+    assert result.stdout.startswith("# Changelog\n\n## Unreleased\n\n- feat: unreleased (")
+    assert "## v1.1.0-dev.1 (" in result.stdout
+    assert "## v1.0.0" not in result.stdout
+    output = tmp_path / "changelog.json"
+    result = runner.invoke(cli, ["changelog", "--format", "json", "-o", str(output), "--since", "v1.0.0"])
+    assert result.exit_code == 0
+    records = json.loads(output.read_text(encoding="utf-8"))
+    assert [record["tag"] for record in records] == [None]
+    result = runner.invoke(cli, ["changelog", "--since", "missing"])
+    assert result.exit_code == 1
+    assert "Can't read the commits of missing..HEAD" in result.output
+    assert runner.invoke(cli, ["--remote_only", "changelog"]).exit_code == 2
+
+
+def test_cli_stamps(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test CLI stamp option (expanded to the matching files)."""
+    for name in ["a/_version.py", "b/_version.py"]:
+        (tmp_path / name).parent.mkdir()
+        (tmp_path / name).write_text('__version__ = "0.0.1"\n', encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    runner = CliRunner()
+    with patch.object(SemverGit, "update") as mock_update:
+        result = runner.invoke(cli, ["-t", "patch", "-s", "*/_version.py", "--stamp", "a/_version.py=^(?P<version>.*)"])
+    assert result.exit_code == 0
+    stamps = mock_update.call_args.kwargs["stamps"]
+    assert [stamp.path for stamp in stamps] == [str(tmp_path / name) for name in ["a/_version.py", "b/_version.py"]] + [
+        str(tmp_path / "a/_version.py")
+    ]
+    result = runner.invoke(cli, ["-t", "patch", "-s", "missing.toml"])
+    assert result.exit_code == 2
+    assert "No files match missing.toml" in result.output
+    assert runner.invoke(cli, ["-t", "patch", "--remote_only", "-s", "a/_version.py"]).exit_code == 2
+
+
+def test_cli_stamps_subdirectory(
+    monkeypatch: MonkeyPatch, git: Callable[..., str], tagged_repo: Path, git_remote: Path
+) -> None:
+    """Test CLI stamps from a subdirectory of the repository (the paths are relative to the working directory)."""
+    package_json = tagged_repo / "pkg" / "package.json"
+    package_json.parent.mkdir()
+    package_json.write_text('{\n  "version": "1.0.0"\n}\n', encoding="utf-8")
+    git("add", "pkg", cwd=tagged_repo)
+    git("commit", "-m", "Add package", cwd=tagged_repo)
+    monkeypatch.chdir(package_json.parent)
+    result = CliRunner().invoke(cli, ["-t", "minor", "-s", "package.json"])
+    assert result.exit_code == 0
+    assert not git("status", "--porcelain", cwd=tagged_repo)
+    assert git("show", "v1.1.0:pkg/package.json", cwd=git_remote) == '{\n  "version": "1.1.0"\n}'
+
+
+def test_cli_plumbing_commit() -> None:
+    """Test CLI plumbing commit option."""
+    runner = CliRunner()
+    with patch.object(SemverGit, "update") as mock_update:
+        assert runner.invoke(cli, ["-t", "patch", "-am", "--plumbing_commit"]).exit_code == 0
+        assert mock_update.call_args.kwargs["plumbing"] is True
+        assert runner.invoke(cli, ["-t", "patch", "-am"]).exit_code == 0
+        assert mock_update.call_args.kwargs["plumbing"] is False
+
+
+def test_cli_log_json(tmp_path: Path) -> None:
+    """Test CLI JSON log option."""
+    runner = CliRunner()
+    json_path = tmp_path / "log.jsonl"
+    with patch.object(SemverGit, "update"), patch("semvergit.log_utils.set_logger") as mock_set_logger:
+        result = runner.invoke(cli, ["-t", "patch", "--log_json", str(json_path)])
+    assert result.exit_code == 0
+    assert mock_set_logger.call_args.kwargs["json_sink"] == str(json_path)
+
+
+def test_cli_bump(tagged_repo: Path) -> None:
+    """Test CLI bump command (several components in one run)."""
+    del tagged_repo
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--dry_run", "bump", "v=minor", "api/v=patch"])
+    assert result.exit_code == 0
+    assert result.stdout == "v1.1.0\napi/v0.0.1\n"
+    result = runner.invoke(cli, ["--dry_run", "bump", "api/v=major", "--json"])
+    assert json.loads(result.stdout) == ["api/v1.0.0"]
+    result = runner.invoke(cli, ["--dry_run", "--strict", "bump", "v=patch"])
+    assert result.exit_code == 1
+    assert "v-legacy" in result.output
+    for args in [["bump", "api/v"], ["bump", "api/v=huge"], ["bump"], ["--remote_only", "bump", "v=patch"]]:
+        assert runner.invoke(cli, args).exit_code == 2
+
+
+def test_cli_batch(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    real_git_utils: None,  # pylint: disable=unused-argument
+    git: Callable[..., str],
+    git_repo: Path,
+    git_remote: Path,
+    tmp_path: Path,
+) -> None:
+    """Test CLI batch command (one result line per repository, failures are isolated)."""
+    other_dir = tmp_path / "other"
+    git("clone", str(git_remote), str(other_dir), cwd=tmp_path)
+    git("tag", "v1.0.0", cwd=other_dir)
+    runner = CliRunner()
+    result = runner.invoke(cli, ["batch", f"{git_repo}=minor", str(other_dir), "-t", "patch", "-w", "2"])
+    assert result.exit_code == 0
+    records = {record["repo"]: record for record in map(json.loads, result.stdout.splitlines())}
+    assert {repo: record["tag"] for repo, record in records.items()} == {
+        str(git_repo): "v0.1.0",
+        str(other_dir): "v1.0.1",
+    }
+    assert git("tag", "-l", cwd=git_remote).splitlines() == ["v0.1.0", "v1.0.1"]
+    lines = f'{{"repo": "{git_repo}", "bump_type": "patch"}}\n{{"repo": "{tmp_path / "missing"}"}}\n'
+    result = runner.invoke(cli, ["--dry_run", "batch", "-t", "major"], input=lines)
+    assert result.exit_code == 1
+    assert "1 of 2 repositories failed" in result.output
+    tags = sorted(str(record["tag"]) for record in map(json.loads, result.stdout.splitlines()[:2]))
+    assert tags == ["None", "v0.1.1"]
+    assert runner.invoke(cli, ["batch", "web"]).exit_code == 2
+    assert runner.invoke(cli, ["--remote_only", "batch", "web=patch"]).exit_code == 2
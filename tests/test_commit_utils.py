@@ -0,0 +1,130 @@
+"""Test commit_utils module."""
+
+import json
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from git import Repo
+from pytest import MonkeyPatch, mark
+
+from semvergit.bump_utils import BumpType
+from semvergit.commit_utils import BumpCache, classify_commits, classify_message, highest_bump
+from semvergit.git_utils import Messages, iter_commit_messages
+
+
+@mark.parametrize(
+    "message, expected",
+    [
+        ("fix: off by one\n", BumpType.PATCH),
+        ("feat: new option\n", BumpType.MINOR),
+        ("Feat(cli): new option\n", BumpType.MINOR),
+        ("feat(api)!: drop the old option\n", BumpType.MAJOR),
+        ("refactor!: new layout\n", BumpType.MAJOR),
+        ("fix: parser\n\nBREAKING CHANGE: tags need a prefix\n", BumpType.MAJOR),
+        ("fix: parser\n\nBREAKING-CHANGE: tags need a prefix\n", BumpType.MAJOR),
+        ("docs: mention feat: in the readme\n", BumpType.PATCH),
+        ("Merge branch 'feature'\n", BumpType.PATCH),
+        ("feat:missing space\n", BumpType.PATCH),
+        ("", BumpType.PATCH),
+    ],
+)
+def test_classify_message(message: str, expected: BumpType) -> None:
+    """Test classify_message (Conventional Commits)."""
+    assert classify_message(message) == expected
+
+
+def test_highest_bump() -> None:
+    """Test highest_bump stops at the first major."""
+    assert highest_bump([]) is None
+    assert highest_bump([BumpType.PATCH, BumpType.MINOR, BumpType.PATCH]) == BumpType.MINOR
+    consumed = iter([BumpType.PATCH, BumpType.MAJOR, BumpType.MINOR])
+    assert highest_bump(consumed) == BumpType.MAJOR
+    assert list(consumed) == [BumpType.MINOR]
+
+
+def test_bump_cache(tmp_path: Path) -> None:
+    """Test the bump cache is saved (only when changed) and loaded."""
+    cache = BumpCache(str(tmp_path))
+    assert cache.get("abc") is None
+    cache.save()
+    assert not Path(cache.path).exists()
+    cache.set("abc", BumpType.MINOR)
+    cache.save()
+    assert BumpCache(str(tmp_path)).get("abc") == BumpType.MINOR
+
+
+@mark.parametrize("content", ["{", json.dumps({"format": 0, "bumps": {"abc": "minor"}}), "[]"])
+def test_bump_cache_invalid(tmp_path: Path, content: str) -> None:
+    """Test unreadable or incompatible bump caches are ignored."""
+    cache = BumpCache(str(tmp_path))
+    Path(cache.path).parent.mkdir()
+    Path(cache.path).write_text(content, encoding="utf-8")
+    assert not BumpCache(str(tmp_path)).bumps
+
+
+def commit(git: Callable[..., str], repo_dir: Path, *messages: str) -> None:
+    """Make empty commits."""
+    for message in messages:
+        git("commit", "--allow-empty", "-m", message, cwd=repo_dir)
+
+
+def test_classify_commits(git: Callable[..., str], git_repo: Path) -> None:
+    """Test classify_commits of a range (without a cache)."""
+    git("tag", "v1.0.0", cwd=git_repo)
+    repo = Repo(git_repo)
+    assert classify_commits(repo, "v1.0.0..HEAD") is None
+    commit(git, git_repo, "fix: one", "chore: two")
+    assert classify_commits(repo, "v1.0.0..HEAD") == BumpType.PATCH
+    commit(git, git_repo, "feat: three", "fix: four")
+    assert classify_commits(repo, "v1.0.0..HEAD") == BumpType.MINOR
+    assert classify_commits(repo, "HEAD") == BumpType.MINOR
+
+
+def test_classify_commits_cache(monkeypatch: MonkeyPatch, git: Callable[..., str], git_repo: Path) -> None:
+    """Test classify_commits only reads the messages of the new commits with a warm cache."""
+    git("tag", "v1.0.0", cwd=git_repo)
+    commit(git, git_repo, "fix: one", "feat: two")
+    repo = Repo(git_repo)
+    cache = BumpCache(str(git_repo / ".git"))
+    assert classify_commits(repo, "v1.0.0..HEAD", cache) == BumpType.MINOR
+    assert len(BumpCache(str(git_repo / ".git")).bumps) == 2
+    read: List[Tuple[str, ...]] = []
+
+    def counting_messages(repo: Repo, *revisions: str, no_walk: bool = False) -> Messages:
+        read.append(revisions)
+        return iter_commit_messages(repo, *revisions, no_walk=no_walk)
+
+    monkeypatch.setattr("semvergit.commit_utils.iter_commit_messages", counting_messages)
+    cache = BumpCache(str(git_repo / ".git"))
+    assert classify_commits(repo, "v1.0.0..HEAD", cache) == BumpType.MINOR
+    assert not read
+    commit(git, git_repo, "fix: three")
+    assert classify_commits(repo, "v1.0.0..HEAD", cache) == BumpType.MINOR
+    assert read == [(git("rev-parse", "HEAD", cwd=git_repo),)]
+    commit(git, git_repo, "feat!: four", "fix: five")
+    assert classify_commits(repo, "v1.0.0..HEAD", cache) == BumpType.MAJOR
+    assert len(cache.bumps) == 5
+    read.clear()
+    # A cached major is found without reading any message
+    assert classify_commits(repo, "v1.0.0..HEAD", cache) == BumpType.MAJOR
+    assert not read
+
+
+def test_classify_commits_cache_pruned(git: Callable[..., str], git_repo: Path) -> None:
+    """Test the bump cache only keeps the commits since the latest version (the older ones are pruned)."""
+    git("tag", "v1.0.0", cwd=git_repo)
+    commit(git, git_repo, "fix: one", "feat: two")
+    repo = Repo(git_repo)
+    assert classify_commits(repo, "v1.0.0..HEAD", BumpCache(str(git_repo / ".git"))) == BumpType.MINOR
+    git("tag", "v1.1.0", cwd=git_repo)
+    commit(git, git_repo, "fix: three")
+    assert classify_commits(repo, "v1.1.0..HEAD", BumpCache(str(git_repo / ".git"))) == BumpType.PATCH
+    assert BumpCache(str(git_repo / ".git")).bumps == {git("rev-parse", "HEAD", cwd=git_repo): "patch"}
+
+
+def test_classify_commits_early_major(git: Callable[..., str], git_repo: Path) -> None:
+    """Test classify_commits stops the log at the first major (newest first)."""
+    commit(git, git_repo, "fix: one", "feat!: two", "fix: three")
+    cache = BumpCache(str(git_repo / ".git"))
+    assert classify_commits(Repo(git_repo), "HEAD", cache) == BumpType.MAJOR
+    assert sorted(cache.bumps.values()) == ["major", "patch"]
@@ -1,11 +1,36 @@
 """Test file_utils module."""
 
+import os
 import tempfile
+from pathlib import Path
 
-from pytest import LogCaptureFixture, mark
+from pytest import LogCaptureFixture, MonkeyPatch, mark, raises
 from semver import VersionInfo
 
-from semvergit.file_utils import update_verion_file
+from semvergit.file_utils import (
+    Stamp,
+    compile_pattern,
+    parse_stamp,
+    stamp_file,
+    stamp_files,
+    update_verion_file,
+    write_atomic,
+)
+
+PYPROJECT = """[project]
+name = "package"
+version = "1.0.0"
+dependencies = ["other>=1.0.0"]
+
+[tool.poetry]
+version = "1.0.0"
+"""
+PACKAGE_JSON = """{\r
+  "name": "package",\r
+  "version": "1.0.0",\r
+  "dependencies": {"version": "1.0.0"}\r
+}\r
+"""
 
 
 @mark.parametrize(
@@ -52,3 +77,124 @@ def test_update_verion_file_dry_run(
             assert True
         except Exception:  # pylint: disable=broad-except
             assert False
+
+
+def test_write_atomic(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test write_atomic keeps the file mode and leaves no temporary file on failure."""
+    path = tmp_path / "script.sh"
+    path.write_text("old", encoding="utf-8")
+    path.chmod(0o755)
+    write_atomic(str(path), "new")
+    assert path.read_text(encoding="utf-8") == "new"
+    assert path.stat().st_mode & 0o777 == 0o755
+
+    def failing_replace(src: str, dst: str) -> None:
+        raise OSError(f"Can't replace {dst} with {src}")
+
+    monkeypatch.setattr("semvergit.file_utils.os.replace", failing_replace)
+    with raises(OSError):
+        write_atomic(str(path), "newer")
+    assert os.listdir(tmp_path) == ["script.sh"]
+
+
+def test_write_atomic_new_file(tmp_path: Path) -> None:
+    """Test write_atomic creates new files with the mode of open (0o666 less the umask)."""
+    umask = os.umask(0o022)
+    try:
+        write_atomic(str(tmp_path / "_version.py"), "new")
+        os.umask(0o077)
+        write_atomic(str(tmp_path / "private.py"), "new")
+    finally:
+        os.umask(umask)
+    assert (tmp_path / "_version.py").stat().st_mode & 0o777 == 0o644
+    assert (tmp_path / "private.py").stat().st_mode & 0o777 == 0o600
+
+
+def test_parse_stamp(tmp_path: Path) -> None:
+    """Test parse_stamp (globs, default and explicit patterns)."""
+    for name in ["a/_version.py", "b/_version.py", "pyproject.toml", "Chart.yaml", "VERSION"]:
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text("", encoding="utf-8")
+    stamps = parse_stamp(f"{tmp_path}/*/_version.py")
+    assert [stamp.path for stamp in stamps] == [f"{tmp_path}/a/_version.py", f"{tmp_path}/b/_version.py"]
+    assert stamps[0].pattern.pattern.startswith("^__version__")
+    assert parse_stamp(f"{tmp_path}/Chart.yaml")[0].limit == 1
+    assert parse_stamp(f"{tmp_path}/VERSION=^(?P<version>.+)$")[0].pattern.pattern == "^(?P<version>.+)$"
+
+
+@mark.parametrize(
+    "spec, error",
+    [
+        ("missing.txt", "No files match"),
+        ("VERSION", "No default version pattern"),
+        ("VERSION=(", "Invalid pattern"),
+        ("VERSION=^version", "has no (?P<version>...) group"),
+    ],
+)
+def test_parse_stamp_invalid(monkeypatch: MonkeyPatch, tmp_path: Path, spec: str, error: str) -> None:
+    """Test parse_stamp errors."""
+    (tmp_path / "VERSION").write_text("1.0.0", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    with raises(ValueError, match=error.replace("(", r"\(").replace(")", r"\)").replace("?", r"\?")):
+        parse_stamp(spec)
+
+
+def test_stamp_file(tmp_path: Path) -> None:
+    """Test stamp_file replaces every match (default) or only the first ones (limit), keeping the line endings."""
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text(PYPROJECT, encoding="utf-8")
+    assert stamp_file(parse_stamp(str(pyproject))[0], "1.1.0")
+    assert pyproject.read_text(encoding="utf-8") == PYPROJECT.replace('version = "1.0.0"', 'version = "1.1.0"')
+    package_json = tmp_path / "package.json"
+    package_json.write_bytes(PACKAGE_JSON.encode())
+    assert stamp_file(parse_stamp(str(package_json))[0], "1.1.0")
+    assert package_json.read_bytes() == PACKAGE_JSON.replace('"version": "1.0.0",', '"version": "1.1.0",').encode()
+
+
+def test_stamp_file_tables(tmp_path: Path) -> None:
+    """Test pyproject.toml is only stamped in the [project] and [tool.poetry] tables (not in dependency tables)."""
+    pyproject = tmp_path / "pyproject.toml"
+    dependency = '[tool.poetry.dependencies.requests]\nversion = "^2.0"\n\n'
+    pyproject.write_text(dependency + PYPROJECT + dependency, encoding="utf-8")
+    stamp = parse_stamp(str(pyproject))[0]
+    assert stamp_file(stamp, "1.1.0")
+    expected = dependency + PYPROJECT.replace('version = "1.0.0"', 'version = "1.1.0"') + dependency
+    assert pyproject.read_text(encoding="utf-8") == expected
+    assert not stamp_file(stamp, "1.1.0")
+    pyproject.write_text(dependency, encoding="utf-8")
+    with raises(ValueError, match="not found"):
+        stamp_file(stamp, "1.1.0")
+
+
+def test_stamp_file_unchanged(caplog: LogCaptureFixture, tmp_path: Path) -> None:
+    """Test stamp_file doesn't write unchanged files (or in a dry run)."""
+    path = tmp_path / "_version.py"
+    path.write_text('__version__ = "1.0.0"\n', encoding="utf-8")
+    stat = path.stat()
+    stamp = parse_stamp(str(path))[0]
+    assert not stamp_file(stamp, "1.0.0")
+    assert stamp_file(stamp, "1.1.0", dry_run=True)
+    assert path.stat().st_ino == stat.st_ino
+    assert path.stat().st_mtime_ns == stat.st_mtime_ns
+    assert f"Dry run, {path} would be stamped with version 1.1.0" in caplog.messages
+    # Matches after the limit are kept
+    path.write_text('__version__ = "1.0.0"\n__version__ = "0.1.0"\n', encoding="utf-8")
+    assert not stamp_file(Stamp(path=str(path), pattern=stamp.pattern, limit=1), "1.0.0")
+    with raises(ValueError, match="not found"):
+        stamp_file(Stamp(path=str(path), pattern=compile_pattern("^VERSION=(?P<version>.+)$")), "1.0.0")
+
+
+def test_stamp_files(tmp_path: Path) -> None:
+    """Test stamp_files stamps many files (the stamps of a file in order) and returns the changed ones."""
+    paths = []
+    for number in range(20):
+        path = tmp_path / f"_version_{number}.py"
+        path.write_text(f'__version__ = "{"1.1.0" if number % 2 else "1.0.0"}"\nVERSION = "1.0.0"\n', encoding="utf-8")
+        paths.append(path)
+    stamps = parse_stamp(f"{tmp_path}/*.py")
+    stamps.append(Stamp(path=str(paths[1]), pattern=compile_pattern('^VERSION = "(?P<version>[^"]+)"')))
+    changed = stamp_files(stamps, VersionInfo(1, 1, 0), dry_run=False)
+    assert sorted(changed) == sorted(str(path) for number, path in enumerate(paths) if number % 2 == 0 or number == 1)
+    assert paths[1].read_text(encoding="utf-8") == '__version__ = "1.1.0"\nVERSION = "1.1.0"\n'
+    assert paths[2].read_text(encoding="utf-8") == '__version__ = "1.1.0"\nVERSION = "1.0.0"\n'
+    assert not stamp_files([], VersionInfo(1, 1, 0), dry_run=False)
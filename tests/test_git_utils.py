@@ -2,21 +2,56 @@
 
 from __future__ import annotations
 
-from typing import Dict, List, Tuple, TypeVar
+import asyncio
+from pathlib import Path
+from typing import Any, Callable, Dict, Generator, List, Tuple, TypeVar
 
-from git import Repo
-from pytest import MonkeyPatch, mark
+from git import GitCommandError, Repo
+from loguru import logger
+from pytest import MonkeyPatch, mark, raises
 
+from semvergit import git_utils
 from semvergit.git_utils import (
+    AsyncGit,
+    PushError,
     add_file,
+    add_files,
+    async_fetch_tags,
+    async_ls_remote_tags,
+    async_pull_remote,
+    async_push_refs,
+    close_repo,
+    commit_files,
+    delete_tag,
     drywrap,
+    ensure_commit_graph,
+    fetch_commit,
+    fetch_remote_tags,
     get_active_branch,
+    get_git_dir,
+    get_missing_objects,
+    get_reachable_tags,
     get_repo,
     get_tags_with_prefix,
+    has_commit,
+    is_push_rejected,
+    iter_commit_messages,
+    iter_commit_shas,
+    ls_remote_tags,
     new_commit,
+    parse_ls_remote_commits,
     pull_remote,
+    push_refs,
     push_remote,
+    push_remote_tag,
+    pushed_remotes,
+    raise_push_errors,
+    resolve_commit,
+    resolve_remote_ref,
+    resolve_remote_url,
+    retract_unpushed_tags,
     set_tag,
+    stream_git,
 )
 
 T = TypeVar("T")
@@ -35,14 +70,32 @@ def test_drywrap() -> None:
     assert dry_tester("test", dry_run=False) == (("test",), {})
 
 
-def test_get_repo() -> None:
+def test_get_repo(monkeypatch: MonkeyPatch) -> None:
     """Test get_repo."""
-    MonkeyPatch().setattr("semvergit.git_utils.Repo.working_tree_dir", "/test")
+    monkeypatch.setattr("semvergit.git_utils.Repo.working_tree_dir", "/test")
     assert get_repo().working_tree_dir == "/test"
     assert isinstance(get_repo(), Repo)
 
 
-def test_get_active_branch() -> None:
+def test_get_repo_path(git_repo: Path) -> None:
+    """Test get_repo with a path."""
+    (git_repo / "subdir").mkdir()
+    assert get_repo(str(git_repo / "subdir")).git_dir == str(git_repo / ".git")
+
+
+def test_close_repo(git_repo: Path) -> None:
+    """Test close_repo."""
+    test_repo = get_repo(str(git_repo))
+    assert test_repo.head.commit.message == "Initial commit\n"
+    close_repo(test_repo)
+
+
+def test_get_git_dir(git_repo: Path) -> None:
+    """Test get_git_dir."""
+    assert get_git_dir(Repo(git_repo)) == str(git_repo / ".git")
+
+
+def test_get_active_branch(monkeypatch: MonkeyPatch) -> None:
     """Test get_active_branch."""
 
     test_repo = Repo()
@@ -59,12 +112,12 @@ def test_get_active_branch() -> None:
             """Name."""
             return self.reference
 
-    MonkeyPatch().setattr("semvergit.git_utils.Repo.active_branch", HeadMock("thisisatest"))
+    monkeypatch.setattr("semvergit.git_utils.Repo.active_branch", HeadMock("thisisatest"))
     branch = get_active_branch(test_repo)
     assert branch.name == "thisisatest"
 
 
-def test_pull_remote() -> None:
+def test_pull_remote(monkeypatch: MonkeyPatch) -> None:
     """Test pull_remote."""
 
     class RemoteMock:
@@ -84,7 +137,7 @@ def test_pull_remote() -> None:
             return self
 
     test_repo = Repo()
-    MonkeyPatch().setattr("semvergit.git_utils.Repo.remotes", RemoteMock("testrepo"))
+    monkeypatch.setattr("semvergit.git_utils.Repo.remotes", RemoteMock("testrepo"))
     pull_remote(test_repo)
 
 
@@ -100,7 +153,7 @@ def test_pull_remote() -> None:
         (["v0.0.1", "dev123", "dev_version"], "dev", ["dev123", "dev_version"]),
     ],
 )
-def test_get_tags_with_prefix(test_tags: List[str], prefix: str, expected: List[str]) -> None:
+def test_get_tags_with_prefix(monkeypatch: MonkeyPatch, test_tags: List[str], prefix: str, expected: List[str]) -> None:
     """Test get_tags_with_prefix."""
 
     test_repo = Repo()
@@ -113,8 +166,8 @@ def test_get_tags_with_prefix(test_tags: List[str], prefix: str, expected: List[
             self.name = name
 
     mock_tags = [TagMock(tag) for tag in test_tags]
-    MonkeyPatch().setattr("semvergit.git_utils.Repo.tags", mock_tags)
-    fetched_tags = get_tags_with_prefix(test_repo, prefix)
+    monkeypatch.setattr("semvergit.git_utils.Repo.tags", mock_tags)
+    fetched_tags = get_tags_with_prefix(test_repo, prefix, use_refs=False)
     if fetched_tags:
         for tag in fetched_tags:
             assert tag in expected
@@ -122,7 +175,53 @@ def test_get_tags_with_prefix(test_tags: List[str], prefix: str, expected: List[
         assert fetched_tags == expected
 
 
-def test_new_commit() -> None:
+def test_get_tags_with_prefix_refs(git: Callable[..., str], git_repo: Path) -> None:
+    """Test get_tags_with_prefix reading the refs directly."""
+    for tag in ["v0.0.1", "v0.0.2", "other"]:
+        git("tag", tag, cwd=git_repo)
+    git("pack-refs", "--all", cwd=git_repo)
+    git("tag", "v0.0.3", cwd=git_repo)
+    test_repo = Repo(git_repo)
+    assert get_tags_with_prefix(test_repo, "v") == ["v0.0.1", "v0.0.2", "v0.0.3"]
+
+
+def test_get_tags_with_prefix_lazy_log(git: Callable[..., str], git_repo: Path, monkeypatch: MonkeyPatch) -> None:
+    """Test get_tags_with_prefix only summarizes the tags if a sink logs debug messages."""
+    summaries: List[int] = []
+
+    def summarize(items: List[str]) -> str:
+        summaries.append(len(items))
+        return "summary"
+
+    monkeypatch.setattr(git_utils, "summarize", summarize)
+    git("tag", "v0.0.1", cwd=git_repo)
+    test_repo = Repo(git_repo)
+    assert get_tags_with_prefix(test_repo, "v") == ["v0.0.1"]
+    assert summaries == [1]
+    logger.remove()
+    sink_id = logger.add(lambda message: None, level="ERROR")
+    assert get_tags_with_prefix(test_repo, "v") == ["v0.0.1"]
+    logger.remove(sink_id)
+    assert summaries == [1]
+
+
+def test_get_tags_with_prefix_fallback(monkeypatch: MonkeyPatch, git_repo: Path) -> None:
+    """Test get_tags_with_prefix falls back to GitPython."""
+
+    class TagMock:  # pylint: disable=too-few-public-methods
+        """Tag mock."""
+
+        def __init__(self, name: str) -> None:
+            """Init."""
+            self.name = name
+
+    test_repo = Repo(git_repo)
+    (git_repo / ".git" / "reftable").mkdir()
+    monkeypatch.setattr("semvergit.git_utils.Repo.tags", [TagMock("v1.0.0"), TagMock("other")])
+    assert get_tags_with_prefix(test_repo, "v") == ["v1.0.0"]
+
+
+def test_new_commit(monkeypatch: MonkeyPatch) -> None:
     """Test new_commit."""
 
     class MockCommit:  # pylint: disable=too-few-public-methods
@@ -143,12 +242,12 @@ def test_new_commit() -> None:
 
     test_repo = Repo()
 
-    MonkeyPatch().setattr("semvergit.git_utils.Repo.index", MockIndex)
+    monkeypatch.setattr("semvergit.git_utils.Repo.index", MockIndex)
     result = new_commit(test_repo, "testmessage")
     assert result == "112233"
 
 
-def test_add_file() -> None:
+def test_add_file(monkeypatch: MonkeyPatch) -> None:
     """Test add_file."""
 
     class MockIndex:  # pylint: disable=too-few-public-methods
@@ -161,11 +260,11 @@ def test_add_file() -> None:
 
     test_repo = Repo()
 
-    MonkeyPatch().setattr("semvergit.git_utils.Repo.index", MockIndex)
+    monkeypatch.setattr("semvergit.git_utils.Repo.index", MockIndex)
     add_file(test_repo, "testfile")
 
 
-def test_set_tag() -> None:
+def test_set_tag(monkeypatch: MonkeyPatch) -> None:
     """Test set_tag."""
 
     def mock_create_tag(repo: Repo, tag: str) -> str:  # pylint: disable=unused-argument
@@ -174,30 +273,482 @@ def test_set_tag() -> None:
 
     test_repo = Repo()
 
-    MonkeyPatch().setattr("semvergit.git_utils.Repo.create_tag", mock_create_tag)
+    monkeypatch.setattr("semvergit.git_utils.Repo.create_tag", mock_create_tag)
     result = set_tag(test_repo, "testtag")
     assert result == "testtag"
 
 
-def test_push_remote() -> None:
-    """Test push_remote."""
-
-    class RemoteMock:
-        """Remote mock."""
-
-        def __init__(self: T, name: str) -> None:
-            """Init."""
-            self.name = name
-
-        def push(self: T, tag_str: str) -> None:  # pylint: disable=unused-argument
-            """Push."""
-            pass  # pylint: disable=unnecessary-pass
+def test_set_tag_commit(git: Callable[..., str], git_repo: Path) -> None:
+    """Test set_tag on a given commit."""
+    first_sha = git("rev-parse", "HEAD", cwd=git_repo)
+    git("commit", "--allow-empty", "-m", "Second commit", cwd=git_repo)
+    set_tag(Repo(git_repo), "v0.0.1", commit=first_sha)
+    assert git("rev-list", "-n", "1", "v0.0.1", cwd=git_repo) == first_sha
+
+
+def test_commit_options(
+    git: Callable[..., str], git_repo: Path, git_remote: Path, tmp_path: Path  # pylint: disable=unused-argument
+) -> None:
+    """Test commits are never parsed as options of git."""
+    test_repo = Repo(git_repo)
+    assert has_commit(test_repo, git("rev-parse", "HEAD", cwd=git_repo))
+    pwned = tmp_path / "pwned"
+    option = f"--upload-pack=touch {pwned};"
+    assert not has_commit(test_repo, option)
+    with raises(GitCommandError):
+        fetch_commit(test_repo, option)
+    with raises(GitCommandError):
+        set_tag(test_repo, "v0.0.1", commit=option)
+    assert not pwned.exists()
+    assert not git("tag", "-l", cwd=git_repo)
+
+
+def test_push_refs(git: Callable[..., str], git_repo: Path, git_remote: Path) -> None:
+    """Test push_refs pushes several tags in one push."""
+    git("tag", "v0.0.1", cwd=git_repo)
+    git("tag", "v0.0.2", cwd=git_repo)
+    push_refs(Repo(git_repo), ["refs/tags/v0.0.1", "refs/tags/v0.0.2"])
+    assert git("tag", "-l", cwd=git_remote).splitlines() == ["v0.0.1", "v0.0.2"]
+
+
+def test_push_refs_empty(git: Callable[..., str], git_repo: Path, git_remote: Path) -> None:
+    """Test push_refs refuses to push without refspecs (git would push the current branch)."""
+    git("commit", "--allow-empty", "-m", "Local only", cwd=git_repo)
+    with raises(ValueError, match="Nothing to push to origin"):
+        push_refs(Repo(git_repo), [])
+    with raises(ValueError, match="Nothing to push to origin"):
+        asyncio.run(async_push_refs(AsyncGit(), Repo(git_repo), [], ["origin"]))
+    assert git("rev-parse", "master", cwd=git_remote) != git("rev-parse", "HEAD", cwd=git_repo)
+
+
+def test_push_remote(git: Callable[..., str], git_repo: Path, git_remote: Path) -> None:
+    """Test push_remote pushes the tag."""
+    git("tag", "v0.0.1", cwd=git_repo)
+    push_remote(Repo(git_repo), "v0.0.1")
+    assert git("tag", "-l", cwd=git_remote) == "v0.0.1"
+
+
+def test_push_remote_branch(git: Callable[..., str], git_repo: Path, git_remote: Path, tmp_path: Path) -> None:
+    """Test push_remote pushes the branch and the tag to several remotes."""
+    second_remote = tmp_path / "second.git"
+    git("clone", "--bare", str(git_remote), str(second_remote), cwd=tmp_path)
+    git("commit", "--allow-empty", "-m", "New version", cwd=git_repo)
+    git("tag", "v0.0.1", cwd=git_repo)
+    push_remote(Repo(git_repo), "v0.0.1", branch="master", remotes=["origin", str(second_remote)])
+    head_sha = git("rev-parse", "HEAD", cwd=git_repo)
+    for remote_dir in [git_remote, second_remote]:
+        assert git("rev-parse", "master", cwd=remote_dir) == head_sha
+        assert git("rev-parse", "v0.0.1", cwd=remote_dir) == head_sha
+
+
+def test_push_remote_atomic(git: Callable[..., str], git_repo: Path, git_remote: Path, tmp_path: Path) -> None:
+    """Test push_remote doesn't push the tag when the branch is rejected (and other remotes are still pushed)."""
+    second_remote = tmp_path / "second.git"
+    git("clone", "--bare", str(git_remote), str(second_remote), cwd=tmp_path)
+    git("commit", "--allow-empty", "-m", "Someone else", cwd=git_repo)
+    git("push", "origin", "master", cwd=git_repo)
+    git("reset", "--hard", "HEAD~1", cwd=git_repo)
+    git("commit", "--allow-empty", "-m", "New version", cwd=git_repo)
+    git("tag", "v0.0.1", cwd=git_repo)
+    with raises(PushError) as error:
+        push_remote(Repo(git_repo), "v0.0.1", branch="master", remotes=["origin", str(second_remote)])
+    assert pushed_remotes(error.value) == [str(second_remote)]
+    assert not pushed_remotes(GitCommandError(["git", "push"], 1))
+    assert not git("tag", "-l", cwd=git_remote)
+    assert git("tag", "-l", cwd=second_remote) == "v0.0.1"
+
+
+def test_raise_push_errors() -> None:
+    """Test raise_push_errors (errors that aren't git errors are raised as they are)."""
+    raise_push_errors(["refs/tags/v0.0.1"], {"origin": None})
+    with raises(OSError, match="boom"):
+        raise_push_errors(["refs/tags/v0.0.1"], {"origin": None, "backup": OSError("boom")})
+    with raises(PushError) as error:
+        raise_push_errors(["refs/tags/v0.0.1"], {"origin": GitCommandError(["git", "push"], 128, stderr="fatal")})
+    assert not error.value.pushed
+    assert error.value.status == 128
+    assert "fatal" in str(error.value)
+
+
+def test_retract_unpushed_tags(git: Callable[..., str], git_repo: Path) -> None:
+    """Test retract_unpushed_tags keeps the tags some remote accepted and deletes the others."""
+    for tag in ["v0.0.1", "v0.0.2"]:
+        git("tag", tag, cwd=git_repo)
+    error = GitCommandError(["git", "push"], 1)
+    partial = PushError({"origin": error}, pushed=["backup"])
+    assert retract_unpushed_tags(Repo(git_repo), ["v0.0.1", "v0.0.2"], partial)
+    assert not retract_unpushed_tags(Repo(git_repo), ["v0.0.1"], error, dry_run=True)
+    assert git("tag", "-l", cwd=git_repo).splitlines() == ["v0.0.1", "v0.0.2"]
+    assert not retract_unpushed_tags(Repo(git_repo), ["v0.0.1"], error)
+    assert git("tag", "-l", cwd=git_repo) == "v0.0.2"
+
+
+def test_resolve_remote_url(monkeypatch: MonkeyPatch, git_repo: Path, git_remote: Path, tmp_path: Path) -> None:
+    """Test resolve_remote_url (names are looked up in the repository of the working directory)."""
+    assert resolve_remote_url("https://example.com/repo.git") == "https://example.com/repo.git"
+    assert resolve_remote_url(str(tmp_path)) == str(tmp_path)
+    assert resolve_remote_url("origin", cwd=str(git_repo)) == str(git_remote)
+    monkeypatch.chdir(git_repo)
+    assert resolve_remote_url("origin") == str(git_remote)
+    with raises(ValueError, match="Unknown remote upstream"):
+        resolve_remote_url("upstream")
+
+
+def test_ls_remote_tags(git: Callable[..., str], git_repo: Path, git_remote: Path) -> None:
+    """Test ls_remote_tags."""
+    for tag in ["v0.0.1", "v0.0.2", "api/v1.0.0", "other"]:
+        git("tag", tag, cwd=git_repo)
+    git("push", "origin", "--tags", cwd=git_repo)
+    assert sorted(ls_remote_tags(str(git_remote), "v")) == ["v0.0.1", "v0.0.2"]
+    assert ls_remote_tags(str(git_remote), "api/v") == ["api/v1.0.0"]
+    assert not ls_remote_tags(str(git_remote), "web/v")
+
+
+def test_resolve_remote_ref(git: Callable[..., str], git_repo: Path, git_remote: Path) -> None:
+    """Test resolve_remote_ref."""
+    head_sha = git("rev-parse", "HEAD", cwd=git_repo)
+    assert resolve_remote_ref(str(git_remote)) == head_sha
+    assert resolve_remote_ref(str(git_remote), "refs/heads/master") == head_sha
+    with raises(ValueError):
+        resolve_remote_ref(str(git_remote), "refs/heads/missing")
+
+
+def test_push_remote_tag(git: Callable[..., str], git_repo: Path, git_remote: Path) -> None:
+    """Test push_remote_tag tags a (non tip) commit without a local clone."""
+    first_sha = git("rev-parse", "HEAD", cwd=git_repo)
+    git("commit", "--allow-empty", "-m", "Second commit", cwd=git_repo)
+    git("push", "origin", "master", cwd=git_repo)
+    push_remote_tag(str(git_remote), "v0.1.0", first_sha)
+    assert git("rev-parse", "v0.1.0", cwd=git_remote) == first_sha
+    push_remote_tag(str(git_remote), "v0.2.0", first_sha, dry_run=True)
+    assert not git("tag", "-l", "v0.2.0", cwd=git_remote)
+
+
+def test_fetch_remote_tags(git: Callable[..., str], git_repo: Path, git_remote: Path) -> None:
+    """Test fetch_remote_tags only fetches the tags with prefix."""
+    git("tag", "v0.0.1", cwd=git_remote)
+    git("tag", "other", cwd=git_remote)
+    test_repo = Repo(git_repo)
+    assert fetch_remote_tags(test_repo, "v") == 1
+    assert get_tags_with_prefix(test_repo, "") == ["v0.0.1"]
+    assert fetch_remote_tags(test_repo, "v") == 0
+
+
+def test_fetch_remote_tags_shallow(git: Callable[..., str], git_repo: Path, git_remote: Path, tmp_path: Path) -> None:
+    """Test fetch_remote_tags keeps a shallow clone shallow."""
+    first_sha = git("rev-parse", "HEAD", cwd=git_repo)
+    for index in range(3):
+        git("commit", "--allow-empty", "-m", f"Commit {index}", cwd=git_repo)
+    git("push", "origin", "master", cwd=git_repo)
+    git("tag", "v0.0.1", first_sha, cwd=git_remote)
+    shallow_dir = tmp_path / "shallow"
+    git("clone", "--depth=1", f"file://{git_remote}", str(shallow_dir), cwd=tmp_path)
+    test_repo = Repo(shallow_dir)
+    assert fetch_remote_tags(test_repo, "v") == 1
+    assert git("rev-parse", "--is-shallow-repository", cwd=shallow_dir) == "true"
+    assert git("rev-list", "--count", "--all", cwd=shallow_dir) == "2"
+
+
+def make_shallow_clone(git: Callable[..., str], git_repo: Path, git_remote: Path, tmp_path: Path) -> Path:
+    """Clone (depth 4) with remote tags on a local commit (lightweight and annotated) and on a missing commit."""
+    first_sha = git("rev-parse", "HEAD", cwd=git_repo)
+    for index in range(5):
+        git("commit", "--allow-empty", "-m", f"Commit {index}", cwd=git_repo)
+    git("push", "origin", "master", cwd=git_repo)
+    git("tag", "v0.0.1", first_sha, cwd=git_remote)
+    git("tag", "v0.0.2", "HEAD~2", cwd=git_remote)
+    git("-c", "user.name=Test", "-c", "user.email=test@test", "tag", "-a", "-m", "Annotated", "v0.0.3", cwd=git_remote)
+    shallow_dir = tmp_path / "shallow"
+    git("clone", "--depth=4", "--no-tags", f"file://{git_remote}", str(shallow_dir), cwd=tmp_path)
+    return shallow_dir
+
+
+def test_fetch_remote_tags_shallow_history(
+    git: Callable[..., str], git_repo: Path, git_remote: Path, tmp_path: Path
+) -> None:
+    """Test fetch_remote_tags keeps the local history of a shallow clone (tags on local commits aren't cut)."""
+    shallow_dir = make_shallow_clone(git, git_repo, git_remote, tmp_path)
+    assert fetch_remote_tags(Repo(shallow_dir), "v") == 3
+    assert git("rev-list", "--count", "HEAD", cwd=shallow_dir) == "4"
+    assert git("rev-list", "--count", "--all", cwd=shallow_dir) == "5"
+    assert git("cat-file", "-t", "v0.0.3", cwd=shallow_dir) == "tag"
+    assert fetch_remote_tags(Repo(shallow_dir), "v") == 0
+
+
+def test_delete_tag(git: Callable[..., str], git_repo: Path) -> None:
+    """Test delete_tag."""
+    git("tag", "v0.0.1", cwd=git_repo)
+    delete_tag(Repo(git_repo), "v0.0.1", dry_run=True)
+    assert git("tag", "-l", cwd=git_repo) == "v0.0.1"
+    delete_tag(Repo(git_repo), "v0.0.1")
+    assert not git("tag", "-l", cwd=git_repo)
+
+
+def test_is_push_rejected(git: Callable[..., str], git_repo: Path, git_remote: Path) -> None:
+    """Test is_push_rejected."""
+    git("tag", "v0.0.1", cwd=git_remote)
+    git("commit", "--allow-empty", "-m", "Second commit", cwd=git_repo)
+    git("tag", "v0.0.1", cwd=git_repo)
+    with raises(GitCommandError) as exp_info:
+        Repo(git_repo).git.push("--atomic", "origin", "refs/tags/v0.0.1")
+    assert is_push_rejected(exp_info.value)
+    with raises(GitCommandError) as exp_info:
+        Repo(git_repo).git.push("--atomic", "missing", "refs/tags/v0.0.1")
+    assert not is_push_rejected(exp_info.value)
 
-        @property
-        def origin(self: T) -> T:
-            """Origin."""
-            return self
 
-    test_repo = Repo()
-    MonkeyPatch().setattr("semvergit.git_utils.Repo.remotes", RemoteMock("testrepo"))
-    push_remote(test_repo, "testtag")
+@mark.parametrize(
+    "stderr, rejected",
+    [
+        (
+            "remote: error: cannot lock ref 'refs/tags/v1.0.0': reference already exists\n"
+            " ! [remote rejected] v1.0.0 -> v1.0.0 (atomic transaction failed)",
+            True,
+        ),
+        (
+            "remote: error: cannot lock ref 'refs/tags/v1.0.0': Unable to create"
+            " '/srv/repo.git/refs/tags/v1.0.0.lock': File exists.\n"
+            " ! [remote rejected] v1.0.0 -> v1.0.0 (atomic transaction failed)",
+            True,
+        ),
+        (" ! [remote rejected] v1.0.0 -> v1.0.0 (pre-receive hook declined)", False),
+        (" ! [remote rejected] main -> main (protected branch hook declined)", False),
+    ],
+)
+def test_is_push_rejected_remote(stderr: str, rejected: bool) -> None:
+    """Test is_push_rejected matches the conflicts reported by the remote (lost races), not other rejections."""
+    assert is_push_rejected(GitCommandError(["git", "push"], 1, stderr=stderr)) is rejected
+
+
+def test_ls_remote_tags_repo(git: Callable[..., str], git_repo: Path, git_remote: Path) -> None:
+    """Test ls_remote_tags with a remote name of the repo."""
+    git("tag", "v0.0.1", cwd=git_remote)
+    assert ls_remote_tags("origin", "v", repo=Repo(git_repo)) == ["v0.0.1"]
+
+
+def test_resolve_commit(git: Callable[..., str], git_repo: Path) -> None:
+    """Test resolve_commit (annotated tags are peeled)."""
+    git("tag", "-a", "v0.1.0", "-m", "Release", cwd=git_repo)
+    head = git("rev-parse", "HEAD", cwd=git_repo)
+    repo = Repo(git_repo)
+    assert resolve_commit(repo) == head
+    assert resolve_commit(repo, "v0.1.0") == head
+    with raises(GitCommandError):
+        resolve_commit(repo, "missing")
+
+
+def test_ensure_commit_graph(git_repo: Path) -> None:
+    """Test ensure_commit_graph writes the commit-graph once."""
+    repo = Repo(git_repo)
+    assert ensure_commit_graph(repo)
+    assert (git_repo / ".git" / "objects" / "info" / "commit-graph").exists()
+    assert not ensure_commit_graph(repo)
+
+
+def test_ensure_commit_graph_error(git_repo: Path) -> None:
+    """Test ensure_commit_graph goes on without the commit-graph when it can't be written."""
+    # Another writer holds the lock
+    (git_repo / ".git" / "objects" / "info" / "commit-graph.lock").write_text("", encoding="utf-8")
+    assert not ensure_commit_graph(Repo(git_repo))
+    assert not (git_repo / ".git" / "objects" / "info" / "commit-graph").exists()
+
+
+def test_get_reachable_tags(git: Callable[..., str], git_repo: Path) -> None:
+    """Test get_reachable_tags only lists the tags of the ref history."""
+    git("tag", "v1.0.0", cwd=git_repo)
+    git("tag", "api/v1.0.0", cwd=git_repo)
+    git("checkout", "-b", "release/1.0", cwd=git_repo)
+    git("commit", "--allow-empty", "-m", "Fix", cwd=git_repo)
+    git("tag", "-a", "v1.0.1", "-m", "Release", cwd=git_repo)
+    git("checkout", "master", cwd=git_repo)
+    git("commit", "--allow-empty", "-m", "Feature", cwd=git_repo)
+    git("tag", "v1.1.0", cwd=git_repo)
+    repo = Repo(git_repo)
+    assert get_reachable_tags(repo) == ["v1.0.0", "v1.1.0"]
+    assert get_reachable_tags(repo, ref="release/1.0") == ["v1.0.0", "v1.0.1"]
+    assert get_reachable_tags(repo, prefix="api/v", ref="release/1.0") == ["api/v1.0.0"]
+
+
+def test_iter_commits(git: Callable[..., str], git_repo: Path) -> None:
+    """Test iter_commit_shas and iter_commit_messages (newest first)."""
+    git("commit", "--allow-empty", "-m", "feat: second\n\nBody", cwd=git_repo)
+    repo = Repo(git_repo)
+    shas = git("rev-list", "HEAD", cwd=git_repo).splitlines()
+    assert list(iter_commit_shas(repo, "HEAD")) == shas
+    assert list(iter_commit_messages(repo, "HEAD")) == [
+        (shas[0], "feat: second\n\nBody\n"),
+        (shas[1], "Initial commit\n"),
+    ]
+    assert list(iter_commit_messages(repo, shas[1], no_walk=True)) == [(shas[1], "Initial commit\n")]
+    assert not list(iter_commit_shas(repo, "HEAD..HEAD"))
+
+
+def test_stream_git(monkeypatch: MonkeyPatch, git: Callable[..., str], git_repo: Path) -> None:
+    """Test stream_git (small chunks, early stop and errors)."""
+    for number in range(20):
+        git("commit", "--allow-empty", "-m", f"Commit {number}", cwd=git_repo)
+    monkeypatch.setattr("semvergit.git_utils.STREAM_CHUNK", 7)
+    repo = Repo(git_repo)
+    assert list(stream_git(repo, "rev_list", "HEAD")) == git("rev-list", "HEAD", cwd=git_repo).splitlines()
+    # format: separates the records (no newline after the last one)
+    assert list(stream_git(repo, "log", "--format=format:%s", "-2")) == ["Commit 19", "Commit 18"]
+    records = stream_git(repo, "rev_list", "HEAD")
+    assert isinstance(records, Generator)
+    assert next(records) == git("rev-parse", "HEAD", cwd=git_repo)
+    records.close()
+    with raises(GitCommandError):
+        list(stream_git(repo, "rev_list", "missing"))
+
+
+def test_commit_files(git: Callable[..., str], git_repo: Path) -> None:
+    """Test commit_files commits the files on top of the branch with plumbing and keeps the index in sync."""
+    (git_repo / "pkg" / "sub").mkdir(parents=True)
+    for name in ["pkg/sub/_version.py", "pkg/other.txt"]:
+        (git_repo / name).write_text("old", encoding="utf-8")
+    git("add", ".", cwd=git_repo)
+    git("commit", "-m", "Add package", cwd=git_repo)
+    (git_repo / "pkg" / "sub" / "_version.py").write_text("new", encoding="utf-8")
+    (git_repo / "run.sh").write_text("new", encoding="utf-8")
+    (git_repo / "run.sh").chmod(0o755)
+    # Staged changes are left out of the commit
+    (git_repo / "initial.txt").write_text("staged", encoding="utf-8")
+    git("add", "initial.txt", cwd=git_repo)
+    repo = Repo(git_repo)
+    sha = commit_files(repo, [str(git_repo / "pkg" / "sub" / "_version.py"), str(git_repo / "run.sh")], "v1", "master")
+    assert git("rev-parse", "--short=7", "HEAD", cwd=git_repo) == sha
+    assert git("log", "-1", "--format=%s", cwd=git_repo) == "v1"
+    assert git("show", "--name-only", "--format=", "HEAD", cwd=git_repo).splitlines() == [
+        "pkg/sub/_version.py",
+        "run.sh",
+    ]
+    assert git("ls-tree", "HEAD", "run.sh", cwd=git_repo).startswith("100755 blob")
+    assert git("show", "HEAD:pkg/other.txt", cwd=git_repo) == "old"
+    assert git("status", "--porcelain", cwd=git_repo).splitlines() == ["M  initial.txt"]
+    git("fsck", "--strict", cwd=git_repo)
+    # Nothing to commit makes an empty commit (like new_commit)
+    commit_files(repo, [], "empty", "master")
+    assert git("log", "-1", "--format=%s", cwd=git_repo) == "empty"
+    assert not git("show", "--name-only", "--format=", "HEAD", cwd=git_repo)
+
+
+def test_commit_files_ref_moved(git: Callable[..., str], git_repo: Path, monkeypatch: MonkeyPatch) -> None:
+    """Test commit_files doesn't move a branch that moved since it was read."""
+    write_tree = git_utils.write_tree
+
+    def racing_write_tree(*args: Any) -> str:
+        git("commit", "--allow-empty", "-m", "Concurrent", cwd=git_repo)
+        return write_tree(*args)
+
+    monkeypatch.setattr(git_utils, "write_tree", racing_write_tree)
+    repo = Repo(git_repo)
+    with raises(GitCommandError):
+        commit_files(repo, [], "v1", "master")
+    assert git("log", "-1", "--format=%s", cwd=git_repo) == "Concurrent"
+
+
+def test_add_files(git: Callable[..., str], git_repo: Path) -> None:
+    """Test add_files stages all the files in one index update."""
+    for name in ["a.txt", "b.txt"]:
+        (git_repo / name).write_text(name, encoding="utf-8")
+    add_files(Repo(git_repo), [str(git_repo / "a.txt"), str(git_repo / "b.txt")])
+    assert git("diff", "--cached", "--name-only", cwd=git_repo).splitlines() == ["a.txt", "b.txt"]
+
+
+def test_async_git(git_repo: Path) -> None:
+    """Test AsyncGit runs git commands concurrently (failures and timeouts raise GitCommandError)."""
+    transport = AsyncGit(concurrency=2)
+
+    async def run_many() -> List[str]:
+        return list(await asyncio.gather(*(transport.run("rev-parse", "HEAD", cwd=str(git_repo)) for _ in range(4))))
+
+    assert len(set(asyncio.run(run_many()))) == 1
+    with raises(GitCommandError) as error:
+        asyncio.run(transport.run("rev-parse", "missing", cwd=str(git_repo)))
+    assert error.value.status == 128
+    slow = AsyncGit(timeout=0.1)
+    with raises(GitCommandError, match="timed out"):
+        asyncio.run(slow.run("-c", "alias.slow=!sleep 5", "slow"))
+
+
+def test_async_push_refs(git: Callable[..., str], git_repo: Path, git_remote: Path, tmp_path: Path) -> None:
+    """Test async_push_refs pushes the tags to each remote (a rejected remote raises, the others are pushed)."""
+    second_remote = tmp_path / "second.git"
+    git("clone", "--bare", str(git_remote), str(second_remote), cwd=tmp_path)
+    git("tag", "v0.0.1", cwd=git_repo)
+    git("tag", "v0.0.2", cwd=git_repo)
+    test_repo = Repo(git_repo)
+    asyncio.run(async_push_refs(AsyncGit(), test_repo, ["refs/tags/v0.0.1", "refs/tags/v0.0.2"], ["origin"]))
+    assert git("tag", "-l", cwd=git_remote).splitlines() == ["v0.0.1", "v0.0.2"]
+    git("tag", "-f", "v0.0.2", "HEAD~0^{tree}", cwd=git_repo)
+    with raises(PushError) as error:
+        asyncio.run(async_push_refs(AsyncGit(), test_repo, ["refs/tags/v0.0.2"], ["origin", str(second_remote)]))
+    assert error.value.pushed == [str(second_remote)]
+    assert is_push_rejected(error.value.errors["origin"])
+    # The tag was accepted by a remote, it can't be allocated again
+    assert not is_push_rejected(error.value)
+    assert git("tag", "-l", cwd=second_remote) == "v0.0.2"
+
+
+def test_async_ls_remote_tags(git: Callable[..., str], git_repo: Path, git_remote: Path) -> None:
+    """Test async_ls_remote_tags (remote names are resolved in the repo directory)."""
+    for tag in ["v0.0.1", "api/v1.0.0"]:
+        git("tag", tag, cwd=git_repo)
+    git("push", "origin", "--tags", cwd=git_repo)
+    assert asyncio.run(async_ls_remote_tags(AsyncGit(), str(git_remote), "v")) == ["v0.0.1"]
+    assert asyncio.run(async_ls_remote_tags(AsyncGit(), "origin", "api/v", cwd=str(git_repo))) == ["api/v1.0.0"]
+
+
+def test_async_fetch_tags(git: Callable[..., str], git_repo: Path, git_remote: Path) -> None:
+    """Test async_fetch_tags only fetches the tags with prefix."""
+    git("tag", "v0.0.1", cwd=git_remote)
+    git("tag", "other", cwd=git_remote)
+    test_repo = Repo(git_repo)
+    asyncio.run(async_fetch_tags(AsyncGit(), test_repo, "v"))
+    assert get_tags_with_prefix(test_repo, "") == ["v0.0.1"]
+
+
+def test_parse_ls_remote_commits() -> None:
+    """Test parse_ls_remote_commits peels annotated tags and skips the refs without the prefix."""
+    output = "\n".join(
+        [
+            "1111111111111111111111111111111111111111\tHEAD",
+            "2222222222222222222222222222222222222222\trefs/heads/master",
+            "3333333333333333333333333333333333333333\trefs/tags/other",
+            "4444444444444444444444444444444444444444\trefs/tags/v0.0.1",
+            "5555555555555555555555555555555555555555\trefs/tags/v0.0.2",
+            "6666666666666666666666666666666666666666\trefs/tags/v0.0.2^{}",
+        ]
+    )
+    assert parse_ls_remote_commits(output, "v") == {
+        "v0.0.1": "4444444444444444444444444444444444444444",
+        "v0.0.2": "6666666666666666666666666666666666666666",
+    }
+
+
+def test_get_missing_objects(git: Callable[..., str], git_repo: Path) -> None:
+    """Test get_missing_objects."""
+    test_repo = Repo(git_repo)
+    head_sha = git("rev-parse", "HEAD", cwd=git_repo)
+    assert get_missing_objects(test_repo, []) == set()
+    assert get_missing_objects(test_repo, [head_sha, "0" * 40]) == {"0" * 40}
+
+
+def test_async_pull_remote(git: Callable[..., str], git_repo: Path, git_remote: Path, tmp_path: Path) -> None:
+    """Test async_pull_remote."""
+    other_dir = tmp_path / "other"
+    git("clone", str(git_remote), str(other_dir), cwd=tmp_path)
+    git("config", "user.email", "test@test", cwd=other_dir)
+    git("config", "user.name", "Test User", cwd=other_dir)
+    git("commit", "--allow-empty", "-m", "Other commit", cwd=other_dir)
+    git("push", "origin", "master", cwd=other_dir)
+    asyncio.run(async_pull_remote(AsyncGit(), Repo(git_repo)))
+    assert git("rev-parse", "HEAD", cwd=git_repo) == git("rev-parse", "HEAD", cwd=other_dir)
+
+
+def test_async_fetch_tags_shallow(git: Callable[..., str], git_repo: Path, git_remote: Path, tmp_path: Path) -> None:
+    """Test async_fetch_tags keeps the local history of a shallow clone."""
+    shallow_dir = make_shallow_clone(git, git_repo, git_remote, tmp_path)
+    test_repo = Repo(shallow_dir)
+    asyncio.run(async_fetch_tags(AsyncGit(), test_repo, "v"))
+    assert get_tags_with_prefix(test_repo, "") == ["v0.0.1", "v0.0.2", "v0.0.3"]
+    assert git("rev-list", "--count", "HEAD", cwd=shallow_dir) == "4"
@@ -0,0 +1,201 @@
+"""Test index_utils module."""
+
+import json
+import os
+from pathlib import Path
+from typing import List
+
+from pytest import MonkeyPatch, raises
+from semver import VersionInfo
+
+from semvergit.index_utils import INDEX_DIR, INDEX_FILE, INDEX_FORMAT, VersionIndex
+from semvergit.version_utils import VersionParts, parse_parts
+
+
+class Parser:  # pylint: disable=too-few-public-methods
+    """Counting tag parser."""
+
+    def __init__(self) -> None:
+        """Init."""
+        self.parsed: List[str] = []
+
+    def __call__(self, tag: str) -> VersionParts:
+        """Parse."""
+        self.parsed.append(tag)
+        return parse_parts(tag[1:])
+
+
+def fingerprint(monkeypatch: MonkeyPatch, value: str) -> None:
+    """Fix the refs fingerprint."""
+    monkeypatch.setattr("semvergit.index_utils.refs_fingerprint", lambda git_dir: value)
+
+
+def test_refresh(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test refresh only parses new tags and keeps the versions sorted."""
+    parser = Parser()
+    fingerprint(monkeypatch, "first")
+    index = VersionIndex(str(tmp_path))
+    index.refresh("v", lambda: ["v0.1.0", "v0.0.2", "v0.0.10"], parser)
+    assert index.versions("v") == [VersionInfo(0, 0, 2), VersionInfo(0, 0, 10), VersionInfo(0, 1, 0)]
+    assert index.latest("v") == VersionInfo(0, 1, 0)
+    assert sorted(parser.parsed) == ["v0.0.10", "v0.0.2", "v0.1.0"]
+
+    parser.parsed.clear()
+    fingerprint(monkeypatch, "second")
+    index = VersionIndex(str(tmp_path))
+    index.refresh("v", lambda: ["v0.1.0", "v0.0.10", "v0.1.1-dev.1", "v1.0.0"], parser)
+    assert parser.parsed == ["v0.1.1-dev.1", "v1.0.0"]
+    assert index.versions("v") == [
+        VersionInfo(0, 0, 10),
+        VersionInfo(0, 1, 0),
+        VersionInfo(0, 1, 1, "dev.1"),
+        VersionInfo(1, 0, 0),
+    ]
+    assert index.latest("v") == VersionInfo(1, 0, 0)
+    assert VersionIndex(str(tmp_path)).lines("v") == {
+        "0": [0, 1, 1, "dev.1", None],
+        "0.0": [0, 0, 10, None, None],
+        "0.1": [0, 1, 1, "dev.1", None],
+        "1": [1, 0, 0, None, None],
+        "1.0": [1, 0, 0, None, None],
+    }
+    assert not index.lines("x")
+
+
+def test_refresh_fresh(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test refresh doesn't list the tags when the fingerprint is unchanged."""
+    fingerprint(monkeypatch, "same")
+    VersionIndex(str(tmp_path)).refresh("v", lambda: ["v0.0.1"], Parser())
+
+    def list_tags() -> List[str]:
+        raise AssertionError("Should not list tags")
+
+    index = VersionIndex(str(tmp_path))
+    index.refresh("v", list_tags, Parser())
+    assert index.latest("v") == VersionInfo(0, 0, 1)
+
+
+def test_refresh_racy(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test refresh always lists the tags when the refs changed too recently."""
+    monkeypatch.setattr("semvergit.index_utils.refs_fingerprint", lambda git_dir: None)
+    listed = []
+
+    def list_tags() -> List[str]:
+        listed.append("v0.0.1")
+        return ["v0.0.1"]
+
+    for _ in range(2):
+        VersionIndex(str(tmp_path)).refresh("v", list_tags, Parser())
+    assert len(listed) == 2
+
+
+def test_refresh_removed(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test refresh drops deleted tags."""
+    fingerprint(monkeypatch, "first")
+    index = VersionIndex(str(tmp_path))
+    index.refresh("v", lambda: ["v0.0.1", "v0.0.2"], Parser())
+    fingerprint(monkeypatch, "second")
+    index.refresh("v", lambda: ["v0.0.1"], Parser())
+    assert index.versions("v") == [VersionInfo(0, 0, 1)]
+    fingerprint(monkeypatch, "third")
+    index.refresh("v", lambda: [], Parser())
+    assert not index.versions("v")
+    assert index.latest("v") is None
+
+
+def test_refresh_many(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test refresh with more new tags than the insort limit."""
+    fingerprint(monkeypatch, "first")
+    tags = [f"v0.{minor}.{patch}" for minor in range(10, 0, -1) for patch in range(10)]
+    index = VersionIndex(str(tmp_path))
+    index.refresh("v", lambda: tags, Parser())
+    assert index.versions("v") == sorted(VersionInfo.parse(tag[1:]) for tag in tags)
+
+
+def test_refresh_invalid(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test refresh skips invalid tags and doesn't parse them again."""
+    parser = Parser()
+    fingerprint(monkeypatch, "first")
+    index = VersionIndex(str(tmp_path))
+    index.refresh("v", lambda: ["v0.0.1", "v1.2", "very-old-tag"], parser)
+    assert index.versions("v") == [VersionInfo(0, 0, 1)]
+    assert index.invalid("v") == ["v1.2", "very-old-tag"]
+    parser.parsed.clear()
+    fingerprint(monkeypatch, "second")
+    index = VersionIndex(str(tmp_path))
+    index.refresh("v", lambda: ["v0.0.1", "v0.0.2", "very-old-tag"], parser)
+    assert parser.parsed == ["v0.0.2"]
+    assert index.invalid("v") == ["very-old-tag"]
+    assert not index.invalid("x")
+
+
+def test_refresh_no_invalid_entry(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test refresh of an entry saved without invalid tags."""
+    index_path = tmp_path / INDEX_DIR / INDEX_FILE
+    index_path.parent.mkdir()
+    entry = {"fingerprint": "first", "tags": [["v0.0.1", [0, 0, 1, None, None]]]}
+    index_path.write_text(json.dumps({"format": INDEX_FORMAT, "prefixes": {"v": entry}}), encoding="utf-8")
+    fingerprint(monkeypatch, "second")
+    index = VersionIndex(str(tmp_path))
+    assert not index.invalid("v")
+    assert not index.lines("v")
+    index.refresh("v", lambda: ["v0.0.1", "v0.0.2"], Parser())
+    assert index.latest("v") == VersionInfo(0, 0, 2)
+
+
+def test_reachable(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test the reachable tags are cached per commit (and dropped with new tags)."""
+    calls: List[str] = []
+
+    def list_reachable() -> List[str]:
+        calls.append("list")
+        return ["v0.1.0"]
+
+    fingerprint(monkeypatch, "first")
+    index = VersionIndex(str(tmp_path))
+    index.refresh("v", lambda: ["v0.1.0", "v1.0.0"], Parser())
+    assert index.reachable("v", "head1", list_reachable) == {"v0.1.0"}
+    assert VersionIndex(str(tmp_path)).reachable("v", "head1", list_reachable) == {"v0.1.0"}
+    assert index.parts("v", tags={"v0.1.0"}) == [(0, 1, 0, None, None)]
+    assert calls == ["list"]
+    index.reachable("v", "head2", list_reachable)
+    assert calls == ["list", "list"]
+    fingerprint(monkeypatch, "second")
+    index.refresh("v", lambda: ["v0.1.0", "v1.0.0", "v1.0.1"], Parser())
+    index.reachable("v", "head2", list_reachable)
+    assert calls == ["list", "list", "list"]
+
+
+def test_prefixes(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test entries are kept per prefix."""
+    fingerprint(monkeypatch, "same")
+    index = VersionIndex(str(tmp_path))
+    index.refresh("v", lambda: ["v0.0.1"], Parser())
+    index.refresh("x", lambda: ["x1.0.0"], Parser())
+    assert index.latest("v") == VersionInfo(0, 0, 1)
+    assert index.latest("x") == VersionInfo(1, 0, 0)
+    assert index.latest("y") is None
+    assert not index.versions("y")
+
+
+def test_load_invalid(tmp_path: Path) -> None:
+    """Test unreadable or incompatible indexes are ignored."""
+    os.makedirs(tmp_path / INDEX_DIR)
+    index_path = tmp_path / INDEX_DIR / INDEX_FILE
+    index_path.write_text("{not json", encoding="utf-8")
+    assert not VersionIndex(str(tmp_path)).entries
+    index_path.write_text(json.dumps({"format": -1, "prefixes": {"v": {}}}), encoding="utf-8")
+    assert not VersionIndex(str(tmp_path)).entries
+
+
+def test_save_failure(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test a failed save leaves no temporary files."""
+
+    def failing_replace(src: str, dst: str) -> None:
+        raise OSError(f"Can't replace {dst} with {src}")
+
+    monkeypatch.setattr("semvergit.index_utils.os.replace", failing_replace)
+    index = VersionIndex(str(tmp_path))
+    with raises(OSError):
+        index.save()
+    assert not os.listdir(tmp_path / INDEX_DIR)
@@ -0,0 +1,24 @@
+"""Test the package init."""
+
+import importlib
+import sys
+
+from pytest import MonkeyPatch
+
+import semvergit
+
+
+def test_version() -> None:
+    """Test version."""
+    assert semvergit.__version__ == sys.modules["semvergit._version"].__version__
+
+
+def test_version_not_built(monkeypatch: MonkeyPatch) -> None:
+    """Test version of a source tree that was never built."""
+    monkeypatch.setitem(sys.modules, "semvergit._version", None)
+    try:
+        assert importlib.reload(semvergit).__version__ == "0.0.0"
+    finally:
+        monkeypatch.undo()
+        importlib.reload(semvergit)
+    assert semvergit.__version__ != "0.0.0"
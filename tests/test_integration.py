@@ -96,6 +96,8 @@ class TestIntegration:
         run_command("git add .", self.repodirname, "Added initial.txt to the index")
         run_command('git commit -m "Initial commit"', self.repodirname, "Committed initial.txt")
         check_git_log(self.repodirname, "Initial commit")
+        # The new commits are pushed with the tags, let the (non bare) origin accept them
+        run_command("git config receive.denyCurrentBranch updateInstead", self.repodirname, "Allowed pushes")
         self.clonedirname = self.tmpdirname + "/clone"
         run_command(
             f"git clone {self.repodirname} {self.clonedirname}", self.repodirname, f"Cloned to {self.clonedirname}"
@@ -179,3 +181,26 @@ class TestIntegration:
         update_version_file_custom(self.clonedirname, "minor", "v0.1.0", "version.txt", "Updated version to 0.1.0")
         check_file_content("version.txt", self.clonedirname, "0.1.0")
         check_git_log(self.clonedirname, "0.1.0")
+        check_git_log(self.repodirname, "(HEAD -> master, tag: v0.1.0) Updated version to 0.1.0")
+
+    def test_integration_remote_only(self) -> None:
+        """Test the integration of the semvergit package in remote only mode (no local clone)."""
+        add_file_to_repo("test.txt", self.clonedirname, "Hello, World!")
+        update_version(self.clonedirname, "patch", "v0.0.1")
+        add_file_to_repo("test2.txt", self.repodirname, "New content")
+        result, logs = run_command(
+            f"semvergit -v -t minor --remote_only --remote {self.repodirname}", self.tmpdirname, "Created a remote tag"
+        )
+        print(logs, end="")
+        assert result == "v0.1.0"
+        check_git_log(self.repodirname, "(HEAD -> master, tag: v0.1.0) Added test2.txt")
+
+    def test_integration_fetch_tags(self) -> None:
+        """Test the integration of the semvergit package fetching the tags from the remote."""
+        add_file_to_repo("test.txt", self.clonedirname, "Hello, World!")
+        update_version(self.clonedirname, "minor", "v0.1.0")
+        run_command("git tag v0.2.0", self.repodirname, "Tagged the remote")
+        result, logs = run_command("semvergit -v -t patch --fetch_tags", self.clonedirname, "Fetched the tags")
+        print(logs, end="")
+        assert "Fetched 1 new tags" in logs
+        assert result == "v0.2.1"
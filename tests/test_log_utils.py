@@ -1,6 +1,11 @@
 """Test log_utils module."""
 
-from semvergit.log_utils import set_logger
+import json
+from pathlib import Path
+
+from loguru import logger
+
+from semvergit.log_utils import LogLevel, set_logger, summarize
 
 
 def test_set_logger_invalid() -> None:
@@ -11,3 +16,27 @@ def test_set_logger_invalid() -> None:
         pass
     else:
         raise AssertionError("Should have raised ValueError")
+
+
+def test_set_logger_json(tmp_path: Path) -> None:
+    """Test set_logger JSON lines sink (next to the text logs, or instead of them on stderr)."""
+    json_path = tmp_path / "log.jsonl"
+    sink_ids = set_logger(LogLevel.INFO, json_sink=str(json_path))
+    assert len(sink_ids) == 2
+    logger.debug("Hidden")
+    logger.info("Shown {}", 1)
+    for sink_id in sink_ids:
+        logger.remove(sink_id)
+    records = [json.loads(line) for line in json_path.read_text(encoding="utf-8").splitlines()]
+    assert [record["record"]["message"] for record in records] == ["Shown 1"]
+    assert records[0]["record"]["level"]["name"] == "INFO"
+    sink_ids = set_logger(LogLevel.DEBUG, json_sink="-")
+    assert len(sink_ids) == 1
+    logger.remove(sink_ids[0])
+
+
+def test_summarize() -> None:
+    """Test summarize shows the size and the first items only."""
+    assert summarize([]) == "0 []"
+    assert summarize(["v1", "v2"]) == "2 [v1, v2]"
+    assert summarize([f"v{index}" for index in range(50_000)], limit=3) == "50000 [v0, v1, v2, ...]"
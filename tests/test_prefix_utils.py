@@ -0,0 +1,48 @@
+"""Test prefix_utils module."""
+
+from pytest import mark, raises
+
+from semvergit.prefix_utils import PrefixTrie, common_prefix, parse_component_bump
+
+
+@mark.parametrize(
+    "tag, expected",
+    [
+        ("api/v1.0.0", "api/v"),
+        ("api/v2/v1.0.0", "api/v2/v"),
+        ("api/x1.0.0", None),
+        ("v1.0.0", "v"),
+        ("web", None),
+        ("", None),
+    ],
+)
+def test_prefix_trie_match(tag: str, expected: str) -> None:
+    """Test the trie matches the longest prefix."""
+    assert PrefixTrie(["v", "api/v", "api/v2/v", "web/v"]).match(tag) == expected
+
+
+def test_prefix_trie_partition() -> None:
+    """Test the trie partitions the tags in one pass (duplicate prefixes are ignored)."""
+    trie = PrefixTrie(["api/v", "web/v", "api/v", "cli/v"])
+    assert trie.prefixes == ["api/v", "web/v", "cli/v"]
+    assert trie.partition(["api/v1.0.0", "web/v2.0.0", "other", "api/v1.1.0"]) == {
+        "api/v": ["api/v1.0.0", "api/v1.1.0"],
+        "web/v": ["web/v2.0.0"],
+        "cli/v": [],
+    }
+    assert PrefixTrie([""]).partition(["a", "b"]) == {"": ["a", "b"]}
+
+
+def test_common_prefix() -> None:
+    """Test common prefix."""
+    assert common_prefix(["services/api/v", "services/web/v"]) == "services/"
+    assert common_prefix(["v", "api/v"]) == ""
+
+
+def test_parse_component_bump() -> None:
+    """Test parse component bump."""
+    assert parse_component_bump("api/v=minor") == ("api/v", "minor")
+    assert parse_component_bump("a=b/v=patch") == ("a=b/v", "patch")
+    for spec in ["api/v", "=minor", "api/v="]:
+        with raises(ValueError, match="PREFIX=BUMP_TYPE"):
+            parse_component_bump(spec)
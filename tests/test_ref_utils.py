@@ -0,0 +1,109 @@
+"""Test ref_utils module."""
+
+import os
+from pathlib import Path
+from typing import Callable, List
+
+from pytest import MonkeyPatch, mark, raises
+
+from semvergit.ref_utils import RefsReadError, iter_loose_tags, iter_packed_tags, read_tags, refs_fingerprint
+
+PACKED_REFS = """# pack-refs with: peeled fully-peeled sorted
+1111111111111111111111111111111111111111 refs/heads/master
+2222222222222222222222222222222222222222 refs/tags/v0.0.1
+3333333333333333333333333333333333333333 refs/tags/v0.0.2
+^4444444444444444444444444444444444444444
+5555555555555555555555555555555555555555 refs/tags/api/v1.0.0
+6666666666666666666666666666666666666666 refs/tags/very-old-tag
+"""
+
+
+@mark.parametrize(
+    "prefix, expected",
+    [
+        ("", ["v0.0.1", "v0.0.2", "api/v1.0.0", "very-old-tag"]),
+        ("v", ["v0.0.1", "v0.0.2", "very-old-tag"]),
+        ("v0", ["v0.0.1", "v0.0.2"]),
+        ("api/v", ["api/v1.0.0"]),
+        ("web/v", []),
+    ],
+)
+def test_iter_packed_tags(tmp_path: Path, prefix: str, expected: List[str]) -> None:
+    """Test iter_packed_tags."""
+    (tmp_path / "packed-refs").write_text(PACKED_REFS, encoding="utf-8")
+    assert list(iter_packed_tags(str(tmp_path), prefix)) == expected
+
+
+def test_iter_packed_tags_missing(tmp_path: Path) -> None:
+    """Test iter_packed_tags without packed-refs."""
+    assert not list(iter_packed_tags(str(tmp_path), "v"))
+
+
+@mark.parametrize(
+    "prefix, expected",
+    [
+        ("", ["api/v1.0.0", "v0.0.3", "vendor-x"]),
+        ("v", ["v0.0.3", "vendor-x"]),
+        ("api/v", ["api/v1.0.0"]),
+        ("web/v", []),
+    ],
+)
+def test_iter_loose_tags(tmp_path: Path, prefix: str, expected: List[str]) -> None:
+    """Test iter_loose_tags."""
+    tags_dir = tmp_path / "refs" / "tags"
+    (tags_dir / "api").mkdir(parents=True)
+    for tag in ["v0.0.3", "vendor-x", "api/v1.0.0", "v0.0.4.lock"]:
+        (tags_dir / tag).write_text("1" * 40, encoding="utf-8")
+    assert sorted(iter_loose_tags(str(tmp_path), prefix)) == expected
+
+
+def test_read_tags(git: Callable[..., str], git_repo: Path) -> None:
+    """Test read_tags merges packed and loose refs."""
+    for tag in ["v0.0.1", "v0.0.2", "api/v1.0.0", "other"]:
+        git("tag", tag, cwd=git_repo)
+    git("pack-refs", "--all", cwd=git_repo)
+    git("tag", "v0.0.3", cwd=git_repo)
+    git("tag", "-f", "v0.0.1", cwd=git_repo)  # Loose copy of a packed tag
+    git_dir = str(git_repo / ".git")
+    assert read_tags(git_dir, "v") == ["v0.0.1", "v0.0.2", "v0.0.3"]
+    assert read_tags(git_dir, "api/v") == ["api/v1.0.0"]
+    assert read_tags(git_dir) == ["api/v1.0.0", "other", "v0.0.1", "v0.0.2", "v0.0.3"]
+
+
+def test_read_tags_reftable(tmp_path: Path) -> None:
+    """Test read_tags with reftable backend."""
+    (tmp_path / "reftable").mkdir()
+    with raises(RefsReadError):
+        read_tags(str(tmp_path), "v")
+
+
+def test_refs_fingerprint(monkeypatch: MonkeyPatch, git: Callable[..., str], git_repo: Path) -> None:
+    """Test refs_fingerprint changes with the tags."""
+    git_dir = str(git_repo / ".git")
+    git("tag", "v0.0.1", cwd=git_repo)
+    assert refs_fingerprint(git_dir) is None  # Changed too recently to be trusted
+    monkeypatch.setattr("semvergit.ref_utils.RACY_WINDOW_NS", 0)
+    first = refs_fingerprint(git_dir)
+    assert first is not None
+    assert refs_fingerprint(git_dir) == first
+    os.utime(git_repo / ".git" / "refs" / "tags", ns=(1, 1))
+    second = refs_fingerprint(git_dir)
+    assert second != first
+    git("pack-refs", "--all", cwd=git_repo)
+    assert refs_fingerprint(git_dir) not in (first, second)
+
+
+def test_refs_fingerprint_reftable(tmp_path: Path) -> None:
+    """Test refs_fingerprint of the reftable backend follows its tables list."""
+    reftable_dir = tmp_path / "reftable"
+    reftable_dir.mkdir()
+    assert refs_fingerprint(str(tmp_path)) is None
+    tables_list = reftable_dir / "tables.list"
+    tables_list.write_text("0x000000000001-0x000000000001-aaaaaaaa.ref\n", encoding="utf-8")
+    first = refs_fingerprint(str(tmp_path))
+    assert first is not None
+    assert refs_fingerprint(str(tmp_path)) == first
+    (tmp_path / "packed-refs").write_text("# pack-refs with: peeled\n", encoding="utf-8")
+    assert refs_fingerprint(str(tmp_path)) == first  # The files refs storage is ignored
+    tables_list.write_text("0x000000000001-0x000000000002-bbbbbbbb.ref\n", encoding="utf-8")
+    assert refs_fingerprint(str(tmp_path)) != first
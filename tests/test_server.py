@@ -0,0 +1,385 @@
+"""Test server."""
+
+import json
+import os
+import signal
+import socket
+import threading
+import time
+from http.client import HTTPConnection
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from git import Repo
+from pytest import LogCaptureFixture, MonkeyPatch, fixture, raises
+from semver import VersionInfo
+
+from semvergit.app import SemverGit
+from semvergit.server import LeaseError, VersionAllocator, make_server, run_server
+from semvergit.version_utils import VersionLineError
+
+MISSING_SHA = "0" * 40
+
+
+@fixture(name="svg")
+def fixture_svg(real_git_utils: None, git_repo: Path, git_remote: Path) -> SemverGit:  # pylint: disable=unused-argument
+    """SemverGit of git_repo (with a bare origin)."""
+    return SemverGit(repo=Repo(git_repo))
+
+
+@fixture(name="allocator")
+def fixture_allocator(svg: SemverGit) -> VersionAllocator:
+    """Allocator (no background flushing)."""
+    return VersionAllocator(svg)
+
+
+@fixture(name="http_server")
+def fixture_http_server(allocator: VersionAllocator) -> Iterator[Tuple[str, int]]:
+    """Allocation server on a free port."""
+    server = make_server(allocator, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address  # type: ignore[misc]
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def request(address: Tuple[str, int], method: str, path: str, body: Optional[Any] = None) -> Tuple[int, Any]:
+    """Send a JSON request to the server."""
+    connection = HTTPConnection(*address)
+    connection.request(method, path, body=None if body is None else json.dumps(body))
+    response = connection.getresponse()
+    result = response.status, json.loads(response.read())
+    connection.close()
+    return result
+
+
+def test_allocator(git: Callable[..., str], allocator: VersionAllocator, git_remote: Path) -> None:
+    """Test leases are unique and only the confirmed ones are pushed (in one batch)."""
+    leases = [allocator.reserve("prerelease") for _ in range(3)]
+    assert [lease.tag for lease in leases] == ["v0.0.1-dev.1", "v0.0.1-dev.2", "v0.0.1-dev.3"]
+    assert allocator.confirm(leases[0].lease_id) == "v0.0.1-dev.1"
+    allocator.release(leases[1].lease_id)
+    assert allocator.confirm(leases[2].lease_id) == "v0.0.1-dev.3"
+    assert allocator.flush() == 2
+    assert allocator.flush() == 0
+    assert git("tag", "-l", cwd=git_remote).splitlines() == ["v0.0.1-dev.1", "v0.0.1-dev.3"]
+    assert allocator.reserve("patch").tag == "v0.0.1"
+    status = allocator.status()
+    assert status["high_water"] == "0.0.1"
+    assert status["leases"] == 1
+    assert status["tags"] == {"v0.0.1-dev.1": "pushed", "v0.0.1-dev.3": "pushed"}
+
+
+def test_allocator_lease_errors(allocator: VersionAllocator) -> None:
+    """Test unknown and expired leases."""
+    with raises(LeaseError):
+        allocator.release("unknown")
+    with raises(ValueError):
+        allocator.reserve("invalid")
+    allocator.lease_seconds = 0
+    lease = allocator.reserve("minor")
+    with raises(LeaseError):
+        allocator.confirm(lease.lease_id)
+    assert allocator.reserve("minor").tag == "v0.2.0"
+
+
+def test_allocator_commit(git: Callable[..., str], allocator: VersionAllocator, git_remote: Path) -> None:
+    """Test tags on given commits (invalid commits fail alone)."""
+    first_sha = git("rev-parse", "HEAD", cwd=git_remote)
+    allocator.confirm(allocator.reserve("patch").lease_id, commit=first_sha)
+    allocator.confirm(allocator.reserve("patch").lease_id, commit=MISSING_SHA)
+    assert allocator.flush() == 1
+    assert git("rev-list", "-n", "1", "v0.0.1", cwd=git_remote) == first_sha
+    assert allocator.status()["tags"] == {"v0.0.1": "pushed", "v0.0.2": "failed"}
+
+
+def test_allocator_remote_commit(
+    git: Callable[..., str], allocator: VersionAllocator, git_remote: Path, tmp_path: Path
+) -> None:
+    """Test tags on commits pushed by a build job (only on the remote, the server fetches them)."""
+    builder = tmp_path / "builder"
+    git("clone", str(git_remote), str(builder), cwd=tmp_path)
+    git("config", "user.email", "builder@test", cwd=builder)
+    git("config", "user.name", "Builder", cwd=builder)
+    git("commit", "--allow-empty", "-m", "Build", cwd=builder)
+    git("push", "origin", "HEAD", cwd=builder)
+    build_sha = git("rev-parse", "HEAD", cwd=builder)
+    allocator.confirm(allocator.reserve("patch").lease_id, commit=build_sha)
+    assert allocator.flush() == 1
+    assert git("rev-list", "-n", "1", "v0.0.1", cwd=git_remote) == build_sha
+    assert allocator.status()["tags"] == {"v0.0.1": "pushed"}
+
+
+def test_allocator_line(
+    real_git_utils: None, git: Callable[..., str], git_repo: Path  # pylint: disable=unused-argument
+) -> None:
+    """Test reservations stay on the line of the SemverGit (a bump leaving it is a bad request)."""
+    for tag in ["v1.4.0", "v2.0.0"]:
+        git("tag", tag, cwd=git_repo)
+    allocator = VersionAllocator(SemverGit(repo=Repo(git_repo), line="1.4"))
+    assert allocator.reserve("patch").tag == "v1.4.1"
+    with raises(VersionLineError, match="A minor bump of 1.4.1 leaves line 1.4"):
+        allocator.reserve("minor")
+    server = make_server(allocator, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    status, body = request(server.server_address, "POST", "/reserve", {"bump_type": "major"})  # type: ignore[arg-type]
+    server.shutdown()
+    server.server_close()
+    thread.join()
+    assert status == 400
+    assert "leaves line 1.4" in body["error"]
+    assert allocator.reserve("prerelease").tag == "v1.4.2-dev.1"
+
+
+def test_allocator_tag_history(allocator: VersionAllocator) -> None:
+    """Test only the latest finished tags are kept (pending tags are never forgotten)."""
+    allocator.tag_history = 2
+    for _ in range(3):
+        allocator.confirm(allocator.reserve("patch").lease_id)
+        allocator.flush()
+    allocator.confirm(allocator.reserve("patch").lease_id)
+    assert allocator.status()["tags"] == {"v0.0.2": "pushed", "v0.0.3": "pushed", "v0.0.4": "pending"}
+
+
+def test_allocator_no_tags(
+    git: Callable[..., str], allocator: VersionAllocator, git_repo: Path, git_remote: Path
+) -> None:
+    """Test a batch without any created tag pushes nothing (not even the current branch)."""
+    remote_sha = git("rev-parse", "master", cwd=git_remote)
+    git("commit", "--allow-empty", "-m", "Local only", cwd=git_repo)
+    allocator.confirm(allocator.reserve("patch").lease_id, commit=MISSING_SHA)
+    assert allocator.flush() == 0
+    assert allocator.status()["tags"] == {"v0.0.1": "failed"}
+    assert git("rev-parse", "master", cwd=git_remote) == remote_sha
+
+
+def test_allocator_rejected(
+    git: Callable[..., str], allocator: VersionAllocator, git_repo: Path, git_remote: Path
+) -> None:
+    """Test a batch rejected by the remote is retracted and the next leases skip the remote tags."""
+    git("tag", "v0.0.1-dev.1", cwd=git_remote)
+    git("commit", "--allow-empty", "-m", "New version", cwd=git_repo)
+    allocator.confirm(allocator.reserve("prerelease").lease_id)
+    assert allocator.flush() == 0
+    assert not git("tag", "-l", cwd=git_repo)
+    assert allocator.status()["tags"] == {"v0.0.1-dev.1": "failed"}
+    assert allocator.reserve("prerelease").tag == "v0.0.1-dev.2"
+
+
+def test_allocator_rejected_tag(
+    git: Callable[..., str], allocator: VersionAllocator, git_repo: Path, git_remote: Path
+) -> None:
+    """Test only the taken tags of a rejected batch fail (the others are pushed one by one)."""
+    git("tag", "v0.0.1-dev.2", cwd=git_remote)
+    git("commit", "--allow-empty", "-m", "New version", cwd=git_repo)
+    for _ in range(3):
+        allocator.confirm(allocator.reserve("prerelease").lease_id)
+    assert allocator.flush() == 2
+    assert allocator.status()["tags"] == {"v0.0.1-dev.1": "pushed", "v0.0.1-dev.2": "failed", "v0.0.1-dev.3": "pushed"}
+    assert git("tag", "-l", cwd=git_repo).splitlines() == ["v0.0.1-dev.1", "v0.0.1-dev.3"]
+    head_sha = git("rev-parse", "HEAD", cwd=git_repo)
+    assert git("rev-list", "-n", "1", "v0.0.1-dev.3", cwd=git_remote) == head_sha
+    assert git("rev-list", "-n", "1", "v0.0.1-dev.2", cwd=git_remote) != head_sha
+    assert allocator.reserve("prerelease").tag == "v0.0.1-dev.4"
+
+
+def test_allocator_push_error(git: Callable[..., str], svg: SemverGit, git_repo: Path) -> None:
+    """Test a failed push (missing remote) is retracted."""
+    svg.remotes = ("missing",)
+    allocator = VersionAllocator(svg)
+    allocator.confirm(allocator.reserve("major").lease_id)
+    assert allocator.flush() == 0
+    assert not git("tag", "-l", cwd=git_repo)
+    assert allocator.reserve("major").tag == "v2.0.0"
+
+
+def test_allocator_partial_push(
+    git: Callable[..., str], svg: SemverGit, git_repo: Path, git_remote: Path, tmp_path: Path
+) -> None:
+    """Test tags pushed to some of the remotes are kept (and reported as partial)."""
+    second_remote = tmp_path / "second.git"
+    git("clone", "--bare", str(git_remote), str(second_remote), cwd=tmp_path)
+    git("tag", "v1.0.0", cwd=git_remote)
+    git("commit", "--allow-empty", "-m", "New version", cwd=git_repo)
+    svg.remotes = ("origin", str(second_remote))
+    allocator = VersionAllocator(svg)
+    allocator.high_water = VersionInfo(0, 0, 0)
+    allocator.confirm(allocator.reserve("major").lease_id)
+    assert allocator.flush() == 0
+    assert allocator.status()["tags"] == {"v1.0.0": "partial"}
+    assert git("tag", "-l", cwd=git_repo) == "v1.0.0"
+    assert git("tag", "-l", cwd=second_remote) == "v1.0.0"
+
+
+def test_allocator_dry_run(git: Callable[..., str], svg: SemverGit, git_repo: Path) -> None:
+    """Test dry run doesn't tag."""
+    allocator = VersionAllocator(svg, dry_run=True)
+    allocator.confirm(allocator.reserve("major").lease_id)
+    assert allocator.flush() == 1
+    assert not git("tag", "-l", cwd=git_repo)
+
+
+def test_allocator_flusher(git: Callable[..., str], svg: SemverGit, git_remote: Path) -> None:
+    """Test background flushing (in batches) and the final flush on stop."""
+    allocator = VersionAllocator(svg, flush_interval=0.01, batch_size=1)
+    for _ in range(2):
+        allocator.confirm(allocator.reserve("patch").lease_id)
+    allocator.start()
+    deadline = time.monotonic() + 10
+    while allocator.status()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    allocator.confirm(allocator.reserve("patch").lease_id)
+    allocator.stop()
+    assert git("tag", "-l", cwd=git_remote).splitlines() == ["v0.0.1", "v0.0.2", "v0.0.3"]
+    stopped = VersionAllocator(svg)
+    stopped.stop()
+    assert stopped.flusher is None
+
+
+def test_allocator_stop_failed_batch(git: Callable[..., str], svg: SemverGit, git_remote: Path) -> None:
+    """Test stop flushes every pending tag even after a batch where every tag failed."""
+    allocator = VersionAllocator(svg, batch_size=2)
+    for commit in [MISSING_SHA, MISSING_SHA, None, None]:
+        allocator.confirm(allocator.reserve("patch").lease_id, commit=commit)
+    allocator.stop()
+    assert not allocator.pending
+    assert git("tag", "-l", cwd=git_remote).splitlines() == ["v0.0.3", "v0.0.4"]
+    assert allocator.status()["tags"] == {
+        "v0.0.1": "failed",
+        "v0.0.2": "failed",
+        "v0.0.3": "pushed",
+        "v0.0.4": "pushed",
+    }
+
+
+def test_allocator_flusher_error(
+    monkeypatch: MonkeyPatch, caplog: LogCaptureFixture, git: Callable[..., str], svg: SemverGit, git_remote: Path
+) -> None:
+    """Test an error of a flush is logged and the flusher keeps flushing."""
+    allocator = VersionAllocator(svg, flush_interval=0.01)
+    flush = allocator.flush
+    calls = []
+
+    def failing_flush() -> int:
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("Flush error")
+        return flush()
+
+    monkeypatch.setattr(allocator, "flush", failing_flush)
+    allocator.start()
+    allocator.confirm(allocator.reserve("patch").lease_id)
+    deadline = time.monotonic() + 10
+    while allocator.status()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    allocator.stop()
+    assert "Flush failed (RuntimeError('Flush error'))" in caplog.text
+    assert git("tag", "-l", cwd=git_remote) == "v0.0.1"
+
+
+def test_server(git: Callable[..., str], http_server: Tuple[str, int], git_remote: Path) -> None:
+    """Test the HTTP interface."""
+    status, reserved = request(http_server, "POST", "/reserve", {"bump_type": "minor"})
+    assert status == 200
+    assert reserved["tag"] == "v0.1.0"
+    assert request(http_server, "POST", "/reserve")[1]["tag"] == "v0.1.1-dev.1"
+    assert request(http_server, "POST", "/confirm", {"lease": reserved["lease"]}) == (
+        200,
+        {"tag": "v0.1.0", "state": "pending"},
+    )
+    assert request(http_server, "POST", "/flush") == (200, {"pushed": 1})
+    assert git("tag", "-l", cwd=git_remote) == "v0.1.0"
+    released = request(http_server, "POST", "/reserve")[1]["lease"]
+    assert request(http_server, "POST", "/release", {"lease": released}) == (200, {"released": released})
+    status, body = request(http_server, "GET", "/status")
+    assert status == 200
+    assert body["tags"] == {"v0.1.0": "pushed"}
+
+
+def test_server_errors(http_server: Tuple[str, int]) -> None:
+    """Test the HTTP interface errors."""
+    assert request(http_server, "GET", "/unknown")[0] == 404
+    assert request(http_server, "POST", "/unknown")[0] == 404
+    assert request(http_server, "POST", "/confirm", {"lease": "unknown"})[0] == 409
+    assert request(http_server, "POST", "/confirm")[0] == 400
+    assert request(http_server, "POST", "/reserve", {"bump_type": "invalid"})[0] == 400
+    assert request(http_server, "POST", "/reserve", {"bump_type": "auto"})[0] == 400
+    assert request(http_server, "POST", "/reserve", ["prerelease"])[0] == 400
+
+
+def test_server_option_commit(allocator: VersionAllocator, http_server: Tuple[str, int], tmp_path: Path) -> None:
+    """Test commits that aren't full shas (options of git) are refused."""
+    pwned = tmp_path / "pwned"
+    lease = request(http_server, "POST", "/reserve", {"bump_type": "patch"})[1]["lease"]
+    for commit in [f"--upload-pack=touch {pwned};", "deadbeef", "HEAD"]:
+        status, body = request(http_server, "POST", "/confirm", {"lease": lease, "commit": commit})
+        assert status == 400
+        assert "expected a full sha" in body["error"]
+    assert not allocator.pending
+    assert request(http_server, "POST", "/flush") == (200, {"pushed": 0})
+    assert not pwned.exists()
+
+
+def test_run_server_unix_socket(allocator: VersionAllocator, tmp_path: Path) -> None:
+    """Test serving on a Unix socket (a stale socket file is replaced)."""
+    socket_path = tmp_path / "semvergit.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(str(socket_path))
+    server = make_server(allocator, socket_path=str(socket_path))
+    thread = threading.Thread(target=run_server, args=(server, allocator), daemon=True)
+    thread.start()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(socket_path))
+        client.sendall(b"GET /status HTTP/1.0\r\n\r\n")
+        response = b"".join(iter(lambda: client.recv(4096), b""))
+    server.shutdown()
+    thread.join()
+    header, _, body = response.partition(b"\r\n\r\n")
+    assert header.startswith(b"HTTP/1.0 200")
+    status: Dict[str, Any] = json.loads(body)
+    assert status["latest"] == "0.0.0"
+    assert not socket_path.exists()
+
+
+def test_make_server_not_socket(allocator: VersionAllocator, tmp_path: Path) -> None:
+    """Test a socket path of another file is refused (and the file kept), a new path is simply bound."""
+    config_path = tmp_path / "config.toml"
+    config_path.write_text("keep", encoding="utf-8")
+    with raises(ValueError, match="is not a socket"):
+        make_server(allocator, socket_path=str(config_path))
+    assert config_path.read_text(encoding="utf-8") == "keep"
+    new_server = make_server(allocator, socket_path=str(tmp_path / "new.sock"))
+    new_server.server_close()
+    assert (tmp_path / "new.sock").is_socket()
+
+
+def test_run_server_interrupt(monkeypatch: MonkeyPatch, allocator: VersionAllocator) -> None:
+    """Test the server stops on interrupt (flushing the confirmed tags)."""
+    server = make_server(allocator, port=0)
+
+    def serve_forever() -> None:
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(server, "serve_forever", serve_forever)
+    allocator.confirm(allocator.reserve("patch").lease_id)
+    run_server(server, allocator)
+    assert allocator.status()["tags"] == {"v0.0.1": "pushed"}
+
+
+def test_run_server_sigterm(monkeypatch: MonkeyPatch, allocator: VersionAllocator) -> None:
+    """Test the server stops on SIGTERM as on interrupt (and the previous handler is restored)."""
+    server = make_server(allocator, port=0)
+
+    def serve_forever() -> None:
+        os.kill(os.getpid(), signal.SIGTERM)
+        time.sleep(10)
+
+    monkeypatch.setattr(server, "serve_forever", serve_forever)
+    allocator.confirm(allocator.reserve("patch").lease_id)
+    previous_handler = signal.getsignal(signal.SIGTERM)
+    run_server(server, allocator)
+    assert allocator.status()["tags"] == {"v0.0.1": "pushed"}
+    assert signal.getsignal(signal.SIGTERM) == previous_handler
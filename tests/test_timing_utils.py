@@ -0,0 +1,47 @@
+"""Test timing utils."""
+
+import json
+from pathlib import Path
+
+from git import Git
+from pytest import CaptureFixture
+
+from semvergit.timing_utils import Timings
+
+
+def test_timings_spans() -> None:
+    """Test nested spans and counters."""
+    timings = Timings()
+    with timings.span("init"):
+        with timings.span("versions"):
+            timings.count("tags_scanned", 3)
+        timings.count("tags_scanned")
+    report = timings.report()
+    assert [span["name"] for span in report["spans"]] == ["init", "init.versions"]
+    assert report["spans"][0]["seconds"] >= report["spans"][1]["seconds"]
+    assert report["counters"] == {"tags_scanned": 4}
+    assert report["total_seconds"] >= report["spans"][0]["seconds"]
+
+
+def test_timings_track_git() -> None:
+    """Test git commands are counted only while tracked."""
+    execute = Git.execute
+    timings = Timings()
+    with timings.track_git():
+        Git().version()
+    Git().version()
+    assert Git.execute is execute
+    assert timings.counters["git_commands"] == 1
+    assert timings.counters["git_microseconds"] > 0
+
+
+def test_timings_write(tmp_path: Path, capsys: CaptureFixture) -> None:
+    """Test the JSON report is written to a file or stderr."""
+    timings = Timings()
+    with timings.span("update"):
+        pass
+    report_path = tmp_path / "timings.json"
+    timings.write(str(report_path))
+    assert json.loads(report_path.read_text(encoding="utf-8"))["spans"][0]["name"] == "update"
+    timings.write("-")
+    assert json.loads(capsys.readouterr().err)["format"] == 1
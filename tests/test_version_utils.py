@@ -0,0 +1,181 @@
+"""Test version utils."""
+
+import random
+from typing import List
+
+from pytest import mark, raises
+from semver import VersionInfo
+
+from semvergit.version_utils import (
+    InvalidTagError,
+    format_parts,
+    in_line,
+    in_range,
+    invalid_summary,
+    iter_tag_parts,
+    latest_parts,
+    line_index,
+    parse_line,
+    parse_parts,
+    parse_range,
+    precedence_key,
+    to_version,
+    top_parts,
+    version_parts,
+    version_record,
+)
+
+VERSIONS = [
+    "0.0.1",
+    "0.0.10",
+    "0.1.0",
+    "1.0.0-0",
+    "1.0.0-1",
+    "1.0.0-2",
+    "1.0.0-10",
+    "1.0.0-alpha",
+    "1.0.0-alpha.1",
+    "1.0.0-alpha.beta",
+    "1.0.0-beta",
+    "1.0.0-beta.2",
+    "1.0.0-beta.11",
+    "1.0.0-rc.1",
+    "1.0.0",
+    "1.0.1-dev.1+build.7",
+    "1.0.1",
+    "10.0.0",
+]
+
+
+def test_version_parts() -> None:
+    """Test version_parts and to_version."""
+    assert version_parts(VersionInfo.parse("1.2.3-dev.1+build.5")) == (1, 2, 3, "dev.1", "build.5")
+    assert to_version([1, 2, 3, "dev.1", None]) == VersionInfo(1, 2, 3, "dev.1")
+
+
+@mark.parametrize("version", [*VERSIONS, "1.2.3-0a.b-c+001.x-y"])
+def test_parse_parts(version: str) -> None:
+    """Test parse_parts matches VersionInfo.parse."""
+    assert parse_parts(version) == version_parts(VersionInfo.parse(version))
+
+
+@mark.parametrize("version", ["1.2", "01.2.3", "1.2.3-01", "1.2.3-", "1.2.3+", "v1.2.3", "1.2.3 ", "very-old-tag"])
+def test_parse_parts_invalid(version: str) -> None:
+    """Test parse_parts rejects what VersionInfo.parse rejects."""
+    with raises(ValueError):
+        VersionInfo.parse(version)
+    with raises(ValueError, match="is not valid SemVer string"):
+        parse_parts(version)
+
+
+def test_precedence_key() -> None:
+    """Test precedence_key sorts like VersionInfo."""
+    shuffled = VERSIONS[:]
+    random.Random(0).shuffle(shuffled)
+    assert sorted(shuffled, key=lambda version: precedence_key(parse_parts(version))) == VERSIONS
+    assert sorted(shuffled, key=VersionInfo.parse) == VERSIONS
+    assert precedence_key(parse_parts("1.0.0+build.1")) == precedence_key(parse_parts("1.0.0"))
+
+
+def test_latest_parts() -> None:
+    """Test latest_parts and top_parts (single pass)."""
+    parts = (parse_parts(version) for version in reversed(VERSIONS))
+    assert latest_parts(parts) == (10, 0, 0, None, None)
+    assert latest_parts([]) is None
+    assert top_parts(map(parse_parts, VERSIONS), 2) == [(10, 0, 0, None, None), (1, 0, 1, None, None)]
+    assert not top_parts([], 3)
+
+
+def test_iter_tag_parts() -> None:
+    """Test iter_tag_parts skips (or fails on) invalid tags."""
+    tags = ["1.0.0", "1.2", "vendor-x", "2.0.0-rc.1"]
+    invalid: List[str] = []
+    assert list(iter_tag_parts(tags, parse_parts, invalid)) == [
+        ("1.0.0", (1, 0, 0, None, None)),
+        ("2.0.0-rc.1", (2, 0, 0, "rc.1", None)),
+    ]
+    assert invalid == ["1.2", "vendor-x"]
+    parsed = iter_tag_parts(tags, parse_parts, invalid, strict=True)
+    assert next(parsed) == ("1.0.0", (1, 0, 0, None, None))
+    with raises(InvalidTagError, match="Invalid version tag 1.2"):
+        next(parsed)
+
+
+def test_invalid_summary() -> None:
+    """Test invalid_summary shows a few examples."""
+    assert invalid_summary(["v1.2"]) == "1 invalid version tags (v1.2)"
+    assert invalid_summary([f"old-{number}" for number in range(7)]) == (
+        "7 invalid version tags (old-0, old-1, old-2, old-3, old-4, ...)"
+    )
+
+
+@mark.parametrize(
+    "expression, expected",
+    [
+        (">=1.0.0", ["1.0.0", "1.0.1-dev.1+build.7", "1.0.1", "10.0.0"]),
+        (">1.0.0-rc.1,<=1.0.1-dev.1", ["1.0.0", "1.0.1-dev.1+build.7"]),
+        ("==0.1.0", ["0.1.0"]),
+        ("0.0.10", ["0.0.10"]),
+        ("<1.0.0-0, != 0.0.1", ["0.0.10", "0.1.0"]),
+    ],
+)
+def test_range(expression: str, expected: List[str]) -> None:
+    """Test version ranges (by precedence)."""
+    version_range = parse_range(expression)
+    assert [version for version in VERSIONS if in_range(parse_parts(version), version_range)] == expected
+
+
+@mark.parametrize("expression", ["", ">=1.0.0,", "~1.0.0", ">=1.0"])
+def test_range_invalid(expression: str) -> None:
+    """Test invalid version ranges."""
+    with raises(ValueError):
+        parse_range(expression)
+
+
+def test_version_record() -> None:
+    """Test version_record."""
+    assert version_record((1, 2, 3, "dev.1", "build.5"), "v") == {
+        "tag": "v1.2.3-dev.1+build.5",
+        "version": "1.2.3-dev.1+build.5",
+        "major": 1,
+        "minor": 2,
+        "patch": 3,
+        "prerelease": "dev.1",
+        "build": "build.5",
+    }
+
+
+@mark.parametrize("version", VERSIONS)
+def test_format_parts(version: str) -> None:
+    """Test format_parts (same string as VersionInfo)."""
+    assert format_parts(parse_parts(version)) == str(to_version(parse_parts(version))) == version
+
+
+@mark.parametrize(
+    "line, valid", [("1", True), ("1.4", True), ("0.10", True), ("1.4.2", False), ("v1", False), ("01", False)]
+)
+def test_parse_line(line: str, valid: bool) -> None:
+    """Test parse_line (MAJOR or MAJOR.MINOR)."""
+    if valid:
+        assert parse_line(line) == line
+    else:
+        with raises(ValueError, match="Invalid version line"):
+            parse_line(line)
+
+
+def test_line_index() -> None:
+    """Test line_index keeps the latest version of each major and major.minor line."""
+    versions = ["1.4.2", "2.0.0", "1.4.10", "1.5.0-rc.1", "1.4.11-dev.1", "2.1.0-dev.1", "1.5.0"]
+    lines = line_index(map(parse_parts, random.sample(versions, len(versions))))
+    assert {line: format_parts(parts) for line, parts in lines.items()} == {
+        "1": "1.5.0",
+        "1.4": "1.4.11-dev.1",
+        "1.5": "1.5.0",
+        "2": "2.1.0-dev.1",
+        "2.0": "2.0.0",
+        "2.1": "2.1.0-dev.1",
+    }
+    assert not line_index([])
+    assert in_line("1", 1, 4)
+    assert in_line("1.4", 1, 4)
+    assert not in_line("1.4", 1, 5)